@@ -0,0 +1,122 @@
+"""
+Benchmark: shared passes vs. one pass per detector
+
+The name-based detectors share one SymbolTable and the walker-based
+detectors share one FusedWalker traversal, as in Analyzer.run_detectors.
+
+Usage:
+    python -m benchmarks.bench_fused_dispatch [path] [--repeat N]
+
+Without a path a synthetic module is generated.
+"""
+import argparse
+import ast
+import time
+
+from core.detectors import (
+    UndefinedVarDetector,
+    UnusedVarDetector,
+    DuplicateAssignDetector,
+    UnreachableCodeDetector,
+    FusedWalker
+)
+from core.repo_loader import RepoLoader
+from core.symbols import SymbolTable
+
+SYMBOL_DETECTORS = [
+    UndefinedVarDetector,
+    UnusedVarDetector,
+    DuplicateAssignDetector,
+]
+WALKER_DETECTORS = [
+    UnreachableCodeDetector,
+]
+
+
+def synthetic_module(functions=400):
+    parts = ["import os", "import sys", "CONSTANT = 1"]
+    for i in range(functions):
+        parts.append(
+            f"def func_{i}(a, b, c):\n"
+            f"    total = a + b\n"
+            f"    for k, v in enumerate(range(c)):\n"
+            f"        if k % 2:\n"
+            f"            total = total + v * CONSTANT\n"
+            f"        else:\n"
+            f"            print(os.path.join(str(k), str(v)))\n"
+            f"    with open(__file__) as fh:\n"
+            f"        data = fh.read()\n"
+            f"    try:\n"
+            f"        return total / len(data)\n"
+            f"    except ZeroDivisionError as e:\n"
+            f"        raise ValueError(e)\n"
+        )
+    return "\n".join(parts)
+
+
+def load_trees(path):
+    if path is None:
+        return [ast.parse(synthetic_module())]
+    trees = []
+    for file_path in RepoLoader(path).load_python_files():
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                trees.append(ast.parse(f.read()))
+        except (SyntaxError, UnicodeDecodeError, ValueError):
+            continue
+    return trees
+
+
+def separate_walks(trees):
+    results = []
+    for tree in trees:
+        for cls in SYMBOL_DETECTORS + WALKER_DETECTORS:
+            results.append(cls(tree).run())
+    return results
+
+
+def fused_walk(trees):
+    results = []
+    for tree in trees:
+        symbols = SymbolTable(tree)
+        results.extend(cls(tree, symbols).run() for cls in SYMBOL_DETECTORS)
+        detectors = [cls(tree) for cls in WALKER_DETECTORS]
+        FusedWalker(detectors).walk(tree)
+        results.extend(d.finalize() for d in detectors)
+    return results
+
+
+def best_of(func, trees, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(trees)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    trees = load_trees(args.path)
+    nodes = sum(1 for tree in trees for _ in ast.walk(tree))
+
+    separate_time, separate_result = best_of(separate_walks, trees, args.repeat)
+    fused_time, fused_result = best_of(fused_walk, trees, args.repeat)
+
+    if separate_result != fused_result:
+        raise SystemExit("Shared-pass results differ from per-detector results")
+
+    print("=== FUSED DISPATCH BENCHMARK ===")
+    print(f"Files: {len(trees)}  AST nodes: {nodes}")
+    print(f"Per-detector passes: {separate_time * 1000:.1f} ms")
+    print(f"Shared passes:       {fused_time * 1000:.1f} ms")
+    print(f"Speedup:             {separate_time / fused_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
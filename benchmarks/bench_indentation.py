@@ -0,0 +1,112 @@
+"""
+Benchmark: token-based IndentationDetector on multi-megabyte files
+
+Usage:
+    python -m benchmarks.bench_indentation [--mb 4] [--seed 0] [--repeat 3]
+
+Generates one module of about --mb MiB (long functions, continuation
+lines, multi-line strings, a tab-indented block) and times:
+- the legacy line scan ("more than 4 spaces" per line, for reference)
+- one TokenStream pass (C tokenizer on CPython 3.11, tokenize elsewhere)
+- IndentationDetector over the shared stream
+- the same with the pure-Python tokenize backend
+"""
+import argparse
+import random
+
+import core.tokens as tokens
+from core.detectors import IndentationDetector
+from core.tokens import TokenStream
+
+from benchmarks.corpus import huge_module
+from benchmarks.suite import timed
+
+LAYOUT_BLOCK = '''
+def layout_{i}(a, b):
+    total = compute(a,
+                    b,
+                    {i})
+    doc = """
+            indented text inside a string
+    """
+    return (total +
+            len(doc))
+
+
+class Tabbed_{i}:
+\tdef method(self):
+\t\treturn {i}
+'''
+
+
+def generate(mb, seed):
+    rng = random.Random(seed)
+    target = mb * 1024 * 1024
+    parts = []
+    size = 0
+    i = 0
+    while size < target:
+        chunk = huge_module(rng, statements=1000) + LAYOUT_BLOCK.format(i=i)
+        parts.append(chunk.replace("def huge_0", f"def huge_{i}"))
+        size += len(chunk)
+        i += 1
+    return "".join(parts)
+
+
+def legacy_line_scan(code):
+    """The previous IndentationDetector rule, kept here for comparison."""
+    stack = [0]
+    flagged = 0
+    for line in code.split("\n"):
+        stripped = line.lstrip()
+        if not stripped:
+            continue
+        indent = len(line) - len(stripped)
+        if indent > stack[-1] + 4:
+            flagged += 1
+        if indent > stack[-1]:
+            stack.append(indent)
+        elif indent < stack[-1]:
+            while stack and indent < stack[-1]:
+                stack.pop()
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    code = generate(args.mb, args.seed)
+    mib = len(code.encode("utf-8")) / (1024 * 1024)
+    stream = TokenStream(code)
+
+    legacy = timed(lambda: legacy_line_scan(code), args.repeat)
+    tokenize_time = timed(lambda: TokenStream(code), args.repeat)
+    detect = timed(lambda: IndentationDetector(code, stream).run(), args.repeat)
+
+    c_backend = tokens._CTokenizer
+    tokens._CTokenizer = None
+    try:
+        python_time = timed(lambda: IndentationDetector(code).run(), 1)
+    finally:
+        tokens._CTokenizer = c_backend
+
+    issues = IndentationDetector(code, stream).run()
+    kinds = {}
+    for issue in issues:
+        kinds[issue.type] = kinds.get(issue.type, 0) + 1
+
+    print("=== INDENTATION BENCHMARK ===")
+    print(f"Source: {mib:.1f} MiB, {code.count(chr(10)):,} lines, {len(stream):,} tokens")
+    print(f"Legacy line scan:        {legacy * 1000:9.1f} ms  ({legacy_line_scan(code)} reports)")
+    print(f"TokenStream pass:        {tokenize_time * 1000:9.1f} ms  ({mib / tokenize_time:.1f} MiB/s)"
+          f"{'  [C tokenizer]' if c_backend else ''}")
+    print(f"Detector (shared stream):{detect * 1000:9.1f} ms  ({len(issues)} reports: {kinds})")
+    print(f"Detector (pure tokenize):{python_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
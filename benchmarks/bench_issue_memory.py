@@ -0,0 +1,77 @@
+"""
+Benchmark: memory of slotted Issue records vs. the old per-issue dicts
+
+Usage:
+    python -m benchmarks.bench_issue_memory [--issues N] [--files N]
+
+Issues are built the way a scan produces them: a handful of types and
+severities, one path string per file arriving from a separate source
+(worker results, cache rows), and a unique message per issue.
+"""
+import argparse
+import tracemalloc
+
+from core.issue import Issue
+
+TYPES = [
+    ("UndefinedVariable", "HIGH"),
+    ("UnusedVariable", "LOW"),
+    ("DuplicateAssignment", "MEDIUM"),
+    ("UnreachableCode", "MEDIUM"),
+]
+
+
+def _raw_fields(count, files):
+    for i in range(count):
+        issue_type, severity = TYPES[i % len(TYPES)]
+        # "".join builds new string objects, as decoding JSON or pickles would
+        yield (
+            "".join(issue_type),
+            f"Variable 'name_{i}' assigned but never used",
+            i % 5000 + 1,
+            "".join(f"src/package/module_{i % files}.py"),
+            "".join(severity),
+        )
+
+
+def build_dicts(count, files):
+    return [
+        {"type": t, "message": m, "line": l, "file": f, "severity": s}
+        for t, m, l, f, s in _raw_fields(count, files)
+    ]
+
+
+def build_issues(count, files):
+    return [
+        Issue(t, m, line=l, file=f, severity=s)
+        for t, m, l, f, s in _raw_fields(count, files)
+    ]
+
+
+def measure(builder, count, files):
+    tracemalloc.start()
+    data = builder(count, files)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--issues", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=2_000)
+    args = parser.parse_args()
+
+    dict_bytes = measure(build_dicts, args.issues, args.files)
+    issue_bytes = measure(build_issues, args.issues, args.files)
+
+    print("=== ISSUE MEMORY BENCHMARK ===")
+    print(f"Issues: {args.issues}  Files: {args.files}")
+    print(f"dict records:  {dict_bytes / 1e6:8.1f} MB  ({dict_bytes / args.issues:.0f} B/issue)")
+    print(f"Issue records: {issue_bytes / 1e6:8.1f} MB  ({issue_bytes / args.issues:.0f} B/issue)")
+    print(f"Reduction:     {1 - issue_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
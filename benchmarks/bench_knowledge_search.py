@@ -0,0 +1,102 @@
+"""
+Benchmark: indexed knowledge-base lookups and BM25 search
+
+Usage:
+    python -m benchmarks.bench_knowledge_search [--entries N] [--queries N]
+
+The shipped knowledge.json is grown to N entries: each one copies the
+fields of a shipped entry and gets its own explanation, drawn from the
+shipped explanations' words plus a synthetic vocabulary with a Zipf
+distribution (as in natural text). The knowledge snapshot (entries and
+KnowledgeIndex) is then built, loaded back, compared with parsing the
+JSON alone, and queried with detector messages. Category lookups
+are compared with the linear scan they replace.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from core import snapshot
+from rag.index import KnowledgeIndex, build_snapshot, INDEX_VERSION
+
+KNOWLEDGE = Path(__file__).resolve().parent.parent / "rag" / "knowledge.json"
+QUERIES = (
+    "Variable 'x' used before assignment",
+    "Variable 'x' assigned but never used",
+    "Security violation: use of eval()",
+    "Infinite loop risk: while True without break",
+    "This statement will never execute",
+)
+SYNTHETIC_WORDS = 20000
+
+
+def grow(db, entries, seed):
+    rng = random.Random(seed)
+    base = [(key, entry) for key, entry in db.items() if not key.startswith("_")]
+    words = sorted({word for _, entry in base
+                    for text in (entry.get("explanation") or {}).values() for word in text.split()})
+    words += [f"term{chr(97 + n % 26)}{chr(97 + n // 26 % 26)}{chr(97 + n // 676)}"
+              for n in range(SYNTHETIC_WORDS)]
+    rank_weights = [1 / (rank + 1) for rank in range(len(words))]
+    rng.shuffle(words)
+
+    grown = {"_meta": db.get("_meta", {})}
+    for i in range(entries):
+        key, entry = base[i % len(base)]
+        entry = json.loads(json.dumps(entry))
+        short, detail = (" ".join(rng.choices(words, rank_weights, k=n)) for n in (8, 30))
+        entry["explanation"] = {"short": short, "detail": detail}
+        grown[f"{key}{i}"] = entry
+    return grown
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db = grow(json.loads(KNOWLEDGE.read_bytes()), args.entries, args.seed)
+    data = json.dumps(db).encode("utf-8")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "knowledge.json"
+        path.write_bytes(data)
+
+        start = time.perf_counter()
+        snapshot.load_json(str(path), build_snapshot, INDEX_VERSION)  # builds and saves
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        payload = snapshot.load_json(str(path), build_snapshot, INDEX_VERSION)
+        index = KnowledgeIndex.from_dict(payload["index"])
+        load = time.perf_counter() - start
+        size = os.path.getsize(snapshot.snapshot_path(str(path)))
+        parse = timed(lambda: json.loads(path.read_bytes()), 3)
+
+    turn = iter(range(10 ** 9))
+    search = timed(lambda: index.search(QUERIES[next(turn) % len(QUERIES)], 5), args.queries)
+    lookup = timed(lambda: index.lookup("category", "Semantic"), args.queries)
+    scan = timed(lambda: [k for k, v in db.items() if v.get("category") == "Semantic"], 200)
+
+    print("=== KNOWLEDGE SEARCH BENCHMARK ===")
+    print(f"Entries: {args.entries}  Terms: {len(index.postings)}  Snapshot: {size / 1024:.0f} KiB")
+    print(f"build + save:      {build * 1000:8.2f} ms")
+    print(f"snapshot load:     {load * 1000:8.2f} ms  (json.loads alone {parse * 1000:.2f} ms)")
+    print(f"search top-5:      {search * 1e6:8.1f} us/query")
+    print(f"category lookup:   {lookup * 1e6:8.1f} us  (linear scan {scan * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: cold start of a scan, and what it imports
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat N] [--max-ms MS]
+
+Times `python -m core.engine` over a one-file repository in fresh
+interpreters (bytecode compiled beforehand), reports the import time of
+core.engine from -X importtime, and checks that the scan does not import
+subsystems it never uses (fixer, validator, rag, sqlite3, the process
+pool). The exit status is 1 if one of them is imported or the best cold
+start is above --max-ms.
+"""
+import argparse
+import compileall
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a serial scan without --cache must not import
+LAZY_MODULES = ("fixer", "validator", "rag", "sqlite3", "subprocess",
+                "concurrent.futures.process")
+
+_PROBE = (
+    "import runpy, sys\n"
+    "sys.argv = ['core.engine', sys.argv[1]]\n"
+    "runpy.run_module('core.engine', run_name='__main__')\n"
+    "print('\\n'.join(sys.modules), file=sys.stderr)\n"
+)
+
+
+def _env():
+    return dict(os.environ, PYTHONPATH=ROOT)
+
+
+def compile_packages():
+    # Time imports, not compilation (PYTHONDONTWRITEBYTECODE would leave .pyc stale)
+    for package in ("core", "fixer", "validator", "rag"):
+        compileall.compile_dir(os.path.join(ROOT, package), quiet=1)
+
+
+def one_file_repo(directory):
+    with open(os.path.join(directory, "module.py"), "w", encoding="utf-8") as f:
+        f.write("def main():\n    value = 1\n    return value\n")
+    return directory
+
+
+def cold_start(repo, repeat):
+    """Best wall time of a whole `python -m core.engine repo` run, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "core.engine", repo], cwd=ROOT, env=_env(),
+                       stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cold_start_python():
+    """Wall time of a bare interpreter start, the floor of any cold start."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def import_time(module):
+    """Cumulative import time of module in a fresh interpreter, in seconds."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=_env(), capture_output=True, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s*\d+ \|\s*(\d+) \| (\S+)$", line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1e6
+    return 0.0
+
+
+def eager_imports(repo):
+    """Modules of LAZY_MODULES that a scan of repo imports."""
+    proc = subprocess.run([sys.executable, "-c", _PROBE, repo], cwd=ROOT, env=_env(),
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                          check=True)
+    return sorted(name for name in proc.stderr.split()
+                  if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the best cold start is slower than this")
+    args = parser.parse_args()
+
+    compile_packages()
+    with tempfile.TemporaryDirectory(prefix="debugger-startup-") as repo:
+        one_file_repo(repo)
+        bare = min(cold_start_python() for _ in range(args.repeat))
+        scan = cold_start(repo, args.repeat)
+        eager = eager_imports(repo)
+    engine_import = import_time("core.engine")
+
+    print("=== STARTUP BENCHMARK ===")
+    print(f"python -c pass:          {bare * 1000:8.1f} ms")
+    print(f"scan of a one-file repo: {scan * 1000:8.1f} ms")
+    print(f"import core.engine:      {engine_import * 1000:8.1f} ms")
+    print(f"lazy subsystems loaded:  {', '.join(eager) if eager else 'none'}")
+
+    failed = bool(eager)
+    if args.max_ms is not None and scan * 1000 > args.max_ms:
+        print(f"Cold start above the {args.max_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Reproducible synthetic Python corpora for benchmarks
+
+Every corpus is generated from a seed, so two runs with the same size and
+seed produce byte-identical files. Four shapes are mixed together:
+
+- deep:   deeply nested blocks and expressions
+- huge:   a few very long functions
+- small:  many small modules importing each other
+- broken: files with syntax errors (missing colons, unclosed parens, ...)
+"""
+import os
+import random
+
+# files per shape for each size preset
+SIZES = {
+    "small": {"deep": 2, "huge": 1, "small": 40, "broken": 5},
+    "medium": {"deep": 8, "huge": 4, "small": 400, "broken": 40},
+    "large": {"deep": 20, "huge": 10, "small": 2000, "broken": 200},
+}
+
+NAMES = ["alpha", "beta", "gamma", "delta", "total", "value", "item", "result", "data", "count"]
+
+
+def _name(rng):
+    return rng.choice(NAMES) + str(rng.randint(0, 9))
+
+
+def _statement(rng, indent, depth=0):
+    pad = "    " * indent
+    kind = rng.randint(0, 7)
+    target = _name(rng)
+    if kind == 0:
+        return f"{pad}{target} = {_name(rng)} + {rng.randint(0, 99)}"
+    if kind == 1:
+        return f"{pad}print({_name(rng)}, {target!r})"
+    if kind == 2:
+        return f"{pad}{target} = [x * 2 for x in range({rng.randint(1, 50)}) if x % 3]"
+    if kind == 3:
+        return f"{pad}{target} = {{'k': {_name(rng)}, 'n': len(str({rng.randint(0, 9)}))}}"
+    if kind == 4:
+        return f"{pad}{target}, {_name(rng)} = divmod({rng.randint(1, 99)}, 7)"
+    if kind == 5:
+        return f"{pad}{target} += 1" if depth else f"{pad}{target} = 0"
+    if kind == 6:
+        return f"{pad}{target} = lambda a, b=1: a * b + {rng.randint(0, 9)}"
+    return f"{pad}{target} = ({_name(rng)} if {_name(rng)} else None)"
+
+
+def deep_module(rng, depth=40, width=3):
+    """Nested if/for/with/try blocks `depth` levels deep, plus a deep expression."""
+    lines = ["import os", "", "def nested(arg0, arg1):"]
+    indent = 1
+    for level in range(depth):
+        for _ in range(width):
+            lines.append(_statement(rng, indent, level))
+        pad = "    " * indent
+        header = rng.choice([
+            f"if arg0 > {level}:",
+            f"for i{level} in range(arg1):",
+            f"with open(os.devnull) as fh{level}:",
+            "try:",
+            f"while arg0 < {level}:",
+        ])
+        lines.append(pad + header)
+        indent += 1
+        if header == "try:":
+            lines.append(_statement(rng, indent, level))
+            lines.append(pad + "except ValueError:")
+            lines.append("    " * indent + "pass")
+            lines.append(pad + "else:")
+    lines.append("    " * indent + "return arg0")
+    expression = "arg0"
+    for i in range(depth * 2):
+        expression = f"({expression} + {i})"
+    lines.append(f"DEEP = (lambda arg0: {expression})(1)")
+    return "\n".join(lines) + "\n"
+
+
+def huge_module(rng, statements=5000):
+    """A handful of functions with thousands of statements each."""
+    lines = ["import sys", ""]
+    per_function = 1000
+    for f in range(max(1, statements // per_function)):
+        lines.append(f"def huge_{f}(a, b, c):")
+        for i in range(per_function):
+            lines.append(_statement(rng, 1, i))
+            if i % 97 == 0:
+                lines.append("    if a:")
+                lines.append(_statement(rng, 2, i))
+        lines.append("    return a")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def small_module(rng, index, total):
+    """A short module that imports a sibling and defines a class and a function."""
+    other = rng.randrange(total)
+    return (
+        f"from mod_{other} import helper_{other}\n"
+        f"import os\n"
+        f"\n"
+        f"CONSTANT_{index} = {rng.randint(0, 1000)}\n"
+        f"\n"
+        f"class Model{index}:\n"
+        f"    def __init__(self, value):\n"
+        f"        self.value = value\n"
+        f"\n"
+        f"    def compute(self):\n"
+        f"{_statement(rng, 2)}\n"
+        f"        return self.value * CONSTANT_{index}\n"
+        f"\n"
+        f"def helper_{index}(x):\n"
+        f"{_statement(rng, 1)}\n"
+        f"    return os.path.join(str(x), str(CONSTANT_{index}))\n"
+    )
+
+
+BROKEN_SNIPPETS = [
+    "def broken(a, b)\n    return a + b\n",          # missing colon
+    "value = compute(1, 2\nprint(value)\n",          # unclosed paren
+    "if x = 5:\n    pass\n",                         # assignment in condition
+    "print 'hello'\n",                               # py2 print
+    "def f():\nreturn 1\n",                          # missing indent
+    "name = 'unterminated\n",                        # unclosed string
+    "class C:\n    def m(self):\n\tpass\n",          # mixed tabs/spaces
+]
+
+
+def broken_module(rng):
+    """Valid code with one or more syntax errors spliced between functions."""
+    parts = []
+    for i in range(rng.randint(2, 6)):
+        body = "\n".join(_statement(rng, 1) for _ in range(rng.randint(3, 12)))
+        parts.append(f"def ok_{i}(a):\n{body}\n    return a\n")
+        if rng.random() < 0.5:
+            parts.append(rng.choice(BROKEN_SNIPPETS))
+    parts.append(rng.choice(BROKEN_SNIPPETS))
+    return "\n".join(parts)
+
+
+def generate_sources(size="small", seed=0):
+    """Yield (relative path, source) pairs for a corpus preset."""
+    counts = SIZES[size]
+    rng = random.Random(seed)
+    for i in range(counts["deep"]):
+        yield f"deep/deep_{i}.py", deep_module(rng)
+    for i in range(counts["huge"]):
+        yield f"huge/huge_{i}.py", huge_module(rng)
+    total = counts["small"]
+    for i in range(total):
+        yield f"pkg/mod_{i}.py", small_module(rng, i, total)
+    for i in range(counts["broken"]):
+        yield f"broken/broken_{i}.py", broken_module(rng)
+
+
+def write_corpus(out_dir, size="small", seed=0):
+    """Write a corpus to out_dir and return the list of written paths."""
+    paths = []
+    for rel_path, source in generate_sources(size, seed):
+        path = os.path.join(out_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(source)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic benchmark corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    written = write_corpus(args.out_dir, args.size, args.seed)
+    print(f"Wrote {len(written)} files to {args.out_dir}")
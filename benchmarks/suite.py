@@ -0,0 +1,252 @@
+"""
+Benchmark suite: detectors, Analyzer, DebuggerEngine, fixer, validator and startup
+
+Usage:
+    python -m benchmarks.suite [--size small|medium|large] [--seed N]
+                               [--repeat N] [--out results.json]
+                               [--baseline baseline.json] [--tolerance 0.25]
+
+Generates a synthetic corpus (see benchmarks.corpus), times every stage
+and writes the timings as JSON. With --baseline, each timing is compared
+with the saved run and regressions beyond --tolerance are reported; the
+exit status is 1 when any benchmark regressed.
+"""
+import argparse
+import ast
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+
+import core.detectors as detectors
+from core import ast_cache
+from core.analyzer import Analyzer
+from core.detectors import ASTDetector, SymbolDetector, SyntaxDetector
+from core.engine import DebuggerEngine
+from fixer import apply_all_fixes
+from fixer.fix_agent import FixAgent
+from validator.validator import CodeValidator, validate_many
+
+from benchmarks.bench_startup import cold_start, compile_packages, one_file_repo
+from benchmarks.corpus import write_corpus, SIZES
+
+
+def detector_classes():
+    """Every detector exported by core.detectors, in export order."""
+    for name in detectors.__all__:
+        obj = getattr(detectors, name)
+        if isinstance(obj, type) and name.endswith("Detector") \
+                and obj not in (ASTDetector, SymbolDetector):
+            yield obj
+
+
+def timed(func, repeat):
+    """Best wall time of `repeat` runs, in seconds (GC paused, like timeit)."""
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def synthetic_fix_issues(source):
+    """Deterministic fixer input: one rule per third line, cycling rule ids."""
+    rule_ids = sorted(FixAgent().rules)
+    line_count = source.count("\n") + 1
+    return [
+        {"id": rule_ids[i % len(rule_ids)], "line": line}
+        for i, line in enumerate(range(1, line_count + 1, 3))
+    ]
+
+
+class Suite:
+    def __init__(self, corpus_dir, paths, repeat):
+        self.corpus_dir = corpus_dir
+        self.repeat = repeat
+        self.results = {}
+
+        self.sources = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                self.sources.append(f.read())
+
+        self.valid = []   # (source, tree)
+        self.broken = []  # source
+        for source in self.sources:
+            try:
+                self.valid.append((source, ast.parse(source)))
+            except SyntaxError:
+                self.broken.append(source)
+
+    def record(self, name, func, items):
+        seconds = timed(func, self.repeat)
+        self.results[name] = {"seconds": round(seconds, 6), "items": items}
+        print(f"{name:<40} {seconds * 1000:10.2f} ms  ({items} items)")
+
+    # -------------------------------------------------
+    # Stages
+    # -------------------------------------------------
+    def bench_detectors(self):
+        for cls in detector_classes():
+            if issubclass(cls, (ASTDetector, SymbolDetector)):
+                trees = [tree for _, tree in self.valid]
+                self.record(f"detector.{cls.__name__}",
+                            lambda: [cls(tree).run() for tree in trees], len(trees))
+            elif cls is SyntaxDetector:
+                self.record(f"detector.{cls.__name__}",
+                            lambda: [cls(src).run() for src in self.broken], len(self.broken))
+            else:
+                texts = [source for source, _ in self.valid]
+                self.record(f"detector.{cls.__name__}",
+                            lambda: [cls(text).run() for text in texts], len(texts))
+
+    def bench_analyzer(self):
+        self.record("analyzer.analyze",
+                    lambda: [Analyzer(src).analyze() for src in self.sources],
+                    len(self.sources))
+        self.record("analyzer.recover",
+                    lambda: [Analyzer(src, recover=True).analyze() for src in self.broken],
+                    len(self.broken))
+
+    def bench_engine(self):
+        self.record("engine.run",
+                    lambda: DebuggerEngine(self.corpus_dir).run(),
+                    len(self.sources))
+
+    def bench_fixer(self):
+        jobs = [(src, synthetic_fix_issues(src)) for src in self.sources]
+        self.fixed_pairs = [(src, apply_all_fixes(src, issues)[0]) for src, issues in jobs]
+        self.record("fixer.apply_all_fixes",
+                    lambda: [apply_all_fixes(src, issues) for src, issues in jobs],
+                    len(jobs))
+
+    def bench_validator(self):
+        # Unchanged valid files plus every fix result that still parses
+        pairs = [(source, source) for source, _ in self.valid]
+        for orig, fixed in self.fixed_pairs:
+            try:
+                ast.parse(fixed)
+            except SyntaxError:
+                continue
+            pairs.append((orig, fixed))
+        self.record("validator.validate",
+                    lambda: [CodeValidator(orig, fixed).validate() for orig, fixed in pairs],
+                    len(pairs))
+        self.record("validator.validate_many",
+                    lambda: list(validate_many(pairs)),
+                    len(pairs))
+
+    def bench_ast_cache(self):
+        # Analyzer over a warm cache, big enough for the whole corpus: every
+        # parse is a hit, so this is the cost the cache leaves per file
+        budget = sum(map(len, self.sources)) * ast_cache.AST_BYTES_PER_SOURCE_BYTE
+        ast_cache.configure(budget + ast_cache.ERROR_COST * len(self.broken))
+        try:
+            for src in self.sources:
+                Analyzer(src).analyze()
+            self.record("ast_cache.analyze_hit",
+                        lambda: [Analyzer(src).analyze() for src in self.sources],
+                        len(self.sources))
+        finally:
+            ast_cache.configure(0)
+            ast_cache.get_ast_cache().clear()
+
+    def bench_startup(self):
+        # A fresh interpreter per run: catches modules that slow down every scan
+        compile_packages()
+        with tempfile.TemporaryDirectory(prefix="debugger-startup-") as repo:
+            one_file_repo(repo)
+            self.record("startup.engine_scan", lambda: cold_start(repo, 1), 1)
+
+    def run(self):
+        # The process-wide ast_cache is off: with it, every repeat after the
+        # first would time cache hits instead of parsing
+        budget = ast_cache.get_ast_cache().max_bytes
+        ast_cache.configure(0)
+        try:
+            self.bench_detectors()
+            self.bench_analyzer()
+            self.bench_engine()
+            self.bench_fixer()
+            self.bench_validator()
+            self.bench_ast_cache()
+            self.bench_startup()
+        finally:
+            ast_cache.configure(budget)
+        return self.results
+
+
+def compare(results, baseline, tolerance):
+    """Print per-benchmark ratios; return the names that regressed."""
+    regressions = []
+    print("\n=== COMPARISON WITH BASELINE ===")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or not base["seconds"]:
+            print(f"{name:<40} {'(new)':>10}")
+            continue
+        ratio = current["seconds"] / base["seconds"]
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            status = "faster"
+        print(f"{name:<40} {ratio:9.2f}x  {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="write timings JSON here")
+    parser.add_argument("--baseline", default=None, help="compare with a saved timings JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a regression is reported")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="debugger-bench-") as corpus_dir:
+        paths = write_corpus(corpus_dir, args.size, args.seed)
+        print(f"=== BENCHMARK SUITE: {args.size} corpus, {len(paths)} files, seed {args.seed} ===")
+        results = Suite(corpus_dir, paths, args.repeat).run()
+
+    report = {
+        "meta": {
+            "size": args.size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nTimings written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("size") != args.size:
+            print("Warning: baseline was recorded on a different corpus size")
+        if compare(results, baseline["results"], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
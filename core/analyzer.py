@@ -1,84 +1,162 @@
-import ast
-from core.detectors import (
-    SyntaxDetector,
-    IndentationDetector,
-    UndefinedVarDetector,
-    UnusedVarDetector,
-    DuplicateAssignDetector,
-    UnreachableCodeDetector
-)
-
-class Analyzer:
-    """
-    Core Analyzer Engine
-    - Parses code with AST
-    - Runs all detectors
-    - Returns a structured list of issues
-    """
-
-    def __init__(self, code):
-        self.code = code
-        self.tree = None
-        self.issues = []
-
-    # -------------------------------------------------
-    # Step 1: Parse code into AST
-    # -------------------------------------------------
-    def parse(self):
-        try:
-            self.tree = ast.parse(self.code)
-            return True
-        except SyntaxError as e:
-            # Run SyntaxDetector if parse fails
-            syntax_issues = SyntaxDetector(self.code).run()
-            self.issues.extend(syntax_issues)
-            return False
-
-    # -------------------------------------------------
-    # Step 2: Run all detectors
-    # -------------------------------------------------
-    def run_detectors(self):
-        if not self.tree:
-            return
-
-        detectors = [
-            UndefinedVarDetector(self.tree),
-            UnusedVarDetector(self.tree),
-            DuplicateAssignDetector(self.tree),
-            UnreachableCodeDetector(self.tree),
-            IndentationDetector(self.code)
-        ]
-
-        for detector in detectors:
-            self.issues.extend(detector.run())
-
-    # -------------------------------------------------
-    # Step 3: Main API
-    # -------------------------------------------------
-    def analyze(self):
-        """
-        Analyze the code and return all issues
-        """
-        if self.parse():
-            self.run_detectors()
-        return self.issues
-
-
-# -------------------------------------------------
-# Quick test (standalone)
-# -------------------------------------------------
-if __name__ == "__main__":
-    sample_code = """
-x = 10
-y = 0
-print(z)  # undefined
-x = 5    # duplicate
-while True:
-    print(x / y)  # runtime risk (division by zero)
-def func(a, b, c, d, e, f, g):
-    pass
-"""
-    analyzer = Analyzer(sample_code)
-    results = analyzer.analyze()
-    for issue in results:
-        print(issue)
+from core import ast_cache
+from core.source import decode_source
+from core.profiling import NULL_PROFILE
+from core.detectors import (
+    SyntaxDetector,
+    IndentationDetector,
+    UndefinedVarDetector,
+    UnusedVarDetector,
+    DuplicateAssignDetector,
+    UnreachableCodeDetector,
+    FusedWalker
+)
+from core.symbols import SymbolTable
+from core.recovery import recover
+from core.tokens import TokenStream
+
+# Bump when analyzer output changes in a way the source hash cannot see
+ANALYZER_VERSION = "1.2.0"
+
+
+class Analyzer:
+    """
+    Core Analyzer Engine
+    - Parses code with AST
+    - Builds one symbol table for the name-based detectors
+    - Runs the remaining AST detectors in a single fused walk
+    - Returns a structured list of issues
+
+    code may be text or raw bytes (bytes / mmap); raw bytes are handed
+    straight to ast.parse and only decoded for text-based detectors.
+    profile: optional FileProfile collecting per-phase / per-detector times.
+    star_names: names this file's `from x import *` statements bind, as
+    resolved by a ModuleIndex; None when unknown.
+    recover: on a syntax error, report one error per broken top-level
+    block and still analyze the blocks that parse (see core.recovery).
+    Parsing goes through the process-wide core.ast_cache, so a source
+    parsed before (by CodeValidator, a ModuleIndex, ...) is not parsed again.
+    """
+
+    def __init__(self, code, profile=None, star_names=None, recover=False):
+        self.code = code
+        self.star_names = star_names
+        self.recover = recover
+        self.opaque_names = ()
+        self._tokens = None
+        self.tree = None
+        self.issues = []
+        self.profile = profile or NULL_PROFILE
+        self._text = code if isinstance(code, str) else None
+
+    @property
+    def text(self):
+        """Decoded source, honoring the PEP 263 cookie / BOM of raw bytes."""
+        if self._text is None:
+            self._text = decode_source(self.code)
+        return self._text
+
+    @property
+    def tokens(self):
+        """TokenStream of the source: one tokenize pass shared by token-level checks."""
+        if self._tokens is None:
+            with self.profile.phase("tokenize"):
+                self._tokens = TokenStream(self.text)
+        return self._tokens
+
+    # -------------------------------------------------
+    # Step 1: Parse code into AST
+    # -------------------------------------------------
+    def parse(self):
+        profile = self.profile
+        try:
+            with profile.phase("parse"):
+                self.tree = ast_cache.parse(self.code)
+            return True
+        except SyntaxError as e:
+            if self.recover and self._recover(e):
+                return bool(self.tree.body)
+
+            # SyntaxDetector reports the error this parse already raised
+            with profile.phase("syntax"), profile.detector("SyntaxDetector"):
+                self.issues.append(SyntaxDetector.issue_from_error(e))
+            return False
+
+    def _recover(self, error):
+        try:
+            text = self.text
+        except (SyntaxError, UnicodeDecodeError):
+            return False  # undecodable: nothing to split
+
+        with self.profile.phase("recovery"), self.profile.detector("SyntaxDetector"):
+            recovered = recover(text, error)
+        self.issues.extend(recovered.issues)
+        self.tree = recovered.tree
+        self.opaque_names = recovered.opaque_names
+        return True
+
+    # -------------------------------------------------
+    # Step 2: Run all detectors
+    # -------------------------------------------------
+    def run_detectors(self):
+        if not self.tree:
+            return
+
+        profile = self.profile
+
+        with profile.phase("symbols"):
+            symbols = SymbolTable(self.tree, self.opaque_names)
+
+        with profile.phase("ast_detectors"):
+            # Name-based detectors only query the shared symbol table
+            for detector in (
+                UndefinedVarDetector(self.tree, symbols, self.star_names),
+                UnusedVarDetector(self.tree, symbols),
+                DuplicateAssignDetector(self.tree, symbols),
+            ):
+                with profile.detector(type(detector).__name__):
+                    self.issues.extend(detector.run())
+
+            # One traversal feeds every walker-based detector
+            ast_detectors = [UnreachableCodeDetector(self.tree)]
+            walker = FusedWalker(ast_detectors, profile)
+            walker.walk(self.tree)
+            profile.add_nodes(walker.nodes_visited)
+
+            for detector in ast_detectors:
+                with profile.detector(type(detector).__name__):
+                    self.issues.extend(detector.finalize())
+
+        tokens = self.tokens
+        with profile.phase("indentation"), profile.detector("IndentationDetector"):
+            self.issues.extend(IndentationDetector(self.text, tokens).run())
+
+    # -------------------------------------------------
+    # Step 3: Main API
+    # -------------------------------------------------
+    def analyze(self):
+        """
+        Analyze the code and return all issues
+        """
+        if self.parse():
+            self.run_detectors()
+        return self.issues
+
+
+# -------------------------------------------------
+# Quick test (standalone)
+# -------------------------------------------------
+if __name__ == "__main__":
+    sample_code = """
+x = 10
+y = 0
+print(z)  # undefined
+x = 5    # duplicate
+while True:
+    print(x / y)  # runtime risk (division by zero)
+def func(a, b, c, d, e, f, g):
+    pass
+"""
+    analyzer = Analyzer(sample_code)
+    results = analyzer.analyze()
+    for issue in results:
+        print(issue)
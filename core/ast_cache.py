@@ -0,0 +1,137 @@
+import ast
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# A parsed tree takes about 30 bytes of memory per byte of source
+# (measured with tracemalloc on the stdlib); entries are charged that much
+AST_BYTES_PER_SOURCE_BYTE = 30
+# A cached SyntaxError only holds its message and one line
+ERROR_COST = 1024
+
+
+class ASTCache:
+    """
+    Bounded LRU of parsed modules, keyed by a hash of the source
+    - parse(source) is ast.parse(source) that parses each content once
+    - a SyntaxError is cached too and raised again (as a copy) on a hit,
+      so a failed parse is not repeated by the next component either
+    - entries are charged an estimate of their tree size; the least
+      recently used ones are evicted above max_bytes (0 disables caching)
+    - text and raw bytes are keyed apart: bytes honor an encoding cookie
+    - trees are shared between callers and must not be modified
+    Kept trees are extra work for the garbage collector (about 10% of scan
+    time per 8 MiB kept), so a scan that parses every file once should
+    run with the cache off (see DebuggerEngine's ast_cache_bytes).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (tree or SyntaxError, cost)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source):
+        if isinstance(source, str):
+            return "s" + hashlib.blake2b(source.encode("utf-8", "surrogatepass")).hexdigest()
+        return "b" + hashlib.blake2b(source).hexdigest()
+
+    def parse(self, source):
+        """ast.parse(source), from the cache when the same content was parsed before."""
+        if self.max_bytes <= 0:
+            self.misses += 1
+            return ast.parse(source)
+
+        key = self.key(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            try:
+                result = ast.parse(source)
+                cost = len(source) * AST_BYTES_PER_SOURCE_BYTE
+            except SyntaxError as e:
+                # without its traceback the error does not keep frames alive
+                result = e.with_traceback(None)
+                cost = ERROR_COST
+            entry = (result, cost)
+            self._store(key, entry)
+
+        result = entry[0]
+        if isinstance(result, SyntaxError):
+            raise copy.copy(result)
+        return result
+
+    def _store(self, key, entry):
+        cost = entry[1]
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = entry
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, (_, old_cost) = self._entries.popitem(last=False)
+                self.size -= old_cost
+                self.evictions += 1
+
+    def resize(self, max_bytes):
+        """Change the memory budget, evicting down to it."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self.size > max(max_bytes, 0):
+                _, (_, old_cost) = self._entries.popitem(last=False)
+                self.size -= old_cost
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# One cache per process: Analyzer, SyntaxDetector and CodeValidator share it
+_cache = ASTCache()
+
+
+def get_ast_cache():
+    return _cache
+
+
+def configure(max_bytes):
+    """Set the memory budget of the process-wide cache (0 disables it)."""
+    _cache.resize(max_bytes)
+    return _cache
+
+
+def parse(source):
+    """ast.parse through the process-wide cache."""
+    return _cache.parse(source)
@@ -0,0 +1,205 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+
+from core.analyzer import ANALYZER_VERSION
+from core.issue import Issue
+
+DEFAULT_CACHE_DIR = ".debugger_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_FILENAME = "results.sqlite"
+
+# Modules of core/ whose code decides analysis results (besides detectors/)
+ANALYSIS_SOURCES = ("analyzer.py", "symbols.py", "recovery.py", "tokens.py")
+
+# Pending writes are flushed in one transaction once this many pile up
+FLUSH_EVERY = 500
+
+
+@lru_cache(maxsize=None)
+def detector_fingerprint():
+    """
+    Fingerprint of the analysis code: version + source of the analysis modules and detectors.
+    Any change to a detector invalidates every cached result.
+    """
+    core_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(core_dir, name) for name in ANALYSIS_SOURCES]
+    sources += sorted(glob.glob(os.path.join(core_dir, "detectors", "*.py")))
+
+    digest = hashlib.sha256(ANALYZER_VERSION.encode("utf-8"))
+    for path in sources:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_report(hits, misses):
+    """Hit/miss summary shared by the cache and the engine."""
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def content_digest(data):
+    """Content hash of one file's raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_key(data, context=None):
+    """
+    Cache key for one file's raw bytes under the current fingerprint.
+    context: other inputs the result depends on (e.g. names bound by star
+    imports from other files); any iterable of strings.
+    """
+    key = f"{detector_fingerprint()}:{content_digest(data)}"
+    if context:
+        extra = hashlib.sha256("\0".join(sorted(context)).encode("utf-8")).hexdigest()[:16]
+        key = f"{key}:{extra}"
+    return key
+
+
+class ResultCache:
+    """
+    Persistent per-file Analyzer result cache
+    - Keyed by content hash + detector fingerprint
+    - Backed by SQLite in WAL mode so parallel jobs can share one cache
+    - Bounded by payload size, least recently used entries are evicted first
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._pending = {}  # key -> (payload, size)
+        self._touched = set()
+
+        # sqlite3 is only imported by scans that use the cache
+        import sqlite3
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self._conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " issues TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)"
+        )
+
+    # -------------------------------------------------
+    # Lookup / store
+    # -------------------------------------------------
+    def get(self, key):
+        """Return the cached list of Issues for key, or None on a miss."""
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return self._decode(pending[0])
+
+        row = self._conn.execute(
+            "SELECT issues FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.add(key)
+        return self._decode(row[0])
+
+    def put(self, key, issues):
+        payload = json.dumps([issue.to_dict() for issue in issues], separators=(",", ":"))
+        self._pending[key] = (payload, len(payload))
+        if len(self._pending) + len(self._touched) >= FLUSH_EVERY:
+            self.flush()
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def flush(self):
+        """Write pending entries and access times in a single transaction."""
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, issues, size, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                [(k, p, s, now) for k, (p, s) in self._pending.items()]
+            )
+            self._conn.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(now, k) for k in self._touched]
+            )
+        self._pending.clear()
+        self._touched.clear()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes."""
+        with self._transaction():
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+
+            # Evict down to 90% so the next run does not evict again at once
+            target = total - int(self.max_bytes * 0.9)
+            freed = 0
+            doomed = []
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used"
+            ):
+                doomed.append((key,))
+                freed += size
+                if freed >= target:
+                    break
+            self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+            return len(doomed)
+
+    def close(self):
+        self.flush()
+        self.evict()
+        self._conn.close()
+
+    @staticmethod
+    def _decode(payload):
+        return [Issue.from_dict(data) for data in json.loads(payload)]
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    # -------------------------------------------------
+    # Reporting
+    # -------------------------------------------------
+    def stats(self):
+        return cache_report(self.hits, self.misses)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, so concurrent writers queue on the lock."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
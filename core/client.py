@@ -0,0 +1,251 @@
+"""
+Thin client of the analysis daemon (python -m core.daemon)
+
+Usage:
+    python -m core.client [--socket PATH] [--start] analyze FILE... [--recover] [--explain] [--json]
+    python -m core.client analyze --stdin NAME < buffer.py
+    python -m core.client fix FILE... [--write] [--recover]
+    python -m core.client validate ORIGINAL FIXED
+    python -m core.client stats | ping | shutdown
+
+Imports nothing beyond the standard library, so a call costs an
+interpreter start and a round trip. analyze exits with status 1 when it
+reports issues (for pre-commit hooks); --start launches the daemon in
+the background when none is listening.
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# Next to the analysis cache (core.cache.DEFAULT_CACHE_DIR)
+DEFAULT_SOCKET = os.path.join(".debugger_cache", "daemon.sock")
+START_TIMEOUT = 30.0
+
+
+class DaemonError(Exception):
+    """The daemon is unreachable or answered a request with an error."""
+
+
+class DaemonClient:
+    """
+    One connection to the daemon; requests are sent one at a time
+    - request(op, **params) returns the result or raises DaemonError
+    - usable as a context manager (closes the connection)
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, timeout=None):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(socket_path)
+        except OSError as e:
+            self.sock.close()
+            raise DaemonError(f"no daemon on {socket_path} ({e.strerror or e}); "
+                              f"start one with: python -m core.daemon") from e
+        self.stream = self.sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def request(self, op, **params):
+        request_id = next(self._ids)
+        self.stream.write(json.dumps(dict(params, id=request_id, op=op)).encode("utf-8") + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise DaemonError("the daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error") or "request failed")
+        return response["result"]
+
+    def analyze(self, paths, recover=False, explain=False):
+        return self.request("analyze", paths=[os.path.abspath(p) for p in paths],
+                            recover=recover, explain=explain)
+
+    def analyze_code(self, code, recover=False, explain=False, buffer=None):
+        """buffer: name of the editor buffer code holds; the daemon then only
+        analyzes the definitions changed since the last call for that name."""
+        if buffer is not None:
+            return self.request("analyze", code=code, buffer=buffer, recover=recover,
+                                explain=explain)
+        return self.request("analyze", code=code, recover=recover, explain=explain)
+
+    def fix(self, paths, write=False, recover=False):
+        return self.request("fix", paths=[os.path.abspath(p) for p in paths],
+                            write=write, recover=recover)
+
+    def fix_code(self, code, recover=False):
+        return self.request("fix", code=code, recover=recover)
+
+    def validate(self, original, fixed):
+        return self.request("validate", original=original, fixed=fixed)
+
+    def stats(self):
+        return self.request("stats")
+
+    def ping(self):
+        return self.request("ping")
+
+    def shutdown(self):
+        return self.request("shutdown")
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def start_daemon(socket_path=DEFAULT_SOCKET, timeout=START_TIMEOUT):
+    """Launch python -m core.daemon in the background and wait until it answers."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (root, env.get("PYTHONPATH"))))
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    log = open(os.path.splitext(socket_path)[0] + ".log", "ab")
+    with log:
+        subprocess.Popen([sys.executable, "-m", "core.daemon", "--socket", socket_path],
+                         stdin=subprocess.DEVNULL, stdout=log, stderr=log, env=env,
+                         start_new_session=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return DaemonClient(socket_path)
+        except DaemonError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def print_issues(issues):
+    for issue in issues:
+        print(f"{issue.get('file')}:{issue.get('line', '-')}: [{issue['severity']}] "
+              f"{issue['type']}: {issue['message']}")
+        knowledge = issue.get("knowledge")
+        if knowledge and knowledge.get("short"):
+            print(f"    {knowledge['short']}")
+
+
+def print_fixes(result):
+    for entry in result["files"]:
+        line = f"{entry['status']:<12} {entry['path']}  issues: {entry['issues_found']}"
+        if entry.get("issues_remaining") is not None:
+            line += f" -> {entry['issues_remaining']}"
+        if entry.get("reason"):
+            line += f"  ({entry['reason']})"
+        print(line)
+    if result.get("run_id"):
+        print(f"Undo with: python -m validator.rollback restore {result['run_id']}")
+
+
+def print_stats(stats):
+    cache = stats["result_cache"]
+    buffers = stats["buffers"]
+    print(f"pid {stats['pid']}  up {stats['uptime']:.0f} s  workers {stats['workers']}  "
+          f"in flight {stats['in_flight']}")
+    print(f"result cache: {cache['entries']} entries, {cache['hits']} hits, "
+          f"{cache['misses']} misses, hit rate {cache['hit_rate']:.1%}")
+    print(f"buffers: {buffers['open']} open, {buffers['segments_reused']} segments reused, "
+          f"{buffers['segments_analyzed']} analyzed, {buffers['full_analyses']} full analyses")
+    for op, entry in stats["requests"].items():
+        line = f"{op:<10} {entry['count']:>8} requests {entry['errors']:>5} errors"
+        if "p50_ms" in entry:
+            line += (f"  p50 {entry['p50_ms']:.2f} ms  p95 {entry['p95_ms']:.2f} ms"
+                     f"  max {entry['max_ms']:.2f} ms")
+        print(line)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.client",
+        description="Send analyze/fix/validate requests to the analysis daemon"
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help=f"Unix socket of the daemon (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--start", action="store_true",
+                        help="Start the daemon in the background if none is running")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON result")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="Report the issues of files")
+    analyze.add_argument("files", nargs="*")
+    analyze.add_argument("--stdin", metavar="NAME",
+                         help="Analyze the buffer read from standard input, named NAME "
+                              "(analyzed incrementally across calls)")
+    analyze.add_argument("--recover", action="store_true",
+                         help="Analyze past syntax errors")
+    analyze.add_argument("--explain", action="store_true",
+                         help="Attach the best knowledge-base explanation to each issue")
+
+    fix = commands.add_parser("fix", help="Fix and validate files (dry run unless --write)")
+    fix.add_argument("files", nargs="+")
+    fix.add_argument("--write", action="store_true", help="Write accepted fixes")
+    fix.add_argument("--recover", action="store_true")
+
+    validate = commands.add_parser("validate", help="Validate FIXED as a fix of ORIGINAL")
+    validate.add_argument("original")
+    validate.add_argument("fixed")
+
+    for name in ("stats", "ping", "shutdown"):
+        commands.add_parser(name)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    try:
+        if args.start:
+            try:
+                client = DaemonClient(args.socket)
+            except DaemonError:
+                client = start_daemon(args.socket)
+        else:
+            client = DaemonClient(args.socket)
+
+        with client:
+            if args.command == "analyze" and args.stdin:
+                result = client.analyze_code(sys.stdin.read(), args.recover, args.explain,
+                                             buffer=args.stdin)
+            elif args.command == "analyze":
+                result = client.analyze(args.files, args.recover, args.explain)
+            elif args.command == "fix":
+                result = client.fix(args.files, args.write, args.recover)
+            elif args.command == "validate":
+                with open(args.original, encoding="utf-8") as f:
+                    original = f.read()
+                with open(args.fixed, encoding="utf-8") as f:
+                    fixed = f.read()
+                result = client.validate(original, fixed)
+            else:
+                result = client.request(args.command)
+    except (DaemonError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.json or args.command in ("validate", "ping", "shutdown"):
+        print(json.dumps(result, indent=2))
+    elif args.command == "analyze":
+        print_issues(result["issues"])
+    elif args.command == "fix":
+        print_fixes(result)
+    elif args.command == "stats":
+        print_stats(result)
+
+    if args.command == "analyze":
+        return 1 if result["issues"] else 0
+    if args.command == "validate":
+        return 1 if result.get("rollback_required") else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,565 @@
+"""
+Local analysis daemon
+
+Usage:
+    python -m core.daemon [--socket PATH] [-j N] [--buffer-workers N]
+                          [--max-results N] [--journal DIR]
+
+A long-lived asyncio server on a Unix domain socket that keeps the fix
+rules, the knowledge base and recent per-file results warm, so editors
+and hooks (python -m core.client) pay neither interpreter start nor
+rule/knowledge loading per request. Requests and responses are one JSON
+object per line:
+
+    {"id": 1, "op": "analyze", "paths": ["/abs/path.py"], "explain": true}
+    {"id": 2, "op": "analyze", "code": "...", "buffer": "/abs/path.py"}
+    {"id": 1, "ok": true, "result": {...}}
+    {"id": 1, "ok": false, "error": "..."}
+
+Operations: analyze, fix, validate, stats, ping, shutdown. Parsing,
+fixing and validation run on a process pool; the event loop only reads
+files, looks up the result cache and answers requests, so requests from
+several clients are served concurrently. An unsaved editor buffer sent
+again and again under one "buffer" name is analyzed incrementally (see
+core.incremental): only the definitions changed since the last request
+are analyzed again. Buffers run on their own single-process executors,
+each buffer always on the same one, which keeps its segments.
+"""
+from core.client import DEFAULT_SOCKET
+from core.cache import cache_report, content_key
+from core.engine import SEVERITY_MAP, engine_error
+from core import ast_cache
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+import zlib
+from collections import OrderedDict, deque
+
+logger = logging.getLogger("core.daemon")
+
+# Per-file results kept in memory (least recently used first out)
+DEFAULT_MAX_RESULTS = 10000
+# Editor buffers each buffer worker keeps analyzed incrementally
+MAX_BUFFERS = 64
+# Latest request latencies kept per operation for the percentiles of stats
+LATENCY_WINDOW = 1024
+# Longest request line accepted (a validate request carries two sources)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# Seconds in-flight requests get to finish on shutdown
+SHUTDOWN_GRACE = 30.0
+
+
+class DaemonError(Exception):
+    """A request the daemon cannot serve; sent back as {"ok": false}."""
+
+
+# -------------------------------------------------
+# Worker side (runs in the process pool)
+# -------------------------------------------------
+def _warm_worker(ast_cache_bytes):
+    """Pool initializer: load what every request needs once per worker."""
+    from fixer.fix_agent import load_rules
+    import core.analyzer  # noqa: F401  (detectors)
+    import validator.validator  # noqa: F401
+
+    load_rules()
+    ast_cache.configure(ast_cache_bytes)
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def analyze_source(data, recover=False):
+    """Issues of one file's raw bytes, as plain dicts."""
+    from core.analyzer import Analyzer
+
+    issues = Analyzer(data, recover=recover).analyze()
+    return [issue.to_dict() for issue in issues]
+
+
+def fix_source(code, recover=False):
+    """analyze -> fix -> validate of a source string, nothing written."""
+    from core.analyzer import Analyzer
+    from fixer import apply_all_fixes
+    from validator.validator import CodeValidator
+
+    issues = Analyzer(code, recover=recover).analyze()
+    fixed, fix_log = apply_all_fixes(code, issues) if issues else (code, [])
+    validation = CodeValidator(code, fixed).validate() if fixed != code else None
+    return {
+        "issues_found": len(issues),
+        "fixed": fixed,
+        "fix_log": fix_log,
+        "validation": validation.to_dict() if validation is not None else None,
+    }
+
+
+def fix_file(path, write=False, recover=False, journal=None):
+    """core.pipeline.process_file of one file, as a plain dict."""
+    from core.pipeline import process_file
+
+    result = process_file(path, write, recover, journal)
+    return {field: getattr(result, field) for field in result.__slots__ if field != "profile"}
+
+
+def validate_source(original, fixed):
+    from validator.validator import CodeValidator
+
+    return CodeValidator(original, fixed).validate().to_dict()
+
+
+# Incremental state of the buffers pinned to this worker, least recently used first
+_buffers = OrderedDict()  # (buffer name, recover) -> IncrementalAnalyzer
+
+
+def analyze_buffer(name, code, recover=False):
+    """Issues of an editor buffer, analyzed incrementally, as plain dicts."""
+    from core.incremental import IncrementalAnalyzer
+
+    key = (name, recover)
+    analyzer = _buffers.get(key)
+    if analyzer is None:
+        analyzer = _buffers[key] = IncrementalAnalyzer(recover=recover)
+        while len(_buffers) > MAX_BUFFERS:
+            _buffers.popitem(last=False)
+    _buffers.move_to_end(key)
+    return [issue.to_dict() for issue in analyzer.analyze(code)]
+
+
+def buffer_stats():
+    analyzers = _buffers.values()
+    return {
+        "open": len(_buffers),
+        "segments_analyzed": sum(a.segments_analyzed for a in analyzers),
+        "segments_reused": sum(a.segments_reused for a in analyzers),
+        "full_analyses": sum(a.full_analyses for a in analyzers),
+    }
+
+
+# -------------------------------------------------
+# Server side
+# -------------------------------------------------
+class ResultLRU:
+    """Per-file issues by content key (core.cache.content_key), bounded in entries."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_RESULTS):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        issues = self.entries.get(key)
+        if issues is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return issues
+
+    def put(self, key, issues):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = issues
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        report = cache_report(self.hits, self.misses)
+        report["entries"] = len(self.entries)
+        return report
+
+
+class LatencyStats:
+    """Request count, errors and latency percentiles of one operation."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, seconds, ok):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def to_dict(self):
+        ordered = sorted(self.latencies)
+
+        def percentile(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+        report = {"count": self.count, "errors": self.errors}
+        if ordered:
+            report.update(
+                mean_ms=round(sum(ordered) / len(ordered) * 1000, 3),
+                p50_ms=percentile(0.50),
+                p95_ms=percentile(0.95),
+                max_ms=round(ordered[-1] * 1000, 3),
+            )
+        return report
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _socket_alive(path):
+    """True if a daemon answers on path (a leftover socket file refuses)."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class AnalysisDaemon:
+    """
+    Warm analysis server
+    - a process pool whose workers load the fix rules and detectors once
+      (and keep their own core.ast_cache between requests)
+    - the knowledge base is loaded once, in the server, for explain=true
+    - per-file issues are kept by content key, so re-analyzing an
+      unchanged file (same bytes, same detector code) is a dict lookup
+    - editor buffers are pinned by name to one of the buffer workers
+      (single-process executors): their segments stay in that process,
+      and its requests run in order, off the event loop and the pool
+    - fixes written to disk are journaled (see python -m validator.rollback)
+    - SIGTERM / SIGINT / the shutdown op stop accepting connections, let
+      in-flight requests finish, stop the pool and remove the socket
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, workers=1, max_results=DEFAULT_MAX_RESULTS,
+                 ast_cache_bytes=ast_cache.DEFAULT_MAX_BYTES, journal=None, buffer_workers=1):
+        """
+        workers: processes of the pool; None/0 uses every CPU
+        max_results: per-file results kept in memory (0 disables the cache)
+        ast_cache_bytes: core.ast_cache budget of each worker
+        journal: RollbackJournal recording fixes written to disk; None disables it
+        buffer_workers: processes analyzing editor buffers (started on first use)
+        """
+        self.socket_path = socket_path
+        self.workers = workers or os.cpu_count() or 1
+        self.ast_cache_bytes = ast_cache_bytes
+        self.journal = journal
+        self.results = ResultLRU(max_results)
+        self.buffer_workers = max(1, buffer_workers)
+        self.lanes = []  # one executor per buffer worker
+        self._lanes_used = set()
+        self.latency = {}
+        self.started = None
+        self.pool = None
+        self.server = None
+        self.retriever = None
+        self.rollback = None
+        self._in_flight = set()
+        self._stopping = None
+        self._ops = {
+            "analyze": self.op_analyze,
+            "fix": self.op_fix,
+            "validate": self.op_validate,
+            "stats": self.op_stats,
+            "ping": self.op_ping,
+            "shutdown": self.op_shutdown,
+        }
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+    async def _start(self):
+        from concurrent.futures import ProcessPoolExecutor
+        from rag.retriever import KnowledgeRetriever
+        from validator.rollback import RollbackManager
+
+        if os.path.exists(self.socket_path):
+            if _socket_alive(self.socket_path):
+                raise DaemonError(f"a daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                        initargs=(self.ast_cache_bytes,))
+        # Start (and warm) every worker now rather than on the first requests
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _worker_pid)
+                               for _ in range(self.workers)))
+        self.lanes = [ProcessPoolExecutor(max_workers=1, initializer=_warm_worker,
+                                          initargs=(self.ast_cache_bytes,))
+                      for _ in range(self.buffer_workers)]
+        self.retriever = KnowledgeRetriever()
+        self.rollback = RollbackManager(self.journal)
+
+        self.server = await asyncio.start_unix_server(self._serve_client, self.socket_path,
+                                                      limit=MAX_REQUEST_BYTES)
+        os.chmod(self.socket_path, 0o600)
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop)
+        self.started = time.monotonic()
+        logger.info("Listening on %s with %d worker(s)", self.socket_path, self.workers)
+
+    async def serve(self):
+        """Run until stop() (or a signal, or the shutdown op)."""
+        await self._start()
+        try:
+            await self._stopping.wait()
+        finally:
+            await self._shutdown()
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _shutdown(self):
+        logger.info("Shutting down (%d request(s) in flight)", len(self._in_flight))
+        self.server.close()
+        if self._in_flight:
+            await asyncio.wait(self._in_flight, timeout=SHUTDOWN_GRACE)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(signum)
+        for executor in [self.pool, *self.lanes]:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    # -------------------------------------------------
+    # Connections
+    # -------------------------------------------------
+    async def _serve_client(self, reader, writer):
+        try:
+            while not self._stopping.is_set():
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than MAX_REQUEST_BYTES
+                    await self._send(writer, {"id": None, "ok": False,
+                                              "error": "request too large"})
+                    break
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._handle(line))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                await self._send(writer, await task)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, response):
+        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def _handle(self, line):
+        start = time.perf_counter()
+        request_id = None
+        op = "invalid"
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise DaemonError("a request is a JSON object")
+            request_id = request.get("id")
+            op = request.get("op")
+            handler = self._ops.get(op)
+            if handler is None:
+                op = "invalid"
+                raise DaemonError(f"unknown op {request.get('op')!r}; known: {', '.join(self._ops)}")
+            response = {"id": request_id, "ok": True, "result": await handler(request)}
+        except Exception as e:
+            if not isinstance(e, (DaemonError, ValueError)):
+                logger.exception("Request %r failed", op)
+            response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.latency.setdefault(op, LatencyStats()).add(time.perf_counter() - start,
+                                                        response["ok"])
+        return response
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    # -------------------------------------------------
+    # Operations
+    # -------------------------------------------------
+    async def _analyze_one(self, path, data, recover):
+        key = content_key(data, [path, "<recover>"] if recover else [path])
+        issues = self.results.get(key)
+        if issues is None:
+            issues = await self._run(analyze_source, data, recover)
+            for issue in issues:
+                issue["file"] = path
+                issue["severity"] = SEVERITY_MAP.get(issue.get("type"), "LOW")
+            self.results.put(key, issues)
+        return issues
+
+    def _explain(self, issue):
+        matches = self.retriever.match(issue.get("type", ""), issue.get("message", ""), 1)
+        if not matches:
+            return None
+        key, score = matches[0]
+        explanation = self.retriever.db.get(key, {}).get("explanation") or {}
+        return {"key": key, "score": score, "short": explanation.get("short")}
+
+    async def _analyze_buffer(self, name, code, recover):
+        # Same name, same worker: its segments are there from the last request
+        lane = zlib.crc32(name.encode("utf-8", "surrogatepass")) % len(self.lanes)
+        self._lanes_used.add(lane)
+        issues = await asyncio.get_running_loop().run_in_executor(
+            self.lanes[lane], analyze_buffer, name, code, recover)
+        for issue in issues:
+            issue["file"] = name
+            issue["severity"] = SEVERITY_MAP.get(issue.get("type"), "LOW")
+        return issues
+
+    async def op_analyze(self, request):
+        """
+        paths: files to analyze, or code: one source string; recover, explain: bools.
+        buffer: name of the editor buffer code holds, analyzed incrementally.
+        """
+        recover = bool(request.get("recover"))
+        if "code" in request and request.get("buffer"):
+            inputs = [(str(request["buffer"]), None)]
+        elif "code" in request:
+            inputs = [("<code>", request["code"].encode("utf-8"))]
+        else:
+            inputs = []
+            for path in _paths(request):
+                try:
+                    inputs.append((path, await asyncio.to_thread(_read_bytes, path)))
+                except OSError as e:
+                    inputs.append((path, e))
+
+        async def one(path, data):
+            if isinstance(data, Exception):
+                return [engine_error(path, data).to_dict()]
+            if data is None:
+                return await self._analyze_buffer(path, request["code"], recover)
+            return await self._analyze_one(path, data, recover)
+
+        results = await asyncio.gather(*(one(path, data) for path, data in inputs))
+        issues = [dict(issue) for file_issues in results for issue in file_issues]
+        if request.get("explain"):
+            for issue in issues:
+                issue["knowledge"] = self._explain(issue)
+        return {"files": len(inputs), "issues": issues}
+
+    async def op_fix(self, request):
+        """paths: files to fix (written with write=true), or code: one source string."""
+        recover = bool(request.get("recover"))
+        if "code" in request:
+            return await self._run(fix_source, request["code"], recover)
+
+        paths = _paths(request)
+        write = bool(request.get("write"))
+        run = self.journal.begin() if write and self.journal is not None else None
+        try:
+            results = await asyncio.gather(*(self._run(fix_file, path, write, recover, run)
+                                             for path in paths))
+        finally:
+            if run is not None and not self.journal.end(run):
+                run = None
+        for result in results:
+            if result["status"] == "rolled_back":
+                self.rollback.recommend(result["fixed_hash"] or result["path"], result["reason"])
+        return {"files": results, "run_id": run.run_id if run is not None else None}
+
+    async def op_validate(self, request):
+        """original, fixed: the two sources; CodeValidator's ValidationResult as a dict."""
+        original, fixed = request.get("original"), request.get("fixed")
+        if not isinstance(original, str) or not isinstance(fixed, str):
+            raise DaemonError("validate needs 'original' and 'fixed' source strings")
+        return await self._run(validate_source, original, fixed)
+
+    async def op_stats(self, request):
+        loop = asyncio.get_running_loop()
+        lane_stats = await asyncio.gather(*(loop.run_in_executor(self.lanes[lane], buffer_stats)
+                                            for lane in sorted(self._lanes_used)))
+        buffers = {field: sum(stats[field] for stats in lane_stats)
+                   for field in ("open", "segments_analyzed", "segments_reused", "full_analyses")}
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self.started, 3),
+            "workers": self.workers,
+            "in_flight": len(self._in_flight) - 1,  # not counting this request
+            "requests": {op: stats.to_dict() for op, stats in sorted(self.latency.items())},
+            "result_cache": self.results.stats(),
+            "buffers": buffers,
+        }
+
+    async def op_ping(self, request):
+        return {"pid": os.getpid()}
+
+    async def op_shutdown(self, request):
+        # Answered first: the stop only begins once this response is sent
+        asyncio.get_running_loop().call_soon(self.stop)
+        return {"stopping": True}
+
+
+def _paths(request):
+    paths = request.get("paths")
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        raise DaemonError("'paths' must be a list of file paths")
+    return [os.path.abspath(p) for p in paths]
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.daemon",
+        description="Serve analyze/fix/validate requests on a Unix socket, with warm caches"
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help=f"Unix socket to listen on (default: {DEFAULT_SOCKET})")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--buffer-workers", type=int, default=1,
+                        help="Worker processes for incremental editor buffers")
+    parser.add_argument("--max-results", type=int, default=DEFAULT_MAX_RESULTS,
+                        help="Per-file results kept in memory (0 disables)")
+    parser.add_argument("--ast-cache-mb", type=float,
+                        default=ast_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Parsed-tree cache of each worker, in MiB (0 disables)")
+    parser.add_argument("--journal", default=None,
+                        help="Rollback journal of written fixes "
+                             "(default: .debugger_cache/rollback)")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Do not journal written fixes")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    journal = None
+    if not args.no_journal:
+        from validator.rollback import RollbackJournal, DEFAULT_JOURNAL_DIR
+        journal = RollbackJournal(args.journal or DEFAULT_JOURNAL_DIR)
+
+    daemon = AnalysisDaemon(args.socket, args.workers, args.max_results,
+                            int(args.ast_cache_mb * 1024 * 1024), journal,
+                            args.buffer_workers)
+    try:
+        asyncio.run(daemon.serve())
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
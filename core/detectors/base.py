@@ -0,0 +1,182 @@
+import ast
+from core.profiling import NULL_PROFILE, timed_handler
+from core.symbols import SymbolTable
+
+
+# Node types that only ever occur inside expression subtrees
+_EXPR_TYPES = (
+    ast.expr, ast.expr_context, ast.boolop, ast.operator, ast.unaryop,
+    ast.cmpop, ast.comprehension, ast.arguments, ast.arg, ast.keyword,
+)
+
+
+class _Leave:
+    """Marker pushed on the walk stack to fire leave_* handlers for a node."""
+    __slots__ = ("node", "unmute")
+
+    def __init__(self, node, unmute):
+        self.node = node
+        self.unmute = unmute
+
+
+class FusedWalker:
+    """
+    Single-pass AST traversal shared by several detectors
+    - Each detector registers the node types it cares about
+    - One pre-order walk dispatches every node to all interested detectors
+    - Detectors see nodes in the same order ast.NodeVisitor would give them
+    - With an enabled profile, handler time is charged to each detector
+    - Expression subtrees are skipped when no handler could fire inside them
+    """
+
+    def __init__(self, detectors, profile=NULL_PROFILE):
+        self.detectors = list(detectors)
+        self.nodes_visited = 0
+        self._enter = {}
+        self._leave = {}
+
+        for idx, detector in enumerate(self.detectors):
+            handlers = detector.handlers()
+            if profile.enabled:
+                totals = profile.detector_totals(type(detector).__name__)
+                handlers = {
+                    node_type: tuple(timed_handler(h, totals) if h else None for h in pair)
+                    for node_type, pair in handlers.items()
+                }
+            for node_type, (enter, leave) in handlers.items():
+                if enter is not None:
+                    self._enter.setdefault(node_type, []).append((idx, enter))
+                if leave is not None:
+                    self._leave.setdefault(node_type, []).append((idx, leave))
+
+        # Statements never nest inside expressions, so statement-only
+        # detectors do not need the (much larger) expression subtrees
+        self._statements_only = not any(
+            issubclass(node_type, _EXPR_TYPES)
+            for node_type in list(self._enter) + list(self._leave)
+        )
+
+    def walk(self, tree):
+        enter_table = self._enter
+        leave_table = self._leave
+        iter_children = ast.iter_child_nodes
+        prune = ast.expr if self._statements_only else ()
+
+        # id(node) -> detector indices that asked not to see that subtree
+        muted = {}
+        depth = [0] * len(self.detectors)
+        visited = 0
+
+        stack = [tree]
+        while stack:
+            item = stack.pop()
+
+            if item.__class__ is _Leave:
+                node = item.node
+                for idx, handler in leave_table.get(node.__class__, ()):
+                    if not depth[idx]:
+                        handler(node)
+                for idx in item.unmute:
+                    depth[idx] -= 1
+                continue
+
+            node = item
+            visited += 1
+            node_type = node.__class__
+
+            hidden = muted.pop(id(node), ()) if muted else ()
+            for idx in hidden:
+                depth[idx] += 1
+
+            handlers = enter_table.get(node_type)
+            if handlers:
+                for idx, handler in handlers:
+                    if depth[idx]:
+                        continue
+                    skip = handler(node)
+                    if skip:
+                        for child in skip:
+                            muted.setdefault(id(child), []).append(idx)
+
+            if hidden or node_type in leave_table:
+                stack.append(_Leave(node, hidden))
+
+            children = [c for c in iter_children(node) if not isinstance(c, prune)]
+            if children:
+                children.reverse()
+                stack.extend(children)
+
+        self.nodes_visited += visited
+        return self.nodes_visited
+
+
+class ASTDetector:
+    """
+    Base class for detectors that work on the AST
+    - visit_<Node>(node) is called when a node is entered
+    - leave_<Node>(node) is called after all of its children
+    - visit_* may return child nodes this detector should not descend into
+    - finalize() turns collected state into the issue list
+    """
+
+    _handler_names = None
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.issues = []
+
+    @classmethod
+    def _collect_handler_names(cls):
+        # resolved once per class, like NodeVisitor's visit_ lookup but cached
+        if cls.__dict__.get("_handler_names") is None:
+            names = {}
+            for attr in dir(cls):
+                prefix, _, node_name = attr.partition("_")
+                if prefix not in ("visit", "leave") or not node_name:
+                    continue
+                node_type = getattr(ast, node_name, None)
+                if isinstance(node_type, type) and issubclass(node_type, ast.AST):
+                    names.setdefault(node_type, [None, None])
+                    names[node_type][0 if prefix == "visit" else 1] = attr
+            cls._handler_names = names
+        return cls._handler_names
+
+    def handlers(self):
+        """Return {node_type: (enter, leave)} bound handlers for this detector."""
+        result = {}
+        for node_type, (enter, leave) in self._collect_handler_names().items():
+            result[node_type] = (
+                getattr(self, enter) if enter else None,
+                getattr(self, leave) if leave else None,
+            )
+        return result
+
+    def finalize(self):
+        return self.issues
+
+    def run(self):
+        FusedWalker([self]).walk(self.tree)
+        return self.finalize()
+
+
+class SymbolDetector:
+    """
+    Base class for name-based detectors
+    - check(symbols) queries a SymbolTable and fills self.issues
+    - the Analyzer builds one table per file and shares it
+    - run() builds a private table when the detector is used standalone
+    """
+
+    def __init__(self, tree, symbols=None):
+        self.tree = tree
+        self.symbols = symbols
+        self.issues = []
+
+    def check(self, symbols):
+        raise NotImplementedError
+
+    def run(self):
+        if self.symbols is None:
+            self.symbols = SymbolTable(self.tree)
+        self.check(self.symbols)
+        return self.issues
@@ -1,38 +1,68 @@
-import ast
-
-class DuplicateAssignDetector(ast.NodeVisitor):
-    """
-    Detect variables assigned multiple times in the same scope
-    """
-    def __init__(self, tree):
-        self.tree = tree
-        self.issues = []
-        self.assigned = [{}]  # stack of scopes
-
-    def run(self):
-        self.visit(self.tree)
-        return self.issues
-
-    def _push_scope(self):
-        self.assigned.append({})
-
-    def _pop_scope(self):
-        self.assigned.pop()
-
-    def visit_FunctionDef(self, node):
-        self._push_scope()
-        self.generic_visit(node)
-        self._pop_scope()
-
-    def visit_Assign(self, node):
-        scope = self.assigned[-1]
-        for t in node.targets:
-            if isinstance(t, ast.Name):
-                if t.id in scope:
-                    self.issues.append({
-                        "type": "DuplicateAssignment",
-                        "message": f"Variable '{t.id}' assigned multiple times",
-                        "line": node.lineno
-                    })
-                scope[t.id] = node.lineno
-        self.generic_visit(node)
+from bisect import bisect_left
+from core.issue import Issue
+from .base import SymbolDetector
+
+
+def _end(stmt):
+    return (stmt.end_lineno, stmt.end_col_offset)
+
+
+class DuplicateAssignDetector(SymbolDetector):
+    """
+    Detect variables assigned multiple times in the same scope
+    - both assignments sit in the same block of the same scope
+    - the first value is never read before the second assignment
+      (a read on the right-hand side of the second one counts)
+    - no nested function or class reads the name: a closure may run
+      between the two assignments
+    Assignments in different branches (if / else, try / except) are
+    alternatives, not duplicates.
+    """
+
+    def check(self, symbols):
+        # (scope id, name) -> sorted positions of reads resolving to that scope
+        reads = {}
+        # (scope id, name) read from a nested scope
+        captured = set()
+        for ref in symbols.references:
+            if ref.resolved is None:
+                continue
+            key = (id(ref.resolved), ref.name)
+            if ref.scope is ref.resolved:
+                reads.setdefault(key, []).append((ref.line, ref.col))
+            else:
+                captured.add(key)
+        for positions in reads.values():
+            positions.sort()
+
+        for scope in symbols.scopes:
+            for name, bindings in scope.bindings.items():
+                if len(bindings) < 2 or (id(scope), name) in captured:
+                    continue
+                positions = reads.get((id(scope), name), ())
+                self._check_name(name, bindings, positions)
+        return self.issues
+
+    def _check_name(self, name, bindings, positions):
+        previous = {}  # block -> last plain assignment in it
+        for binding in bindings:
+            if binding.kind != "assign":
+                # any other rebinding (for, with, import, ...) resets the chain
+                previous.clear()
+                continue
+
+            earlier = previous.get(binding.block)
+            previous[binding.block] = binding
+            if earlier is None or earlier.stmt is binding.stmt:
+                continue
+
+            start, end = _end(earlier.stmt), _end(binding.stmt)
+            i = bisect_left(positions, start)
+            if i < len(positions) and positions[i] < end:
+                continue  # first value was read in between
+
+            self.issues.append(Issue(
+                "DuplicateAssignment",
+                f"Variable '{name}' assigned multiple times",
+                line=binding.line
+            ))
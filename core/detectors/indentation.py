@@ -1,29 +1,73 @@
-class IndentationDetector:
-    """
-    Detects improper indentation by scanning code line by line
-    """
-    def __init__(self, code):
-        self.code = code
-        self.issues = []
-
-    def run(self):
-        stack = [0]  # Indentation levels
-        lines = self.code.split("\n")
-
-        for lineno, line in enumerate(lines, start=1):
-            stripped = line.lstrip()
-            if not stripped:
-                continue  # skip empty lines
-            indent = len(line) - len(stripped)
-            if indent > stack[-1] + 4:
-                self.issues.append({
-                    "type": "IndentationError",
-                    "message": "Unexpected indentation",
-                    "line": lineno
-                })
-            if indent > stack[-1]:
-                stack.append(indent)
-            elif indent < stack[-1]:
-                while stack and indent < stack[-1]:
-                    stack.pop()
-        return self.issues
+import tokenize
+from core.issue import Issue
+from core.tokens import TokenStream
+
+# indentation added by one block before it counts as over-indented
+MAX_SPACES = 4
+MAX_TABS = 1
+
+
+class IndentationDetector:
+    """
+    Detects improper indentation from the token stream
+    - only INDENT tokens open a block, so continuation lines, multi-line
+      strings and comments are never mistaken for indentation
+    - a block indented by more than 4 spaces (or 1 tab) is reported
+    - tabs and spaces mixed in one indent, or used by different blocks,
+      are reported as MixedIndentation
+    tokens: shared TokenStream of the same code (built here if omitted)
+    style: first indentation character of the code before this code, when
+    it is one block of a larger file (see core.incremental); after run(),
+    the first indentation character seen so far
+    """
+    def __init__(self, code, tokens=None, style=None):
+        self.code = code
+        self.tokens = tokens
+        self.style = style
+        self.issues = []
+
+    def run(self):
+        stream = self.tokens if self.tokens is not None else TokenStream(self.code)
+        return self.check(stream.of_type(tokenize.INDENT, tokenize.DEDENT))
+
+    def check(self, tokens):
+        """Issues of the INDENT / DEDENT tokens of the code, in order."""
+        levels = [""]  # indentation string of each open block
+        style = self.style
+
+        for tok in tokens:
+            if tok.type == tokenize.DEDENT:
+                levels.pop()
+                continue
+
+            # a form feed resets the tokenizer's indentation count
+            indent = tok.string.rpartition("\f")[2]
+            line = tok.start[0]
+            outer = levels[-1]
+            added = indent[len(outer):] if indent.startswith(outer) else indent
+            levels.append(indent)
+
+            if " " in indent and "\t" in indent:
+                self._mixed(line, "Indentation mixes tabs and spaces")
+            elif not indent:
+                pass  # nothing to compare
+            elif style is None:
+                style = indent[0]
+            elif indent[0] != style:
+                self._mixed(line, "Indentation uses tabs and spaces in different blocks")
+
+            if added.count("\t") > MAX_TABS or added.count(" ") > MAX_SPACES:
+                self.issues.append(Issue(
+                    "IndentationError",
+                    "Unexpected indentation",
+                    line=line
+                ))
+        self.style = style
+        return self.issues
+
+    def _mixed(self, line, message):
+        self.issues.append(Issue(
+            "MixedIndentation",
+            message,
+            line=line
+        ))
@@ -1,27 +1,33 @@
-import ast
-
-class SyntaxDetector:
-    """
-    Detects syntax errors like missing colons, unmatched parentheses
-    """
-    def __init__(self, code):
-        self.code = code
-        self.issues = []
-
-    def run(self):
-        try:
-            ast.parse(self.code)
-        except SyntaxError as e:
-            msg = e.msg
-            err_type = "SyntaxError"
-            if "expected ':'" in msg:
-                err_type = "MissingColon"
-            elif "unexpected indent" in msg:
-                err_type = "IndentationError"
-            self.issues.append({
-                "type": err_type,
-                "message": msg,
-                "line": e.lineno,
-                "column": e.offset
-            })
-        return self.issues
+from core import ast_cache
+from core.issue import Issue
+
+class SyntaxDetector:
+    """
+    Detects syntax errors like missing colons, unmatched parentheses
+    """
+    def __init__(self, code):
+        self.code = code
+        self.issues = []
+
+    @staticmethod
+    def issue_from_error(e, line_offset=0):
+        """Issue for a caught SyntaxError (line_offset: lines before the parsed text)."""
+        msg = e.msg
+        err_type = "SyntaxError"
+        if "expected ':'" in msg:
+            err_type = "MissingColon"
+        elif "unexpected indent" in msg:
+            err_type = "IndentationError"
+        return Issue(
+            err_type,
+            msg,
+            line=e.lineno + line_offset if e.lineno is not None else None,
+            column=e.offset
+        )
+
+    def run(self):
+        try:
+            ast_cache.parse(self.code)
+        except SyntaxError as e:
+            self.issues.append(self.issue_from_error(e))
+        return self.issues
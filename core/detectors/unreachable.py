@@ -1,35 +1,37 @@
-import ast
-
-class UnreachableCodeDetector(ast.NodeVisitor):
-    """
-    Detect code after return, break, or raise
-    """
-    def __init__(self, tree):
-        self.tree = tree
-        self.issues = []
-        self.dead = False
-
-    def run(self):
-        self.visit(self.tree)
-        return self.issues
-
-    def visit_FunctionDef(self, node):
-        self.dead = False
-        self.generic_visit(node)
-
-    def visit_Return(self, node):
-        self.dead = True
-        self.generic_visit(node)
-
-    def visit_Raise(self, node):
-        self.dead = True
-        self.generic_visit(node)
-
-    def visit_Expr(self, node):
-        if self.dead:
-            self.issues.append({
-                "type": "UnreachableCode",
-                "message": "This statement will never execute",
-                "line": node.lineno
-            })
-        self.generic_visit(node)
+import ast
+from core.issue import Issue
+from .base import ASTDetector
+
+class UnreachableCodeDetector(ASTDetector):
+    """
+    Detect code after return, break, or raise
+    - the state starts over in each function and class body, and again
+      after it: a return inside a definition says nothing about the
+      statements that follow the definition
+    """
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.dead = False
+
+    def visit_FunctionDef(self, node):
+        self.dead = False
+
+    def leave_FunctionDef(self, node):
+        self.dead = False
+
+    visit_AsyncFunctionDef = visit_ClassDef = visit_FunctionDef
+    leave_AsyncFunctionDef = leave_ClassDef = leave_FunctionDef
+
+    def visit_Return(self, node):
+        self.dead = True
+
+    def visit_Raise(self, node):
+        self.dead = True
+
+    def visit_Expr(self, node):
+        if self.dead:
+            self.issues.append(Issue(
+                "UnreachableCode",
+                "This statement will never execute",
+                line=node.lineno
+            ))
@@ -1,33 +1,41 @@
-import ast
-
-class UnusedVarDetector(ast.NodeVisitor):
-    """
-    Detect variables that are assigned but never used
-    """
-    def __init__(self, tree):
-        self.tree = tree
-        self.assigned = {}
-        self.used = set()
-        self.issues = []
-
-    def run(self):
-        self.visit(self.tree)
-        for var, line in self.assigned.items():
-            if var not in self.used:
-                self.issues.append({
-                    "type": "UnusedVariable",
-                    "message": f"Variable '{var}' assigned but never used",
-                    "line": line
-                })
-        return self.issues
-
-    def visit_Assign(self, node):
-        for t in node.targets:
-            if isinstance(t, ast.Name):
-                self.assigned[t.id] = node.lineno
-        self.generic_visit(node)
-
-    def visit_Name(self, node):
-        if isinstance(node.ctx, ast.Load):
-            self.used.add(node.id)
-        self.generic_visit(node)
+from core.issue import Issue
+from .base import SymbolDetector
+
+# binding kinds that count as "assigning a variable"
+ASSIGN_KINDS = frozenset({"assign", "annassign", "walrus"})
+
+
+class UnusedVarDetector(SymbolDetector):
+    """
+    Detect variables that are assigned but never used
+    - checked per scope: a read anywhere that resolves to the scope counts
+    - class attributes, dunders, `_`, names in __all__ and scopes that
+      call locals() are not reported
+    """
+
+    def check(self, symbols):
+        exported = symbols.exported_names()
+        # locals() reads every variable of the scope calling it
+        dynamic = {
+            id(ref.scope) for ref in symbols.references
+            if ref.name == "locals" and ref.resolved is None
+        }
+
+        for scope in symbols.scopes:
+            if scope.kind == "class" or id(scope) in dynamic:
+                continue
+
+            for name, bindings in scope.bindings.items():
+                if name in scope.used or name == "_" or name.startswith("__"):
+                    continue
+                if scope.kind == "module" and name in exported:
+                    continue
+                assigned = [b for b in bindings if b.kind in ASSIGN_KINDS]
+                if not assigned:
+                    continue
+                self.issues.append(Issue(
+                    "UnusedVariable",
+                    f"Variable '{name}' assigned but never used",
+                    line=assigned[-1].line
+                ))
+        return self.issues
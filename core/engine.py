@@ -1,73 +1,334 @@
 from core.repo_loader import RepoLoader
 from core.analyzer import Analyzer
-from fixer.fix_agent import FixAgent
-from validator.validator import ValidationResult
+from core import ast_cache
+from core.issue import Issue
+from core.source import read_source, MMAP_THRESHOLD
+from core.profiling import FileProfile, ProfileReport, NULL_PROFILE
+from core.cache import (
+    ResultCache, cache_report, content_key, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+)
 
+import argparse
+import json
+import os
 import sys
+from collections import deque
+from itertools import islice
+
+
+SEVERITY_MAP = {
+    "SyntaxError": "HIGH",
+    "IndentationError": "HIGH",
+    "MixedIndentation": "MEDIUM",
+    "UndefinedVariable": "HIGH",
+    "UnusedVariable": "LOW",
+    "DuplicateAssignment": "MEDIUM",
+    "UnreachableCode": "MEDIUM",
+}
+
+
+def engine_error(file_path, exc):
+    """Issue reported when a file cannot be processed."""
+    return Issue("EngineError", str(exc), file=file_path, severity="HIGH")
+
+
+class FileResult:
+    """Outcome of analyzing one file, as sent back from workers."""
+
+    __slots__ = ("path", "issues", "cache_hit", "bytes_read", "read_time", "profile")
+
+    def __init__(self, path, issues, cache_hit=None, bytes_read=0, read_time=0.0,
+                 profile=None):
+        self.path = path
+        self.issues = issues
+        self.cache_hit = cache_hit  # None when no cache is used
+        self.bytes_read = bytes_read
+        self.read_time = read_time
+        self.profile = profile      # FileProfile.to_dict() when profiling
+
+    def __reduce__(self):
+        return (FileResult, (self.path, self.issues, self.cache_hit,
+                             self.bytes_read, self.read_time, self.profile))
+
+
+def analyze_file(file_path, cache=None, mmap_threshold=MMAP_THRESHOLD, profile=False,
+                 star_names=None, recover=False):
+    """
+    Read, parse and analyze one file.
+    Never raises: failures come back as a single EngineError issue.
+
+    Raw bytes go straight to ast.parse, which honors encoding cookies and
+    BOMs; files above mmap_threshold are memory-mapped instead of copied.
+    With profile=True, per-phase and per-detector timings are attached.
+    star_names: names the file's star imports bind (from a ModuleIndex).
+    recover: report every broken top-level block, analyze the rest.
+    """
+    result = FileResult(file_path, None)
+    file_profile = FileProfile(file_path) if profile else NULL_PROFILE
+    try:
+        with file_profile.phase("read"):
+            source = read_source(file_path, mmap_threshold)
+
+        with source:
+            result.bytes_read = source.bytes_read
+            result.read_time = source.read_time
+
+            issues = None
+            if cache is not None:
+                with file_profile.phase("cache"):
+                    context = list(star_names or ())
+                    if recover:
+                        context.append("<recover>")
+                    key = content_key(source.data, context)
+                    issues = cache.get(key)
+                result.cache_hit = issues is not None
+
+            if issues is None:
+                analyzer = Analyzer(source.data, file_profile, star_names, recover)
+                issues = analyzer.analyze()
+                if cache is not None:
+                    cache.put(key, issues)
+
+        for issue in issues:
+            issue["file"] = file_path
+            issue["severity"] = SEVERITY_MAP.get(
+                issue.get("type"), "LOW"
+            )
+
+        result.issues = issues
+
+    except Exception as e:
+        result.issues = [engine_error(file_path, e)]
+
+    if profile:
+        result.profile = file_profile.to_dict()
+    return result
+
+
+# One cache connection per worker process, reused across chunks
+_worker_cache = None
+
+
+def _get_worker_cache(cache_config):
+    global _worker_cache
+    if cache_config is None:
+        return None
+    if _worker_cache is None:
+        _worker_cache = ResultCache(*cache_config)
+    return _worker_cache
+
+
+def analyze_chunk(file_paths, cache_config=None, mmap_threshold=MMAP_THRESHOLD,
+                  profile=False, star_names=None, recover=False, ast_cache_bytes=0):
+    """
+    Worker entry point: analyze a batch of files, results in input order.
+    star_names: {file path: names} for the files of this chunk that have
+    resolved star imports; workers never see the whole module index.
+    ast_cache_bytes: budget of this worker's core.ast_cache.
+    """
+    ast_cache.configure(ast_cache_bytes)
+    cache = _get_worker_cache(cache_config)
+    star_names = star_names or {}
+    results = [
+        analyze_file(file_path, cache, mmap_threshold, profile,
+                     star_names.get(file_path), recover)
+        for file_path in file_paths
+    ]
+    if cache is not None:
+        cache.flush()
+    return results
+
+
 class DebuggerEngine:
     """
     Integration Engine
     - Loads repo files
-    - Runs Analyzer on each file
-    - Aggregates all issues
+    - Runs Analyzer on each file (serially or across a process pool)
+    - Skips unchanged files through an optional persistent result cache
+    - Optionally resolves star imports through a project-wide ModuleIndex
+    - Streams (iter_issues) or aggregates (run) issues in file order
+    - Optionally analyzes only the files of a GitDiff, reporting only
+      the issues on changed lines (and, if asked, those they cause)
     """
 
-    SEVERITY_MAP = {
-        "SyntaxError": "HIGH",
-        "IndentationError": "HIGH",
-        "UndefinedVariable": "HIGH",
-        "UnusedVariable": "LOW",
-        "DuplicateAssignment": "MEDIUM",
-        "UnreachableCode": "MEDIUM",
-    }
+    SEVERITY_MAP = SEVERITY_MAP
 
-    def __init__(self, repo_path="."):
+    def __init__(self, repo_path=".", workers=1, chunksize=None,
+                 cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, loader=None,
+                 mmap_threshold=MMAP_THRESHOLD, profile=False, module_index=False,
+                 recover=False, ast_cache_bytes=0, diff=None, diff_affected=False):
+        """
+        workers: number of processes; 1 runs in-process, None/0 uses every CPU
+        chunksize: files per work unit sent to a worker (auto when None)
+        cache_dir: directory of the result cache; None disables caching
+        loader: configured RepoLoader (default: RepoLoader(repo_path))
+        mmap_threshold: files of at least this many bytes are memory-mapped
+        profile: collect per-phase / per-detector timings into profile_report
+        module_index: build / refresh a ModuleIndex once per scan (stored
+            next to the result cache) so star imports resolve across files
+        recover: keep going after a syntax error (one issue per broken
+            top-level block, semantic analysis of the blocks that parse)
+        ast_cache_bytes: parsed trees kept in core.ast_cache during the
+            scan; a scan parses each file once, so it is off by default
+            (kept trees only add garbage-collector work)
+        diff: loaded core.git_diff.GitDiff; only its changed files are
+            analyzed and only issues on changed lines are reported
+        diff_affected: with diff, also report issues in unchanged lines
+            of a changed file that its base version does not have
+        """
         self.repo_path = repo_path
-        self.loader = RepoLoader(repo_path)
+        self.loader = loader or RepoLoader(repo_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.mmap_threshold = mmap_threshold
+        self.profile = profile
+        self.profile_report = None
+        self.cache_config = (cache_dir, cache_max_bytes) if cache_dir else None
+        self.cache_stats = None
+        self.read_stats = None
+        self.module_index = module_index
+        self.index = None
+        self.recover = recover
+        self.ast_cache_bytes = ast_cache_bytes
+        self.diff = diff
+        self.diff_affected = diff_affected
 
-    def run(self):
-        all_issues = []
-        files = self.loader.load_python_files()
+    def _chunks(self, files):
+        size = self.chunksize
+        if not size:
+            if isinstance(files, list):
+                # ~4 chunks per worker balances load without flooding the queue
+                size = max(1, min(64, len(files) // (self.workers * 4)))
+            else:
+                size = 16  # lazy file stream: length unknown
+        files = iter(files)
+        while True:
+            chunk = list(islice(files, size))
+            if not chunk:
+                return
+            yield chunk
 
-        for file_path in files:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    code = f.read()
+    def _build_index(self, files):
+        from core.module_index import ModuleIndex
 
-                analyzer = Analyzer(code)
-                issues = analyzer.analyze()
+        cache_dir = self.cache_config[0] if self.cache_config else DEFAULT_CACHE_DIR
+        self.index = ModuleIndex(self.repo_path, cache_dir).load().build(files)
+        self.index.save()
+        return self.index
 
-                for issue in issues:
-                    issue["file"] = file_path
-                    issue["severity"] = self.SEVERITY_MAP.get(
-                        issue.get("type"), "LOW"
-                    )
+    def _star_names(self, chunk):
+        if self.index is None:
+            return None
+        names = {}
+        for file_path in chunk:
+            resolved = self.index.star_names(file_path)
+            if resolved is not None:
+                names[file_path] = resolved
+        return names
 
-                all_issues.extend(issues)
+    def _iter_parallel(self, files):
+        # Imported here: a serial scan does not need multiprocessing at all
+        from concurrent.futures import ProcessPoolExecutor
 
-            except Exception as e:
-                all_issues.append({
-                    "type": "EngineError",
-                    "file": file_path,
-                    "message": str(e),
-                    "severity": "HIGH"
-                })
+        # Bounded window of in-flight chunks keeps memory flat on huge repos
+        window = self.workers * 4
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        try:
+            for chunk in self._chunks(files):
+                future = pool.submit(analyze_chunk, chunk, self.cache_config,
+                                     self.mmap_threshold, self.profile,
+                                     self._star_names(chunk), self.recover,
+                                     self.ast_cache_bytes)
+                pending.append((chunk, future))
+                if len(pending) >= window:
+                    yield from self._collect(*pending.popleft())
 
-        return all_issues
+            while pending:
+                yield from self._collect(*pending.popleft())
+        finally:
+            # Consumer may stop early: drop work that has not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
 
+    def _collect(self, chunk, future):
+        # Collected in submission order so output matches the serial run
+        try:
+            return future.result()
+        except Exception as e:
+            # A dead worker only costs the files of its own chunk
+            return [FileResult(file_path, [engine_error(file_path, e)]) for file_path in chunk]
 
-if __name__ == "__main__":
-    # default path
-    repo_path = "."
+    def iter_results(self):
+        """
+        Stream one FileResult per file as soon as it is analyzed.
+        Nothing is accumulated, so memory does not grow with repo size.
+        """
+        diff = self.diff
+        if diff is not None:
+            files = list(diff.select(self.loader, self.diff_affected))
+            if self.module_index:
+                # Star imports of changed files resolve against the whole tree
+                self._build_index(list(self.loader.iter_python_files()))
+        else:
+            files = self.loader.iter_python_files()
+            if self.module_index:
+                # The index needs the whole file list before any file is analyzed
+                files = list(files)
+                self._build_index(files)
+        read_stats = {"files": 0, "bytes_read": 0, "read_time": 0.0}
+        self.read_stats = read_stats
+        report = self.profile_report = ProfileReport() if self.profile else None
+
+        # The parent always owns a connection: it serves the serial path
+        # and runs the final eviction once workers are done
+        cache = ResultCache(*self.cache_config) if self.cache_config else None
+        hits = misses = 0
+        ast_budget = ast_cache.get_ast_cache().max_bytes
+
+        try:
+            if self.workers > 1:
+                results = self._iter_parallel(files)
+            else:
+                # Analyzed in this process: use the scan's budget until done
+                ast_cache.configure(self.ast_cache_bytes)
+                index = self.index
+                results = (analyze_file(file_path, cache, self.mmap_threshold, self.profile,
+                                        index.star_names(file_path) if index else None,
+                                        self.recover)
+                           for file_path in files)
 
-    # if path is provided from terminal
-    if len(sys.argv) > 1:
-        repo_path = sys.argv[1]
+            for result in results:
+                if result.cache_hit:
+                    hits += 1
+                elif result.cache_hit is not None:
+                    misses += 1
+                read_stats["files"] += 1
+                read_stats["bytes_read"] += result.bytes_read
+                read_stats["read_time"] += result.read_time
+                if report is not None and result.profile is not None:
+                    report.add(result.profile)
+                if diff is not None:
+                    result.issues = diff.filter_issues(
+                        result.path, result.issues, self.diff_affected,
+                        self.index.star_names(result.path) if self.index else None,
+                        self.recover)
+                yield result
+        finally:
+            ast_cache.configure(ast_budget)
+            if cache is not None:
+                cache.close()
+                self.cache_stats = cache_report(hits, misses)
 
-    engine = DebuggerEngine(repo_path)
-    issues = engine.run()
+    def iter_issues(self):
+        """Stream issues file by file, in file order."""
+        for result in self.iter_results():
+            yield from result.issues
+
+    def run(self):
+        return list(self.iter_issues())
 
-    print("=== DEBUGGER RESULTS ===")
+
+def print_issues(issues):
     for issue in issues:
         print(f"\n[{issue['severity']}] {issue['type']}")
         print(f"File: {issue['file']}")
@@ -75,3 +336,190 @@ if __name__ == "__main__":
         print(f"Message: {issue['message']}")
 
 
+def print_read_stats(file_stats, totals, out=None):
+    out = out or sys.stdout
+    print("\n=== READ STATS ===", file=out)
+    for path, bytes_read, read_time in file_stats:
+        print(f"{bytes_read:>12,} B  {read_time * 1000:8.2f} ms  {path}", file=out)
+    print(f"Total: {totals['files']} files, {totals['bytes_read']:,} bytes "
+          f"in {totals['read_time'] * 1000:.1f} ms", file=out)
+
+
+def write_jsonl(issues, stream=None):
+    """Write one JSON object per line, flushed so consumers see it at once."""
+    stream = stream or sys.stdout
+    for issue in issues:
+        stream.write(json.dumps(issue.to_dict()) + "\n")
+        stream.flush()
+
+
+def run_watch(repo_path, interval, loader=None, module_index=None, recover=False):
+    from core.watcher import RepoWatcher
+
+    watcher = RepoWatcher(repo_path, interval=interval, loader=loader,
+                          module_index=module_index, recover=recover)
+
+    def on_update(changes):
+        print(f"\n=== UPDATE: {len(changes.added)} added, {len(changes.changed)} changed, "
+              f"{len(changes.deleted)} deleted ===")
+        for file_path in changes.deleted:
+            print(f"Removed: {file_path}")
+        print_issues(watcher.issues(changes.added + changes.changed))
+        sys.stdout.flush()
+
+    try:
+        watcher.watch(on_update)
+    except KeyboardInterrupt:
+        pass
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.engine",
+        description="Offline debugger: scan a repository for Python issues"
+    )
+    parser.add_argument("repo_path", nargs="?", default=".",
+                        help="repository or directory to scan (default: .)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="files per work unit in parallel mode")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_DIR, default=None,
+                        metavar="DIR",
+                        help=f"reuse results for unchanged files (default dir: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries above this size")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="only scan files matching this repo-relative glob (repeatable)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB",
+                        help="skip files/directories matching this glob (repeatable)")
+    parser.add_argument("--no-gitignore", action="store_true",
+                        help="do not honor .gitignore files")
+    parser.add_argument("--max-file-size", type=int, default=None, metavar="KB",
+                        help="skip files larger than this many KiB")
+    parser.add_argument("--follow-symlinks", action="store_true",
+                        help="descend into symlinked directories (cycle safe)")
+    parser.add_argument("--git", action="store_true",
+                        help="list files from the git index instead of walking")
+    parser.add_argument("--mmap-threshold", type=int, default=MMAP_THRESHOLD // 1024,
+                        metavar="KB", help="memory-map files at least this large")
+    parser.add_argument("--read-stats", action="store_true",
+                        help="report bytes read and read time per file")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each phase and detector and print the slowest")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="rows in the profile report (default: 10)")
+    parser.add_argument("--profile-json", default=None, metavar="PATH",
+                        help="also dump raw per-file timings as JSON (implies --profile)")
+    parser.add_argument("--module-index", action="store_true",
+                        help="resolve `from x import *` across the repo through a cached "
+                             "module export index")
+    parser.add_argument("--recover", action="store_true",
+                        help="report every syntax error of a file (one per top-level block) "
+                             "and analyze the blocks that parse")
+    parser.add_argument("--ast-cache-mb", type=int, default=0,
+                        help="keep parsed trees of this many MiB in memory (default: 0, "
+                             "each file is parsed once per scan)")
+    parser.add_argument("--diff", nargs="?", const="HEAD", default=None, metavar="REF",
+                        help="only analyze .py files changed since REF (its merge base with "
+                             "HEAD; default: HEAD) and report issues on changed lines")
+    parser.add_argument("--diff-affected", action="store_true",
+                        help="with --diff, also report issues in unchanged lines of changed "
+                             "files that the base version does not have (implies --diff)")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text",
+                        help="text report or JSON Lines, one issue per line")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-analyze files as they change")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between polls in watch mode (default: 1.0)")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    loader = RepoLoader(
+        args.repo_path,
+        include=args.include,
+        exclude=args.exclude,
+        use_gitignore=not args.no_gitignore,
+        max_file_size=args.max_file_size * 1024 if args.max_file_size else None,
+        follow_symlinks=args.follow_symlinks,
+        use_git=args.git,
+    )
+
+    if args.diff_affected and args.diff is None:
+        args.diff = "HEAD"
+    if args.watch and args.diff is not None:
+        build_arg_parser().error("--diff cannot be combined with --watch")
+
+    diff = None
+    if args.diff is not None:
+        from core.git_diff import GitDiff, GitDiffError
+        try:
+            diff = GitDiff(args.repo_path, args.diff).load()
+        except GitDiffError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    if args.watch:
+        index = None
+        if args.module_index:
+            from core.module_index import ModuleIndex
+            index = ModuleIndex(args.repo_path, args.cache or DEFAULT_CACHE_DIR).load()
+        run_watch(args.repo_path, args.interval, loader, index, args.recover)
+        return
+
+    engine = DebuggerEngine(args.repo_path, workers=args.workers,
+                            chunksize=args.chunksize, cache_dir=args.cache,
+                            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                            loader=loader,
+                            mmap_threshold=args.mmap_threshold * 1024,
+                            profile=args.profile or bool(args.profile_json),
+                            module_index=args.module_index,
+                            recover=args.recover,
+                            ast_cache_bytes=args.ast_cache_mb * 1024 * 1024,
+                            diff=diff, diff_affected=args.diff_affected)
+    file_stats = [] if args.read_stats else None
+
+    def issues():
+        for result in engine.iter_results():
+            if file_stats is not None:
+                file_stats.append((result.path, result.bytes_read, result.read_time))
+            yield from result.issues
+
+    if args.format == "jsonl":
+        write_jsonl(issues())
+    else:
+        print("=== DEBUGGER RESULTS ===")
+        print_issues(issues())
+
+    # Keep stdout pure JSON Lines; summaries go to stderr there
+    out = sys.stderr if args.format == "jsonl" else sys.stdout
+
+    if file_stats is not None:
+        print_read_stats(file_stats, engine.read_stats, out)
+
+    if engine.profile_report is not None:
+        print("\n" + engine.profile_report.format(args.profile_top), file=out)
+        if args.profile_json:
+            engine.profile_report.dump_json(args.profile_json)
+
+    if engine.index is not None:
+        index = engine.index
+        print(f"\nModule index: {len(index.entries)} modules, {index.scanned} scanned, "
+              f"{index.reused} reused", file=out)
+
+    if diff is not None:
+        print(f"\nDiff: {engine.read_stats['files']} changed files since {args.diff} "
+              f"({diff.commit[:12]}), {diff.dropped} issues outside changed lines "
+              f"not reported", file=out)
+
+    if engine.cache_stats is not None:
+        stats = engine.cache_stats
+        print(f"\nCache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%} hit rate)", file=out)
+
+
+if __name__ == "__main__":
+    main()
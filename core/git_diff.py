@@ -0,0 +1,248 @@
+import codecs
+import os
+import re
+import subprocess
+from bisect import bisect_right
+
+from core.analyzer import Analyzer
+
+# Issues of a file that does not parse: nothing else of it was analyzed,
+# so they are reported wherever the change is
+_PARSE_ERRORS = frozenset(("SyntaxError", "MissingColon"))
+
+_HUNK = re.compile(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitDiffError(Exception):
+    """git is missing, the path is not in a work tree or the base ref is unknown."""
+
+
+def _git(repo_path, *args, silent_error=None):
+    """
+    stdout of one git command run in repo_path, as bytes.
+    silent_error: message of a failure git reports nothing on stderr for.
+    """
+    try:
+        proc = subprocess.run(["git", "-C", repo_path, "-c", "core.quotePath=false", *args],
+                              capture_output=True)
+    except OSError as e:
+        raise GitDiffError(f"cannot run git: {e}") from e
+    if proc.returncode != 0:
+        message = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+        if not message and silent_error:
+            raise GitDiffError(silent_error)
+        raise GitDiffError(f"git {args[0]} failed: {message[0] if message else proc.returncode}")
+    return proc.stdout
+
+
+def _diff_path(field):
+    """Path of a ---/+++ header line field ('a/x.py', '"b/tab\\tname.py"', '/dev/null')."""
+    # git ends names that contain a space with a tab
+    field = field.rstrip("\t")
+    if field.startswith('"'):
+        # C-style quoted: escapes of control characters and raw bytes
+        raw = codecs.escape_decode(field[1:-1].encode("utf-8", "surrogateescape"))[0]
+        field = raw.decode("utf-8", "surrogateescape")
+    if field == "/dev/null":
+        return None
+    return field[2:]
+
+
+def _is_parse_error(issue):
+    # SyntaxDetector names "unexpected indent" IndentationError; the
+    # IndentationDetector's own "Unexpected indentation" is per line
+    return issue.get("type") in _PARSE_ERRORS or (
+        issue.get("type") == "IndentationError" and issue.get("message") == "unexpected indent")
+
+
+class FileDiff:
+    """
+    Changed lines of one file against the base
+    - hunks: (old start, old count, new start, new count) as in @@ headers
+    - old_path: the file's path at the base (differs after a rename),
+      None for a file that is new or untracked
+    - whole: every line counts as changed (untracked files)
+    """
+
+    __slots__ = ("path", "old_path", "hunks", "whole", "_starts", "_ends", "_after", "_shift")
+
+    def __init__(self, path, old_path=None, hunks=(), whole=False):
+        self.path = path
+        self.old_path = old_path
+        self.hunks = list(hunks)
+        self.whole = whole
+        self._starts = self._ends = self._after = self._shift = None
+
+    def _index(self):
+        changed = [(new, new + count) for _, _, new, count in self.hunks if count]
+        self._starts = [start for start, _ in changed]
+        self._ends = [end for _, end in changed]
+        # Lines from _after[k] on come after hunk k; _shift[k + 1]: lines
+        # added minus removed by hunks 0..k
+        self._after, self._shift = [], [0]
+        for _, old_count, new, new_count in self.hunks:
+            self._after.append(new + new_count if new_count else new + 1)
+            self._shift.append(self._shift[-1] + new_count - old_count)
+
+    def touched(self, line):
+        """True if line (of the new file) was added or modified."""
+        if self.whole:
+            return True
+        if self._starts is None:
+            self._index()
+        k = bisect_right(self._starts, line) - 1
+        return k >= 0 and line < self._ends[k]
+
+    def old_line(self, line):
+        """Line at the base of an unchanged line of the new file."""
+        if self._after is None:
+            self._index()
+        return line - self._shift[bisect_right(self._after, line)]
+
+    def __bool__(self):
+        return self.whole or any(count for _, _, _, count in self.hunks)
+
+
+class GitDiff:
+    """
+    Files and lines changed in a git work tree since a base ref
+    - base is compared through its merge base with HEAD, so on a branch
+      only the branch's own changes count (as in a pull request)
+    - the work tree is compared, staged or not; untracked files that are
+      not ignored count as wholly changed
+    - deleted files and pure deletions change no line of the new tree
+    filter_issues(path, issues) keeps the issues on changed lines; with
+    affected=True it also keeps issues elsewhere in the file that the
+    base version of the file does not have (a deleted definition makes a
+    use undefined, a removed read makes an assignment unused...).
+    """
+
+    def __init__(self, repo_path=".", base="HEAD", untracked=True):
+        self.repo_path = repo_path
+        self.base = base
+        self.untracked = untracked
+        self.commit = None
+        self.files = {}  # path (joined like RepoLoader paths) -> FileDiff
+        self.dropped = 0  # issues filtered out, over every filter_issues call
+
+    def _path(self, rel_path):
+        return os.path.join(self.repo_path, *rel_path.split("/"))
+
+    def load(self):
+        """Ask git for the changed .py files; raises GitDiffError."""
+        self.commit = self._merge_base()
+        output = _git(self.repo_path, "diff", "--no-color", "--no-ext-diff", "--no-textconv",
+                      "--unified=0", "--find-renames", "--diff-filter=AMRT", "--relative",
+                      "--src-prefix=a/", "--dst-prefix=b/", self.commit, "--", "*.py")
+        files = {}
+        for file_diff in self._parse(output.decode("utf-8", "surrogateescape")):
+            if file_diff.hunks:  # not a pure rename or mode change
+                files[self._path(file_diff.path)] = file_diff
+        if self.untracked:
+            listed = _git(self.repo_path, "ls-files", "-z", "--others", "--exclude-standard",
+                          "--", "*.py")
+            for raw in listed.split(b"\0"):
+                if raw:
+                    rel_path = os.fsdecode(raw)
+                    files[self._path(rel_path)] = FileDiff(rel_path, whole=True)
+        self.files = files
+        return self
+
+    def _merge_base(self):
+        commit = _git(self.repo_path, "rev-parse", "--verify", "--quiet", self.base + "^{commit}",
+                      silent_error=f"unknown base ref {self.base!r}").decode().strip()
+        try:
+            return _git(self.repo_path, "merge-base", commit, "HEAD").decode().strip()
+        except GitDiffError:
+            return commit  # unrelated histories: compare with the ref itself
+
+    def _parse(self, output):
+        """FileDiff per file of a --unified=0 diff, content lines skipped."""
+        file_diff = None
+        old_path = None
+        pending = 0  # content lines left in the current hunk
+        for line in output.split("\n"):
+            if pending:
+                if not line.startswith("\\"):  # "\ No newline at end of file"
+                    pending -= 1
+                continue
+            if line.startswith("diff --git "):
+                if file_diff is not None:
+                    yield file_diff
+                file_diff = old_path = None
+            elif line.startswith("--- "):
+                old_path = _diff_path(line[4:])
+            elif line.startswith("+++ "):
+                file_diff = FileDiff(_diff_path(line[4:]), old_path)
+            elif line.startswith("@@ ") and file_diff is not None:
+                match = _HUNK.match(line)
+                old, old_count, new, new_count = match.groups()
+                hunk = (int(old), 1 if old_count is None else int(old_count),
+                        int(new), 1 if new_count is None else int(new_count))
+                file_diff.hunks.append(hunk)
+                pending = hunk[1] + hunk[3]
+        if file_diff is not None:
+            yield file_diff
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def select(self, loader, affected=False):
+        """
+        Changed files the loader would scan (include/exclude, size...), in
+        path order. Files that only lost lines have no changed line to
+        report on and are left out unless affected is true.
+        """
+        return loader.select(sorted(file_diff.path for file_diff in self.files.values()
+                                    if affected or file_diff))
+
+    def base_source(self, file_path):
+        """Raw bytes of the file at the base, None if it did not exist there."""
+        file_diff = self.files.get(file_path)
+        if file_diff is None or file_diff.old_path is None:
+            return None
+        try:
+            return _git(self.repo_path, "cat-file", "blob",
+                        f"{self.commit}:./{file_diff.old_path}")
+        except GitDiffError:
+            return None
+
+    def filter_issues(self, file_path, issues, affected=False, star_names=None,
+                      recover=False):
+        """
+        Issues of file_path to report: those on changed lines, those
+        without a line and parse errors; with affected=True also those
+        the base version of the file does not have. The base is analyzed
+        (with star_names / recover) only when some issue needs it.
+        """
+        file_diff = self.files.get(file_path)
+        if file_diff is None:
+            return issues
+        kept, elsewhere = [], []
+        for issue in issues:
+            line = issue.get("line")
+            if line is None or file_diff.touched(line) or _is_parse_error(issue):
+                kept.append(issue)
+            else:
+                elsewhere.append(issue)
+
+        if elsewhere and affected:
+            data = self.base_source(file_path)
+            before = set()
+            if data is not None:
+                try:
+                    before = {(issue.get("type"), issue.get("message"), issue.get("line"))
+                              for issue in Analyzer(data, star_names=star_names,
+                                                    recover=recover).analyze()}
+                except Exception:
+                    pass  # base not analyzable: every issue is new
+            new = [issue for issue in elsewhere
+                   if (issue.get("type"), issue.get("message"),
+                       file_diff.old_line(issue["line"])) not in before]
+            if new:
+                # Back to file order
+                position = {id(issue): i for i, issue in enumerate(issues)}
+                kept = sorted(kept + new, key=lambda issue: position[id(issue)])
+
+        self.dropped += len(issues) - len(kept)
+        return kept
@@ -0,0 +1,396 @@
+import ast
+import copy
+import re
+import tokenize
+from bisect import bisect_right
+from collections import OrderedDict
+
+from core import ast_cache
+from core.analyzer import Analyzer
+from core.issue import Issue
+from core.source import decode_source
+from core.symbols import SymbolTable, Scope, Binding, Reference
+from core.tokens import TokenStream, split_lines
+from core.detectors import (
+    IndentationDetector,
+    UndefinedVarDetector,
+    UnusedVarDetector,
+    DuplicateAssignDetector,
+    UnreachableCodeDetector,
+)
+
+# Segments kept for reuse, including ones no longer in the buffer (undo, paste back)
+DEFAULT_MAX_SEGMENTS = 2048
+# Symbol results kept per segment, one per set of names other segments bind
+MAX_VARIANTS = 4
+
+DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Block of every module-level binding of the merged module: top-level
+# statements of all segments form one statement list
+_MODULE_BLOCK = -1
+
+
+def _common_prefix(a, b):
+    """Number of equal leading items of two lists (binary search on slices)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _is_def(stmt):
+    return isinstance(stmt, DEFINITIONS)
+
+
+def _first_line(stmt):
+    """Line a top-level statement starts on, decorators included."""
+    return min([stmt.lineno] + [d.lineno for d in getattr(stmt, "decorator_list", ())])
+
+
+def group_statements(body):
+    """
+    0-based first lines of the segments of a parsed top-level body, from
+    the second one on: each definition is a segment of its own, and so is
+    each run of other statements between them.
+    """
+    starts = []
+    previous = None
+    for stmt in body:
+        if previous is not None and (_is_def(stmt) or _is_def(previous)):
+            starts.append(_first_line(stmt) - 1)
+        previous = stmt
+    return starts
+
+
+def _moved(issues, offset):
+    return [Issue(issue.type, issue.message,
+                  issue.line + offset if issue.line is not None else None, issue.column)
+            for issue in issues]
+
+
+class _Statement:
+    """Where a statement binding a module name ends (in buffer lines), and its value."""
+
+    __slots__ = ("end_lineno", "end_col_offset", "value")
+
+    def __init__(self, stmt, offset):
+        self.end_lineno = stmt.end_lineno + offset
+        self.end_col_offset = stmt.end_col_offset
+        self.value = getattr(stmt, "value", None)
+
+
+class _ModuleTable(SymbolTable):
+    """SymbolTable of the module scope alone, merged from every segment."""
+
+    def __init__(self, module, references):
+        self.opaque = frozenset()
+        self.module = module
+        self.scopes = [module]
+        self.references = references
+
+
+class Segment:
+    """
+    One definition, or one run of other top-level statements, analyzed
+    on its own: line numbers count from the segment's first line
+    - the symbol table is built once; references that no binding of the
+      segment resolves are pointed at the module when another segment
+      binds their name, and the name-based detectors are rerun on the
+      nested scopes only (the module scope is checked on the whole buffer)
+    - the unreachable-code issues and INDENT / DEDENT tokens do not
+      depend on other segments; indentation issues depend on the first
+      indentation character before the segment, so they are kept by it
+    """
+
+    __slots__ = ("tree", "table", "is_def", "module_names", "star_imports", "free",
+                 "free_names", "nested_free_names", "used", "captured", "module_reads",
+                 "unreachable", "indents", "_symbol_issues", "_indentation", "_bindings")
+
+    def __init__(self, text, tree=None):
+        self.tree = tree if tree is not None else ast.parse(text)
+        body = self.tree.body
+        self.is_def = len(body) == 1 and _is_def(body[0])
+
+        table = self.table = SymbolTable(self.tree)
+        module = table.module
+        self.module_names = frozenset(module.bindings)
+        self.star_imports = list(module.star_imports)
+        self.used = frozenset(module.used)
+        self.free = [ref for ref in table.references if ref.resolved is None]
+        self.free_names = frozenset(ref.name for ref in self.free)
+        self.nested_free_names = frozenset(ref.name for ref in self.free if ref.scope is not module)
+        self.captured = frozenset(ref.name for ref in table.references
+                                  if ref.resolved is module and ref.scope is not module)
+        self.module_reads = {}  # name -> [(line, col)] of reads at module level
+        for ref in table.references:
+            if ref.scope is module:
+                self.module_reads.setdefault(ref.name, []).append((ref.line, ref.col))
+
+        self.unreachable = UnreachableCodeDetector(self.tree).run()
+        self.indents = list(TokenStream(text).of_type(tokenize.INDENT, tokenize.DEDENT))
+        self._symbol_issues = {}
+        self._indentation = {}
+        self._bindings = (None, None)
+
+    def symbol_issues(self, module_names, module, star_names):
+        """
+        (undefined, unused, duplicate) issues of the segment when the
+        module binds module_names, checked in the merged module (whose
+        star imports decide whether undefined names are reported).
+        """
+        names = self.free_names & module_names
+        key = (names, bool(module.star_imports))
+        issues = self._symbol_issues.get(key)
+        if issues is None:
+            own = self.table.module
+            for ref in self.free:
+                ref.resolved = own if ref.name in names else None
+
+            view = copy.copy(self.table)
+            view.module = module
+            view.scopes = self.table.scopes[1:]
+            issues = (
+                UndefinedVarDetector(None, view, star_names).run(),
+                UnusedVarDetector(None, view).run(),
+                DuplicateAssignDetector(None, view).run(),
+            )
+            if len(self._symbol_issues) >= MAX_VARIANTS:
+                self._symbol_issues.clear()
+            self._symbol_issues[key] = issues
+        return issues
+
+    def module_bindings(self, offset):
+        """Module-level bindings of the segment, moved down by offset lines."""
+        if self._bindings[0] != offset:
+            statements = {}
+            body = id(self.tree.body)
+            moved = {}
+            for name, bindings in self.table.module.bindings.items():
+                moved[name] = shifted = []
+                for b in bindings:
+                    stmt = statements.get(id(b.stmt))
+                    if stmt is None:
+                        stmt = statements[id(b.stmt)] = _Statement(b.stmt, offset)
+                    line = b.line + offset if b.line is not None else None
+                    # a definition pasted twice shares one tree: keep its copies' blocks apart
+                    block = _MODULE_BLOCK if b.block == body else (offset, b.block)
+                    shifted.append(Binding(name, b.kind, line, b.col, stmt, block))
+            self._bindings = (offset, moved)
+        return self._bindings[1]
+
+    def indentation(self, style):
+        """(issues, first indentation character) after this segment, starting from style."""
+        result = self._indentation.get(style)
+        if result is None:
+            detector = IndentationDetector(None, style=style)
+            result = self._indentation[style] = (detector.check(self.indents), detector.style)
+        return result
+
+
+class IncrementalAnalyzer:
+    """
+    Analyzer for an editor buffer that is analyzed again after each edit
+    - the buffer is split into top-level definitions (and runs of other
+      statements between them); each segment is keyed by a hash of its
+      source and analyzed once, with lines counted from its first line
+    - after an edit only the segments around the changed lines are
+      split and parsed again; unchanged segments are reused, their issues
+      moved to the lines they are on now
+    - module-level names are merged over every segment, so undefined,
+      unused and duplicate names across definitions are reported exactly
+      as a whole-buffer analysis reports them
+    - a buffer that does not parse is analyzed as a whole (Analyzer), so
+      syntax errors and recovery are unchanged
+    analyze(code) returns the same issues, in the same order, as
+    Analyzer(code, star_names=star_names, recover=recover).analyze().
+    """
+
+    def __init__(self, star_names=None, recover=False, max_segments=DEFAULT_MAX_SEGMENTS):
+        self.star_names = star_names
+        self.recover = recover
+        self.max_segments = max_segments
+        self._cache = OrderedDict()  # source hash -> Segment
+        self._lines = None
+        self._starts = []            # 0-based first line of each segment
+        self._segments = []
+        self.segments_analyzed = 0
+        self.segments_reused = 0
+        self.full_analyses = 0
+
+    # -------------------------------------------------
+    # Segments
+    # -------------------------------------------------
+    def _segment(self, lines, start, end, tree=None):
+        text = "".join(lines[start:end])
+        key = ast_cache.ASTCache.key(text)
+        segment = self._cache.get(key)
+        if segment is not None:
+            self._cache.move_to_end(key)
+            self.segments_reused += 1
+            return segment
+        segment = Segment(text, tree)
+        self.segments_analyzed += 1
+        self._cache[key] = segment
+        while len(self._cache) > self.max_segments:
+            self._cache.popitem(last=False)
+        return segment
+
+    def _build(self, lines, starts, first, last, tree):
+        """
+        Segments of lines[first:last], split at starts (absolute lines).
+        tree: the parsed lines, reused when they make a single segment.
+        """
+        if not starts:
+            return [self._segment(lines, first, last, tree)]
+        bounds = [first] + starts + [last]
+        return [self._segment(lines, a, b) for a, b in zip(bounds, bounds[1:])]
+
+    def _split_all(self, text, lines):
+        tree = ast_cache.parse(text)
+        starts = group_statements(tree.body)
+        self._starts = [0] + starts if lines else []
+        # the cached tree is shared: a segment keeps (never changes) it
+        self._segments = self._build(lines, starts, 0, len(lines), tree) if lines else []
+
+    def _region(self, lines, a, b, delta):
+        """
+        Parse the new lines of old segments a..b (inclusive).
+        Returns (first line, end line, segment starts after the first, tree).
+        """
+        old = self._starts
+        first = old[a]
+        last = (old[b + 1] if b + 1 < len(old) else len(self._lines)) + delta
+        tree = ast.parse("".join(lines[first:last]))
+        return first, last, [first + start for start in group_statements(tree.body)], tree
+
+    def _update(self, lines):
+        """Split again only the segments the lines changed since the last call touch."""
+        old_lines = self._lines
+        n_old, n_new = len(old_lines), len(lines)
+        p = _common_prefix(old_lines, lines)
+        q = _common_prefix(old_lines[p:][::-1], lines[p:][::-1])
+        delta = n_new - n_old
+
+        # old lines p .. n_old - q - 1 changed (none for a pure insertion at p)
+        starts, segments = self._starts, self._segments
+        count = len(segments)
+        a = bisect_right(starts, min(p, n_old - 1)) - 1
+        b = bisect_right(starts, min(max(n_old - q - 1, p), n_old - 1)) - 1
+
+        widened = False
+        while True:
+            try:
+                first, last, new_starts, tree = self._region(lines, a, b, delta)
+            except SyntaxError:
+                # the edit may belong to a neighbour (indented lines after a
+                # definition, a decorator above one): widen the region once
+                if widened or (a == 0 and b == count - 1):
+                    raise
+                widened = True
+                a, b = max(a - 1, 0), min(b + 1, count - 1)
+                continue
+            # Runs of plain statements are never split: the unreachable-code
+            # state flows from one statement of a run to the next
+            body = tree.body
+            if a > 0 and not (body and _is_def(body[0])) and not segments[a - 1].is_def:
+                a -= 1
+            elif b + 1 < count and not (body and _is_def(body[-1])) and not segments[b + 1].is_def:
+                b += 1
+            else:
+                break
+
+        self.segments_reused += a + count - b - 1
+        region = self._build(lines, new_starts, first, last, tree) if last > first else []
+        self._starts = (starts[:a] + ([first] if region else []) + new_starts
+                        + [start + delta for start in starts[b + 1:]])
+        self._segments = segments[:a] + region + segments[b + 1:]
+
+    # -------------------------------------------------
+    # Merge
+    # -------------------------------------------------
+    def _merge(self):
+        star_names = self.star_names
+        layout = list(zip(self._starts, self._segments))
+
+        module_names = frozenset().union(*(s.module_names for s in self._segments))
+        module = Scope("module", "<module>", None, None)
+        module.star_imports = [imp for s in self._segments for imp in s.star_imports]
+
+        undefined, unused, duplicate = [], [], []
+        captured = set()
+        for start, segment in layout:
+            found = segment.symbol_issues(module_names, module, star_names)
+            undefined += _moved(found[0], start)
+            unused.append((start, found[1]))
+            duplicate.append((start, found[2]))
+            for name, bindings in segment.module_bindings(start).items():
+                module.bindings.setdefault(name, []).extend(bindings)
+            module.used |= segment.used
+            module.used |= segment.free_names & module_names
+            captured |= segment.captured
+            captured |= segment.nested_free_names & module_names
+
+        # Module scope: reads of names bound more than once (duplicates),
+        # reads from nested scopes and locals() calls, in buffer lines
+        references = []
+        for name, bindings in module.bindings.items():
+            if len(bindings) < 2 or name in captured:
+                continue
+            for start, segment in layout:
+                for line, col in segment.module_reads.get(name, ()):
+                    ref = Reference(name, line + start, col, module)
+                    ref.resolved = module
+                    references.append(ref)
+        for name in captured:
+            ref = Reference(name, 0, 0, None)
+            ref.resolved = module
+            references.append(ref)
+        if "locals" not in module_names and any("locals" in s.module_reads for s in self._segments):
+            references.append(Reference("locals", 0, 0, module))
+        table = _ModuleTable(module, references)
+
+        issues = undefined
+        issues += UnusedVarDetector(None, table).run()
+        for start, found in unused:
+            issues += _moved(found, start)
+        issues += DuplicateAssignDetector(None, table).run()
+        for start, found in duplicate:
+            issues += _moved(found, start)
+        for start, segment in layout:
+            issues += _moved(segment.unreachable, start)
+        style = None
+        for start, segment in layout:
+            found, style = segment.indentation(style)
+            issues += _moved(found, start)
+        return issues
+
+    # -------------------------------------------------
+    # Main API
+    # -------------------------------------------------
+    def analyze(self, code):
+        """Issues of the buffer code (text, or raw bytes decoded as a file would be)."""
+        text = code if isinstance(code, str) else decode_source(code)
+        lines = split_lines(text)
+        try:
+            if self._lines is not None and self._segments:
+                if lines == self._lines:
+                    return self._merge()
+                try:
+                    self._update(lines)
+                except SyntaxError:
+                    self._split_all(text, lines)
+            else:
+                self._split_all(text, lines)
+        except SyntaxError:
+            # Syntax errors (and recovery) are whole-buffer business
+            self._lines = None
+            self._starts, self._segments = [], []
+            self.full_analyses += 1
+            return Analyzer(code, star_names=self.star_names, recover=self.recover).analyze()
+        self._lines = lines
+        return self._merge()
@@ -0,0 +1,89 @@
+from sys import intern
+
+
+class Issue:
+    """
+    Compact issue record shared by detectors, Analyzer and DebuggerEngine
+    - __slots__ instead of a per-issue dict
+    - type / severity / file values are interned, so repeats share one string
+    - Dict-style access (issue["line"], issue.get("column")) for existing callers
+    - to_dict() / from_dict() for JSON, caches and other plain-dict consumers
+    """
+
+    __slots__ = ("type", "message", "line", "column", "file", "severity")
+
+    FIELDS = __slots__
+    _INTERNED = frozenset(("type", "file", "severity"))
+
+    def __init__(self, type, message, line=None, column=None, file=None, severity=None):
+        self.type = intern(type)
+        self.message = message
+        self.line = line
+        self.column = column
+        self.file = intern(file) if file is not None else None
+        self.severity = intern(severity) if severity is not None else None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: v for k, v in data.items() if k in cls.FIELDS})
+
+    def to_dict(self):
+        """Plain dict with only the fields that are set."""
+        result = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        return result
+
+    # -------------------------------------------------
+    # Dict compatibility
+    # -------------------------------------------------
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        if key in self._INTERNED and value is not None:
+            value = intern(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    # -------------------------------------------------
+    # Comparison / pickling
+    # -------------------------------------------------
+    def __eq__(self, other):
+        if isinstance(other, Issue):
+            return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the dicts it replaces
+
+    def __reduce__(self):
+        # Rebuild through __init__ so strings are interned in the receiving process
+        return (Issue, tuple(getattr(self, f) for f in self.FIELDS))
+
+    def __repr__(self):
+        return f"Issue({self.to_dict()!r})"
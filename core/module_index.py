@@ -0,0 +1,412 @@
+import ast
+import json
+import os
+import tempfile
+
+from core import ast_cache
+from core.cache import content_digest, DEFAULT_CACHE_DIR
+
+INDEX_FILENAME = "module_index.json"
+# Bump when the stored entry layout or the export rules change
+INDEX_VERSION = 1
+
+# Statements whose bodies still run at module level
+_BLOCKS = (ast.If, ast.Try, ast.With, ast.AsyncWith, ast.For, ast.AsyncFor, ast.While)
+if hasattr(ast, "TryStar"):
+    _BLOCKS += (ast.TryStar,)
+
+
+def _literal_names(node):
+    """Strings of a list / tuple literal (or a `+` chain of them); None if dynamic."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _literal_names(node.left), _literal_names(node.right)
+        return None if left is None or right is None else left + right
+    if isinstance(node, (ast.List, ast.Tuple)):
+        names = []
+        for elt in node.elts:
+            if not (isinstance(elt, ast.Constant) and isinstance(elt.value, str)):
+                return None
+            names.append(elt.value)
+        return names
+    return None
+
+
+def _target_names(target):
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for elt in target.elts:
+            yield from _target_names(elt)
+    elif isinstance(target, ast.Starred):
+        yield from _target_names(target.value)
+
+
+def scan_exports(tree):
+    """
+    Module-level names of a parsed module, without a full symbol table
+    Returns (names, all_names, stars, dynamic):
+    - names: every module-level binding, in first-bound order
+    - all_names: the literal __all__ list, or None when there is none
+    - stars: (module, level) of each `from module import *`
+    - dynamic: __all__ is built in a way that cannot be read statically
+    """
+    names = {}
+    all_names = None
+    stars = []
+    dynamic = False
+
+    stack = list(reversed(tree.body))
+    while stack:
+        stmt = stack.pop()
+
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names[stmt.name] = None
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                names[alias.asname or alias.name.split(".")[0]] = None
+        elif isinstance(stmt, ast.ImportFrom):
+            for alias in stmt.names:
+                if alias.name == "*":
+                    stars.append((stmt.module, stmt.level))
+                else:
+                    names[alias.asname or alias.name] = None
+        elif isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            for target in targets:
+                for name in _target_names(target):
+                    names[name] = None
+                    if name != "__all__":
+                        continue
+                    listed = _literal_names(stmt.value) if stmt.value is not None else None
+                    if listed is None:
+                        dynamic = True
+                    elif isinstance(stmt, ast.AugAssign):
+                        all_names = (all_names or []) + listed
+                    else:
+                        all_names = listed
+        elif isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
+            # __all__.append("x") / __all__.extend([...])
+            func = stmt.value.func
+            if (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                    and func.value.id == "__all__" and func.attr in ("append", "extend")):
+                args = stmt.value.args
+                if func.attr == "append" and args and isinstance(args[0], ast.Constant):
+                    all_names = (all_names or []) + [args[0].value]
+                elif func.attr == "extend" and args and _literal_names(args[0]) is not None:
+                    all_names = (all_names or []) + _literal_names(args[0])
+                else:
+                    dynamic = True
+
+        if isinstance(stmt, (ast.For, ast.AsyncFor)):
+            for name in _target_names(stmt.target):
+                names[name] = None
+        elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+            for item in stmt.items:
+                if item.optional_vars is not None:
+                    for name in _target_names(item.optional_vars):
+                        names[name] = None
+        if isinstance(stmt, _BLOCKS):
+            bodies = [stmt.body, getattr(stmt, "orelse", []), getattr(stmt, "finalbody", [])]
+            for handler in getattr(stmt, "handlers", []):
+                if handler.name:
+                    names[handler.name] = None
+                bodies.append(handler.body)
+            for body in reversed(bodies):
+                stack.extend(reversed(body))
+
+    return list(names), all_names, stars, dynamic
+
+
+class ModuleExports:
+    """Index entry for one file."""
+
+    __slots__ = ("path", "module", "is_package", "signature", "digest",
+                 "names", "all_names", "stars", "dynamic")
+
+    def __init__(self, path, module, is_package, signature, digest,
+                 names=(), all_names=None, stars=(), dynamic=False):
+        self.path = path
+        self.module = module
+        self.is_package = is_package
+        self.signature = signature  # (mtime_ns, size) at scan time
+        self.digest = digest        # content hash at scan time
+        self.names = list(names)
+        self.all_names = all_names
+        self.stars = [tuple(star) for star in stars]
+        self.dynamic = dynamic
+
+    def to_dict(self):
+        return {
+            "module": self.module,
+            "package": self.is_package,
+            "signature": list(self.signature),
+            "digest": self.digest,
+            "names": self.names,
+            "all": self.all_names,
+            "stars": [list(star) for star in self.stars],
+            "dynamic": self.dynamic,
+        }
+
+    @classmethod
+    def from_dict(cls, path, data):
+        return cls(path, data["module"], data["package"], tuple(data["signature"]),
+                   data["digest"], data["names"], data["all"], data["stars"],
+                   data["dynamic"])
+
+
+class ModuleIndex:
+    """
+    Project-wide map of module name -> exported names
+    - built once per scan from the files a RepoLoader yields
+    - persisted as JSON; unchanged files (same mtime/size, or same content
+      hash) are not parsed again, so rebuilding is incremental
+    - resolves `from module import *` across the repo, following star
+      re-exports and honoring __all__
+    Modules outside the repo, and dynamic __all__, resolve to None: unknown.
+    """
+
+    def __init__(self, repo_path=".", cache_dir=DEFAULT_CACHE_DIR):
+        self.root = os.path.abspath(repo_path)
+        self.path = os.path.join(cache_dir, INDEX_FILENAME) if cache_dir else None
+        self.entries = {}   # file path -> ModuleExports
+        self.modules = {}   # module name -> ModuleExports
+        self.scanned = 0
+        self.reused = 0
+        self._resolved = {}
+        self._package_dirs = {}
+        self._dirty = False
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self  # unreadable index: rebuild from scratch
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return self
+        self.entries = {
+            path: ModuleExports.from_dict(path, entry)
+            for path, entry in data["entries"].items()
+        }
+        self._reindex()
+        return self
+
+    def save(self):
+        """Write the index atomically, only when something changed."""
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "entries": {path: e.to_dict() for path, e in self.entries.items()},
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._dirty = False
+
+    # -------------------------------------------------
+    # Building
+    # -------------------------------------------------
+    def build(self, file_paths):
+        """Index exactly file_paths: rescan changed files, drop vanished ones."""
+        file_paths = list(file_paths)
+        wanted = set(file_paths)
+        self._package_dirs = {}
+        for path in [p for p in self.entries if p not in wanted]:
+            del self.entries[path]
+            self._dirty = True
+        self.update(file_paths)
+        return self
+
+    def update(self, file_paths):
+        """Rescan the given files if they changed since they were indexed."""
+        for path in file_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.remove([path])
+                continue
+            signature = (st.st_mtime_ns, st.st_size)
+            entry = self.entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self.reused += 1
+                continue
+            self._scan(path, signature, entry)
+        self._reindex()
+
+    def remove(self, file_paths):
+        for path in file_paths:
+            if self.entries.pop(path, None) is not None:
+                self._dirty = True
+        self._reindex()
+
+    def _scan(self, path, signature, previous):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.entries.pop(path, None)
+            return
+        digest = content_digest(data)
+        self._dirty = True
+        if previous is not None and previous.digest == digest:
+            # touched but not modified
+            previous.signature = signature
+            self.reused += 1
+            return
+
+        self.scanned += 1
+        module, is_package = self.module_name(path)
+        entry = ModuleExports(path, module, is_package, signature, digest)
+        try:
+            tree = ast_cache.parse(data)
+        except (SyntaxError, ValueError):
+            entry.dynamic = True  # unparsable: exports unknown
+        else:
+            entry.names, entry.all_names, entry.stars, entry.dynamic = scan_exports(tree)
+        self.entries[path] = entry
+
+    def _reindex(self):
+        self.modules = {}
+        for entry in self.entries.values():
+            self.modules.setdefault(entry.module, entry)
+        self._resolved = {}
+
+    # -------------------------------------------------
+    # Module names
+    # -------------------------------------------------
+    def _is_package_dir(self, directory):
+        known = self._package_dirs.get(directory)
+        if known is None:
+            known = self._package_dirs[directory] = os.path.exists(
+                os.path.join(directory, "__init__.py"))
+        return known
+
+    def module_name(self, path):
+        """
+        Dotted module name of a file, found the way the import system would:
+        climb while the parent directory is a package (has __init__.py).
+        """
+        path = os.path.abspath(path)
+        directory, filename = os.path.split(path)
+        stem = os.path.splitext(filename)[0]
+        is_package = stem == "__init__"
+        parts = [] if is_package else [stem]
+        while self._is_package_dir(directory) and directory != os.path.dirname(directory):
+            directory, package = os.path.split(directory)
+            parts.append(package)
+            if directory == os.path.dirname(self.root):
+                break
+        return ".".join(reversed(parts)), is_package
+
+    @staticmethod
+    def absolute(importer, is_package, module, level):
+        """Absolute module name of `from <level dots><module> import ...`."""
+        if not level:
+            return module
+        base = importer.split(".") if importer else []
+        if not is_package:
+            base = base[:-1]
+        if level > 1:
+            if level - 1 > len(base):
+                return None
+            base = base[:len(base) - (level - 1)]
+        if module:
+            base.append(module)
+        return ".".join(base) or None
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def exports(self, module):
+        """
+        Names `from module import *` binds, or None when unknown.
+        Modules that star-import each other (directly or through others)
+        are solved together as a fixed point: each exports the union of
+        what the cycle binds, whichever module is asked first.
+        """
+        if module in self._resolved:
+            return self._resolved[module]
+
+        # Star targets of every module reachable from module (None: unknown)
+        targets = {}
+        stack = [module]
+        while stack:
+            name = stack.pop()
+            if name in targets or name in self._resolved:
+                continue
+            entry = self.modules.get(name)
+            if entry is None or entry.dynamic:
+                targets[name] = None
+            elif entry.all_names is not None:
+                targets[name] = ()
+            else:
+                targets[name] = [self.absolute(entry.module, entry.is_package, star, level)
+                                 for star, level in entry.stars]
+                stack.extend(target for target in targets[name] if target)
+
+        results = {}
+        for name, deps in targets.items():
+            entry = self.modules.get(name)
+            if deps is None:
+                results[name] = None
+            elif entry.all_names is not None:
+                results[name] = frozenset(entry.all_names)
+            else:
+                results[name] = frozenset(n for n in entry.names if not n.startswith("_"))
+
+        # Names only grow (or turn unknown), so this ends
+        changed = True
+        while changed:
+            changed = False
+            for name, deps in targets.items():
+                result = results[name]
+                if result is None or not deps:
+                    continue
+                names = set(result)
+                for target in deps:
+                    exported = (None if target is None else self._resolved[target]
+                                if target in self._resolved else results[target])
+                    if exported is None:
+                        names = None
+                        break
+                    names.update(n for n in exported if not n.startswith("_"))
+                if names is None or len(names) != len(result):
+                    results[name] = None if names is None else frozenset(names)
+                    changed = True
+
+        self._resolved.update(results)
+        return results[module]
+
+    def _star_names(self, entry):
+        names = set()
+        for module, level in entry.stars:
+            target = self.absolute(entry.module, entry.is_package, module, level)
+            exported = self.exports(target) if target else None
+            if exported is None:
+                return None
+            names |= exported
+        return names
+
+    def star_names(self, file_path):
+        """
+        Names the star imports of file_path bind: None when the file has
+        no star import or one of them cannot be resolved inside the repo.
+        """
+        entry = self.entries.get(file_path)
+        if entry is None or not entry.stars:
+            return None
+        names = self._star_names(entry)
+        return frozenset(names) if names is not None else None
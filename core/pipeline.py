@@ -0,0 +1,333 @@
+from core.repo_loader import RepoLoader
+from core.analyzer import Analyzer
+from core.source import read_source, decode_source, detect_encoding
+from core.profiling import FileProfile, ProfileReport
+from core import ast_cache
+from fixer import apply_all_fixes
+from validator.validator import CodeValidator
+from validator.rollback import RollbackManager, RollbackJournal, DEFAULT_JOURNAL_DIR
+
+import argparse
+import os
+import sys
+import tempfile
+from collections import deque
+from itertools import islice
+
+# Per-file outcome of the pipeline
+FIXED = "fixed"              # fixes passed validation (and were written)
+ROLLED_BACK = "rolled_back"  # validation asked for a rollback: file kept as is
+UNTOUCHED = "untouched"      # nothing to fix
+FAILED = "error"             # the file could not be processed
+
+STAGES = ("read", "analyze", "fix", "validate", "verify", "write")
+
+
+class PipelineResult:
+    """Outcome of analyze -> fix -> validate -> write for one file, as sent back from workers."""
+
+    __slots__ = ("path", "status", "issues_found", "issues_remaining", "fix_log",
+                 "trust_score", "reason", "fixed_hash", "profile")
+
+    def __init__(self, path, status=UNTOUCHED, issues_found=0, issues_remaining=None,
+                 fix_log=(), trust_score=None, reason=None, fixed_hash=None, profile=None):
+        self.path = path
+        self.status = status
+        self.issues_found = issues_found
+        self.issues_remaining = issues_remaining  # after the fix; None if not fixed
+        self.fix_log = list(fix_log)
+        self.trust_score = trust_score            # CodeValidator score of the fix
+        self.reason = reason                      # why it was rolled back / failed
+        self.fixed_hash = fixed_hash
+        self.profile = profile                    # FileProfile.to_dict(): stage timings
+
+    def __reduce__(self):
+        return (PipelineResult, (self.path, self.status, self.issues_found,
+                                 self.issues_remaining, self.fix_log, self.trust_score,
+                                 self.reason, self.fixed_hash, self.profile))
+
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def write_atomic(path, data, expected_signature=None):
+    """
+    Replace path with data (bytes) through a temporary file in the same
+    directory, keeping the file mode. With expected_signature, refuse to
+    overwrite a file that changed since it was read.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        if expected_signature is not None and _stat_signature(path) != expected_signature:
+            raise RuntimeError("file changed while it was being fixed")
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def process_file(file_path, write=True, recover=False, journal=None):
+    """
+    Run one file through analyze -> fix -> validate -> write.
+    Never raises: failures come back with status "error".
+
+    The file is only written when CodeValidator accepts the fix, so a
+    rollback never has to restore anything on disk. Every stage parses
+    through core.ast_cache, so the fixed code is parsed once for both
+    the validator and the count of issues left after the fix.
+    write: False is a dry run (nothing is written).
+    recover: analyze past syntax errors (see core.recovery), so one run
+    can fix several of them.
+    journal: JournalRun the pre-fix content is recorded in before writing.
+    """
+    profile = FileProfile(file_path)
+    result = PipelineResult(file_path)
+    try:
+        with profile.phase("read"):
+            signature = _stat_signature(file_path)
+            with read_source(file_path, mmap_threshold=None) as source:
+                data = source.data
+            encoding = detect_encoding(data)
+            original = decode_source(data)
+
+        with profile.phase("analyze"):
+            issues = Analyzer(original, recover=recover).analyze()
+        result.issues_found = len(issues)
+
+        if issues:
+            with profile.phase("fix"):
+                fixed, fix_log = apply_all_fixes(original, issues)
+            result.fix_log = fix_log
+
+            if fixed != original:
+                with profile.phase("validate"):
+                    validation = CodeValidator(original, fixed).validate()
+                result.trust_score = validation.trust_score
+                result.fixed_hash = validation.metrics["fixed_hash"]
+
+                if validation.rollback_required:
+                    result.status = ROLLED_BACK
+                    result.reason = "; ".join(validation.errors) or validation.readiness
+                else:
+                    with profile.phase("verify"):
+                        remaining = Analyzer(fixed, recover=recover).analyze()
+                    result.issues_remaining = len(remaining)
+                    if write:
+                        with profile.phase("write"):
+                            fixed_data = fixed.encode(encoding)
+                            if journal is not None:
+                                journal.record(file_path, data, fixed_data)
+                            write_atomic(file_path, fixed_data, signature)
+                    result.status = FIXED
+
+    except Exception as e:
+        result.status = FAILED
+        result.reason = f"{type(e).__name__}: {e}"
+
+    result.profile = profile.to_dict()
+    return result
+
+
+def process_chunk(file_paths, write=True, recover=False,
+                  ast_cache_bytes=ast_cache.DEFAULT_MAX_BYTES, journal=None):
+    """Worker entry point: run a batch of files, results in input order."""
+    ast_cache.configure(ast_cache_bytes)
+    return [process_file(file_path, write, recover, journal) for file_path in file_paths]
+
+
+class PipelineReport:
+    """Fixed / rolled-back / untouched files of a pipeline run, with stage timings."""
+
+    def __init__(self):
+        self.files = {FIXED: [], ROLLED_BACK: [], UNTOUCHED: [], FAILED: []}
+        self.results = []
+        self.timings = ProfileReport()
+        self.run_id = None  # rollback journal run of the written fixes
+
+    def add(self, result):
+        self.results.append(result)
+        self.files[result.status].append(result.path)
+        if result.profile is not None:
+            self.timings.add(result.profile)
+
+    def format(self, write=True):
+        lines = ["=== PIPELINE RESULTS ==="]
+        for result in self.results:
+            if result.status == FIXED:
+                applied = sum(1 for entry in result.fix_log if entry.startswith("Fixed"))
+                lines.append(f"FIXED        {result.path}  ({applied} fixes, "
+                             f"{result.issues_found} -> {result.issues_remaining} issues, "
+                             f"trust {result.trust_score})")
+            elif result.status == ROLLED_BACK:
+                lines.append(f"ROLLED BACK  {result.path}  ({result.reason})")
+            elif result.status == FAILED:
+                lines.append(f"ERROR        {result.path}  ({result.reason})")
+
+        lines.append("")
+        lines.append(f"Fixed: {len(self.files[FIXED])}{'' if write else ' (dry run, not written)'}  "
+                     f"Rolled back: {len(self.files[ROLLED_BACK])}  "
+                     f"Untouched: {len(self.files[UNTOUCHED])}  "
+                     f"Errors: {len(self.files[FAILED])}")
+        if self.run_id is not None and self.files[FIXED]:
+            lines.append(f"Undo with: python -m validator.rollback restore {self.run_id}")
+
+        lines.append("\nStages (wall / cpu):")
+        phases = self.timings.phases
+        for name in STAGES:
+            if name in phases:
+                t = phases[name]
+                lines.append(f"  {name:<10} {t['wall'] * 1000:10.2f} ms  {t['cpu'] * 1000:10.2f} ms")
+        return "\n".join(lines)
+
+
+class FixPipeline:
+    """
+    Repo-wide fix-then-validate pipeline
+    - analyze -> fix -> validate per file, serially or across a process pool
+    - fixes are written atomically, only when CodeValidator accepts them
+    - fixes with rollback_required are recorded with a RollbackManager
+    - written files are journaled first, so a run can be undone as a whole
+    - results stream in file order (iter_results) or aggregate (run)
+    """
+
+    def __init__(self, repo_path=".", workers=1, chunksize=None, loader=None,
+                 write=True, recover=False, ast_cache_bytes=ast_cache.DEFAULT_MAX_BYTES,
+                 journal=None):
+        """
+        workers: number of processes; 1 runs in-process, None/0 uses every CPU
+        chunksize: files per work unit sent to a worker (auto when None)
+        loader: configured RepoLoader (default: RepoLoader(repo_path))
+        write: False reports what would be fixed without touching files
+        recover: analyze past syntax errors (see core.recovery)
+        ast_cache_bytes: budget of core.ast_cache while the pipeline runs;
+            the validate and verify stages share each fixed file's tree
+        journal: RollbackJournal recording the files each run writes
+            (see python -m validator.rollback restore); None disables it
+        """
+        self.repo_path = repo_path
+        self.loader = loader or RepoLoader(repo_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.write = write
+        self.recover = recover
+        self.ast_cache_bytes = ast_cache_bytes
+        self.journal = journal
+        self.journal_run = None
+        self.rollback = RollbackManager(journal)
+
+    def _chunks(self, files):
+        size = self.chunksize
+        if not size:
+            size = max(1, min(16, len(files) // (self.workers * 4)))
+        files = iter(files)
+        while True:
+            chunk = list(islice(files, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _iter_parallel(self, files):
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Bounded window of in-flight chunks, as in DebuggerEngine
+        window = self.workers * 4
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending = deque()
+        try:
+            for chunk in self._chunks(files):
+                future = pool.submit(process_chunk, chunk, self.write, self.recover,
+                                     self.ast_cache_bytes, self.journal_run)
+                pending.append((chunk, future))
+                if len(pending) >= window:
+                    yield from self._collect(*pending.popleft())
+
+            while pending:
+                yield from self._collect(*pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _collect(chunk, future):
+        try:
+            return future.result()
+        except Exception as e:
+            # A dead worker only costs the files of its own chunk
+            return [PipelineResult(file_path, FAILED, reason=f"{type(e).__name__}: {e}")
+                    for file_path in chunk]
+
+    def iter_results(self):
+        """Stream one PipelineResult per file, in file order."""
+        files = list(self.loader.iter_python_files())
+        if self.write and self.journal is not None:
+            self.journal_run = self.journal.begin()
+        ast_budget = ast_cache.get_ast_cache().max_bytes
+        try:
+            if self.workers > 1:
+                results = self._iter_parallel(files)
+            else:
+                ast_cache.configure(self.ast_cache_bytes)
+                results = (process_file(file_path, self.write, self.recover, self.journal_run)
+                           for file_path in files)
+
+            for result in results:
+                if result.status == ROLLED_BACK:
+                    self.rollback.recommend(result.fixed_hash or result.path, result.reason)
+                yield result
+        finally:
+            ast_cache.configure(ast_budget)
+            if self.journal_run is not None and not self.journal.end(self.journal_run):
+                self.journal_run = None
+
+    def run(self):
+        report = PipelineReport()
+        for result in self.iter_results():
+            report.add(result)
+        if self.journal_run is not None:
+            report.run_id = self.journal_run.run_id
+        return report
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.pipeline",
+        description="Analyze, fix and validate every Python file of a repository"
+    )
+    parser.add_argument("repo_path", nargs="?", default=".",
+                        help="repository or directory to fix (default: .)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="files per work unit in parallel mode")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would be fixed without writing files")
+    parser.add_argument("--recover", action="store_true",
+                        help="analyze past syntax errors so several can be fixed in one run")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_DIR, metavar="DIR",
+                        help=f"rollback journal of written files (default: {DEFAULT_JOURNAL_DIR})")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="do not journal written files (runs cannot be undone)")
+    parser.add_argument("--ast-cache-mb", type=int,
+                        default=ast_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="memory budget of the shared parse cache (default: 32)")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    pipeline = FixPipeline(args.repo_path, workers=args.workers, chunksize=args.chunksize,
+                           write=not args.dry_run, recover=args.recover,
+                           ast_cache_bytes=args.ast_cache_mb * 1024 * 1024,
+                           journal=None if args.no_journal else RollbackJournal(args.journal))
+    report = pipeline.run()
+    print(report.format(write=pipeline.write))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import heapq
+import json
+from time import perf_counter, process_time
+
+
+class _NullTimer:
+    """Shared no-op context manager used when profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullProfile:
+    """
+    Profiling disabled: every hook is a no-op.
+    Costs one method call per phase per file and nothing inside the AST walk.
+    """
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_TIMER
+
+    def detector(self, name):
+        return _NULL_TIMER
+
+    def detector_totals(self, name):
+        return None
+
+    def add_nodes(self, count):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+class _Timer:
+    __slots__ = ("totals", "wall", "cpu")
+
+    def __init__(self, totals):
+        self.totals = totals  # [wall, cpu] accumulator
+
+    def __enter__(self):
+        self.wall = perf_counter()
+        self.cpu = process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.totals[0] += perf_counter() - self.wall
+        self.totals[1] += process_time() - self.cpu
+        return False
+
+
+class FileProfile:
+    """
+    Wall / CPU seconds per phase and per detector for one file,
+    plus the number of AST nodes visited.
+    """
+    enabled = True
+
+    __slots__ = ("path", "phases", "detectors", "nodes")
+
+    def __init__(self, path):
+        self.path = path
+        self.phases = {}     # name -> [wall, cpu]
+        self.detectors = {}  # name -> [wall, cpu]
+        self.nodes = 0
+
+    def phase(self, name):
+        return _Timer(self.phases.setdefault(name, [0.0, 0.0]))
+
+    def detector(self, name):
+        return _Timer(self.detector_totals(name))
+
+    def detector_totals(self, name):
+        """Accumulator for a detector, shared with FusedWalker's handler timing."""
+        return self.detectors.setdefault(name, [0.0, 0.0])
+
+    def add_nodes(self, count):
+        self.nodes += count
+
+    def to_dict(self):
+        def table(data):
+            return {k: {"wall": round(w, 6), "cpu": round(c, 6)} for k, (w, c) in data.items()}
+        return {
+            "path": self.path,
+            "wall": round(sum(w for w, _ in self.phases.values()), 6),
+            "phases": table(self.phases),
+            "detectors": table(self.detectors),
+            "nodes": self.nodes,
+        }
+
+
+def timed_handler(handler, totals):
+    """Wrap a walker handler so its wall/CPU time accumulates into totals."""
+    def wrapper(node):
+        wall = perf_counter()
+        cpu = process_time()
+        result = handler(node)
+        totals[0] += perf_counter() - wall
+        totals[1] += process_time() - cpu
+        return result
+    return wrapper
+
+
+class ProfileReport:
+    """Aggregates FileProfile dicts across a scan."""
+
+    def __init__(self):
+        self.files = []
+        self.phases = {}
+        self.detectors = {}
+        self.nodes = 0
+
+    @staticmethod
+    def _merge(target, source):
+        for name, times in source.items():
+            totals = target.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            totals["wall"] += times["wall"]
+            totals["cpu"] += times["cpu"]
+
+    def add(self, file_profile):
+        self.files.append(file_profile)
+        self._merge(self.phases, file_profile["phases"])
+        self._merge(self.detectors, file_profile["detectors"])
+        self.nodes += file_profile["nodes"]
+
+    def top_files(self, n=10):
+        return heapq.nlargest(n, self.files, key=lambda f: f["wall"])
+
+    def top_detectors(self, n=10):
+        ranked = sorted(self.detectors.items(), key=lambda kv: kv[1]["wall"], reverse=True)
+        return ranked[:n]
+
+    def format(self, n=10):
+        lines = ["=== PROFILE ==="]
+        lines.append(f"Files: {len(self.files)}  AST nodes visited: {self.nodes}")
+
+        lines.append("\nPhases (wall / cpu):")
+        for name, t in sorted(self.phases.items(), key=lambda kv: kv[1]["wall"], reverse=True):
+            lines.append(f"  {name:<20} {t['wall'] * 1000:10.2f} ms  {t['cpu'] * 1000:10.2f} ms")
+
+        lines.append(f"\nTop {n} detectors (wall / cpu):")
+        for name, t in self.top_detectors(n):
+            lines.append(f"  {name:<28} {t['wall'] * 1000:10.2f} ms  {t['cpu'] * 1000:10.2f} ms")
+
+        lines.append(f"\nTop {n} slowest files (wall):")
+        for f in self.top_files(n):
+            slowest = max(f["phases"].items(), key=lambda kv: kv[1]["wall"], default=("-", None))[0]
+            lines.append(f"  {f['wall'] * 1000:10.2f} ms  {f['path']}  (slowest phase: {slowest})")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "phases": self.phases,
+            "detectors": self.detectors,
+            "nodes": self.nodes,
+            "files": self.files,
+        }
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,148 @@
+import ast
+import re
+import tokenize
+
+from core.detectors.syntax import SyntaxDetector
+from core.tokens import split_lines
+
+# Keywords that continue the previous top-level statement
+CONTINUATIONS = frozenset({"else", "elif", "except", "finally"})
+
+# Keywords that can only begin a statement: one at column 0 inside an open
+# bracket means the bracket was never closed
+STATEMENT_STARTS = frozenset({
+    "def", "class", "import", "from", "return", "try", "while", "with",
+    "for", "if", "async", "raise", "pass", "global", "del", "assert", "@",
+})
+
+_OPEN = frozenset("([{")
+_CLOSE = frozenset(")]}")
+_SKIP = frozenset({tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT})
+_IDENTIFIER = re.compile(r"[^\W\d]\w*")
+
+
+def _scan(lines, pos, blocks):
+    """
+    Tokenize from line index pos, appending (first, last) block ranges.
+    Returns the line index to resume from: a restart happens after an
+    unclosed bracket or an inconsistent dedent, so tokenize never has to
+    see the same line twice.
+    """
+    n = len(lines)
+    cursor = pos
+
+    def readline():
+        nonlocal cursor
+        if cursor >= n:
+            return ""
+        cursor += 1
+        return lines[cursor - 1]
+
+    start = pos
+    depth = 0
+    logical_start = True
+    after_decorator = False
+    last_row = -1
+
+    try:
+        for tok in tokenize.generate_tokens(readline):
+            ttype = tok.type
+            if ttype == tokenize.ENDMARKER:
+                break
+            if ttype in _SKIP:
+                continue
+            if ttype == tokenize.NEWLINE:
+                logical_start = True
+                continue
+
+            row = pos + tok.start[0] - 1
+            first_on_line = row != last_row and tok.start[1] == 0
+            last_row = row
+
+            if logical_start:
+                logical_start = False
+                if (first_on_line and row > start and not after_decorator
+                        and tok.string not in CONTINUATIONS):
+                    blocks.append((start, row - 1))
+                    start = row
+                after_decorator = tok.string == "@"
+            elif depth and first_on_line and tok.string in STATEMENT_STARTS:
+                blocks.append((start, row - 1))
+                return row
+
+            if ttype == tokenize.OP:
+                if tok.string in _OPEN:
+                    depth += 1
+                elif tok.string in _CLOSE and depth:
+                    depth -= 1
+    except tokenize.TokenError:
+        pass  # EOF inside a bracket or string: the rest is one block
+    except IndentationError as e:
+        # dedent to a column no enclosing block uses
+        row = pos + (e.lineno or 1) - 1
+        if row > start:
+            blocks.append((start, row - 1))
+            return row
+        blocks.append((start, row))
+        return row + 1
+
+    blocks.append((start, n - 1))
+    return n
+
+
+def split_blocks(lines):
+    """(first, last) line index ranges of the top-level statements of lines."""
+    blocks = []
+    pos = 0
+    while pos < len(lines):
+        pos = _scan(lines, pos, blocks)
+    return blocks
+
+
+class Recovered:
+    """Outcome of parsing a broken file block by block."""
+
+    __slots__ = ("tree", "issues", "opaque_names", "blocks", "failed")
+
+    def __init__(self, tree, issues, opaque_names, blocks, failed):
+        self.tree = tree                  # ast.Module of every block that parsed
+        self.issues = issues              # one syntax issue per failed block
+        self.opaque_names = opaque_names  # identifiers seen in failed blocks
+        self.blocks = blocks
+        self.failed = failed
+
+
+def recover(text, error=None):
+    """
+    Find several syntax errors in one file
+    - tokenize splits the file into top-level statement blocks
+    - each block is parsed once: cost stays linear in file size
+    - blocks that parse are merged (line numbers kept) for semantic analysis
+    error: the SyntaxError of the whole-file parse, reported if no single
+    block reproduces it (e.g. an error that only spans blocks).
+    """
+    lines = split_lines(text)
+    body = []
+    issues = []
+    opaque = set()
+    blocks = split_blocks(lines)
+    failed = 0
+
+    for first, last in blocks:
+        source = "".join(lines[first:last + 1])
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            failed += 1
+            issues.append(SyntaxDetector.issue_from_error(e, first))
+            opaque.update(_IDENTIFIER.findall(source))
+            continue
+        ast.increment_lineno(tree, first)
+        body.extend(tree.body)
+
+    if not issues and error is not None:
+        issues.append(SyntaxDetector.issue_from_error(error))
+        body = []
+
+    return Recovered(ast.Module(body=body, type_ignores=[]), issues,
+                     frozenset(opaque), len(blocks), failed)
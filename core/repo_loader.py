@@ -1,19 +1,293 @@
 import os
+import re
+
+# Directories that never contain sources worth scanning
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    "__pycache__", ".git", ".hg", ".svn",
+    "venv", ".venv", "node_modules",
+    "build", "dist", ".eggs", "site-packages",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    ".debugger_cache",
+})
+
+
+def glob_to_regex(pattern):
+    """
+    Translate a gitignore-style glob into a regex over '/'-separated paths.
+    '*' and '?' stay inside one path segment, '**' crosses segments.
+    """
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Rules from one .gitignore file, matched relative to the file's directory
+    - Later rules override earlier ones; '!' re-includes
+    - A trailing '/' only matches directories
+    - Patterns without a '/' in the middle match at any depth
+    """
+
+    def __init__(self, lines):
+        self.rules = []  # (regex, negate, dir_only)
+        for line in lines:
+            line = line.rstrip("\n").rstrip("\r")
+            if not line or line.startswith("#"):
+                continue
+            line = line.rstrip(" ") if not line.endswith("\\ ") else line
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = glob_to_regex(line)
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((re.compile(regex + "$"), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path, is_dir):
+        """True = ignored, False = re-included, None = no rule applies."""
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
 
 class RepoLoader:
-    def __init__(self, repo_path):
+    """
+    Repository File Walker
+    - Lazy os.scandir walk in sorted, depth-first order
+    - Honors .gitignore files (nested) and .git/info/exclude
+    - User include/exclude globs on repo-relative paths
+    - Optional max file size, symlink following with cycle protection
+    - Fast mode: list files from the git index instead of walking
+    """
+
+    def __init__(self, repo_path, include=None, exclude=None, use_gitignore=True,
+                 max_file_size=None, follow_symlinks=False, use_git=False,
+                 excluded_dirs=DEFAULT_EXCLUDED_DIRS):
         self.repo_path = repo_path
+        self.include = [re.compile(glob_to_regex(p) + "$") for p in include or ()]
+        self.exclude = [re.compile(glob_to_regex(p) + "$") for p in exclude or ()]
+        self.use_gitignore = use_gitignore
+        self.max_file_size = max_file_size
+        self.follow_symlinks = follow_symlinks
+        self.use_git = use_git
+        self.excluded_dirs = frozenset(excluded_dirs)
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+    def iter_python_files(self):
+        """Yield .py file paths lazily."""
+        if self.use_git:
+            files = self._git_files()
+            if files is not None:
+                return files
+        return self._walk()
 
     def load_python_files(self):
-        python_files = []
+        return list(self.iter_python_files())
+
+    def select(self, rel_paths):
+        """
+        Yield the paths of the given repo-relative ('/'-separated) files
+        this loader scans: excluded directories, include/exclude globs and
+        the size limit apply, files missing from the work tree are dropped.
+        """
+        for rel_path in rel_paths:
+            parts = rel_path.split("/")
+            if any(part in self.excluded_dirs for part in parts[:-1]):
+                continue
+            if not self._wanted(rel_path):
+                continue
+            path = os.path.join(self.repo_path, *parts)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not self._small_enough(st.st_size):
+                continue
+            yield path
+
+    # -------------------------------------------------
+    # Filters
+    # -------------------------------------------------
+    def _excluded(self, rel_path):
+        return any(regex.match(rel_path) for regex in self.exclude)
+
+    def _wanted(self, rel_path):
+        if self.include and not any(regex.match(rel_path) for regex in self.include):
+            return False
+        return not self._excluded(rel_path)
+
+    def _small_enough(self, size):
+        return self.max_file_size is None or size <= self.max_file_size
+
+    @staticmethod
+    def _ignored(rule_stack, rel_path, is_dir):
+        # Deepest .gitignore with an opinion wins
+        for base, rules in reversed(rule_stack):
+            result = rules.match(rel_path[len(base):], is_dir)
+            if result is not None:
+                return result
+        return False
+
+    # -------------------------------------------------
+    # File system walk
+    # -------------------------------------------------
+    def _walk(self):
+        root = self.repo_path
+        rule_stack = []
+        if self.use_gitignore:
+            for path in (os.path.join(root, ".git", "info", "exclude"),
+                         os.path.join(root, ".gitignore")):
+                rules = IgnoreRules.from_file(path)
+                if rules and rules.rules:
+                    rule_stack.append(("", rules))
+
+        visited = set()
+        if self.follow_symlinks:
+            st = os.stat(root)
+            visited.add((st.st_dev, st.st_ino))
+
+        # Each entry: (directory path, repo-relative prefix, inherited rules)
+        stack = [(root, "", tuple(rule_stack))]
+        while stack:
+            dir_path, prefix, rules = stack.pop()
+
+            if prefix and self.use_gitignore:
+                nested = IgnoreRules.from_file(os.path.join(dir_path, ".gitignore"))
+                if nested and nested.rules:
+                    rules = rules + ((prefix, nested),)
+
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                rel_path = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if entry.name in self.excluded_dirs or self._excluded(rel_path):
+                        continue
+                    if rules and self._ignored(rules, rel_path, True):
+                        continue
+                    if entry.is_symlink():
+                        if not self.follow_symlinks:
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        key = (st.st_dev, st.st_ino)
+                        if key in visited:
+                            continue  # symlink cycle or directory seen twice
+                        visited.add(key)
+                    elif self.follow_symlinks:
+                        st = entry.stat(follow_symlinks=False)
+                        visited.add((st.st_dev, st.st_ino))
+                    subdirs.append((entry.path, rel_path + "/", rules))
+                    continue
+
+                if not entry.name.endswith(".py"):
+                    continue
+                if not self._wanted(rel_path):
+                    continue
+                if rules and self._ignored(rules, rel_path, False):
+                    continue
+                if self.max_file_size is not None:
+                    try:
+                        if not self._small_enough(entry.stat().st_size):
+                            continue
+                    except OSError:
+                        continue
+                yield entry.path
 
-        for root, dirs, files in os.walk(self.repo_path):
-            # Skip unnecessary directories
-            dirs[:] = [d for d in dirs if d not in ("__pycache__", ".git")]
+            # Depth-first, subdirectories in name order
+            stack.extend(reversed(subdirs))
 
-            for file in files:
-                if file.endswith(".py"):
-                    python_files.append(os.path.join(root, file))
+    # -------------------------------------------------
+    # Git index fast path
+    # -------------------------------------------------
+    def _git_files(self):
+        """Tracked + untracked-but-not-ignored .py files, or None without git."""
+        import subprocess
 
-        return python_files
+        try:
+            proc = subprocess.run(
+                ["git", "-C", self.repo_path, "ls-files", "-z",
+                 "--cached", "--others", "--exclude-standard", "--", "*.py"],
+                capture_output=True, check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return self._filter_git_output(proc.stdout)
 
+    def _filter_git_output(self, output):
+        seen = set()
+        rel_paths = []
+        for raw in output.split(b"\0"):
+            if not raw or raw in seen:
+                continue
+            seen.add(raw)  # unmerged paths are listed once per stage
+            rel_paths.append(os.fsdecode(raw))
+        return self.select(rel_paths)
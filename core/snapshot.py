@@ -0,0 +1,76 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+# Bump when the layout of a snapshot file changes
+SNAPSHOT_VERSION = 2
+SUFFIX = ".snapshot"
+
+
+def snapshot_path(path):
+    """Snapshot of a JSON file, kept next to it: rules.json -> rules.snapshot."""
+    return os.path.splitext(path)[0] + SUFFIX
+
+
+def _header(path, tag):
+    # Everything the payload depends on but the JSON's content hash: a
+    # change to any of them rebuilds it without reading the JSON
+    st = os.stat(path)
+    return (SNAPSHOT_VERSION, sys.implementation.cache_tag, marshal.version, tag,
+            st.st_mtime_ns, st.st_size)
+
+
+def _digest(data):
+    return hashlib.sha256(data).digest()
+
+
+def load_json(path, build=None, tag=""):
+    """
+    Parsed content of a JSON file, through a binary (marshal) snapshot
+    - build(data) turns the raw bytes into the payload (default:
+      json.loads); it may precompute more, e.g. an index
+    - tag names the builder's output format: a new tag rebuilds old snapshots
+    - the snapshot is rebuilt when the JSON file changes: a new mtime or
+      size rebuilds it at once; when both match, the JSON's content hash
+      is compared too (an equal-size edit that kept the mtime: cp -p,
+      rsync, a checkout within one timestamp tick)
+    - and for another Python version, whose marshal format may differ
+    - saving is best effort: without write access the JSON is parsed each time
+    Raises FileNotFoundError if the JSON file does not exist.
+    """
+    header = _header(path, tag)
+    snapshot = snapshot_path(path)
+    data = None
+    try:
+        with open(snapshot, "rb") as f:
+            if marshal.load(f) == header:
+                digest = marshal.load(f)
+                with open(path, "rb") as source:
+                    data = source.read()
+                if digest == _digest(data):
+                    # loads() of one read: load() on a file reads it piece by piece
+                    return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    payload = build(data) if build is not None else json.loads(data)
+
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            marshal.dump(header, f)
+            marshal.dump(_digest(data), f)
+            marshal.dump(payload, f)
+        os.replace(tmp, snapshot)
+    except (OSError, ValueError):
+        # ValueError: the payload holds something marshal cannot store
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+    return payload
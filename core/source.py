@@ -0,0 +1,83 @@
+import io
+import mmap
+import os
+import time
+import tokenize
+
+# Files at least this large are memory-mapped instead of read into a bytes copy
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def detect_encoding(data):
+    """
+    Source encoding per PEP 263 / BOM, from the first two lines only.
+    Raises SyntaxError for an unknown or conflicting encoding cookie.
+    """
+    end = data.find(b"\n")
+    if end != -1:
+        second = data.find(b"\n", end + 1)
+        end = second if second != -1 else len(data) - 1
+    head = bytes(data[:end + 1]) if end != -1 else bytes(data)
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(head).readline)
+    return encoding
+
+
+def decode_source(data):
+    """Decode raw source bytes (bytes, bytearray or mmap) to text."""
+    # 'utf-8-sig' drops a leading BOM
+    return str(data, detect_encoding(data))
+
+
+class SourceFile:
+    """
+    Raw source of one file plus read statistics
+    - data is bytes, or an mmap for large files (no extra copy)
+    - text is decoded lazily, honoring the encoding cookie and BOM
+    - use as a context manager so a mapping is released promptly
+    """
+
+    __slots__ = ("path", "data", "bytes_read", "read_time", "_mmap", "_text")
+
+    def __init__(self, path, data, bytes_read, read_time, mapping=None):
+        self.path = path
+        self.data = data
+        self.bytes_read = bytes_read
+        self.read_time = read_time
+        self._mmap = mapping
+        self._text = None
+
+    @property
+    def mapped(self):
+        return self._mmap is not None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = decode_source(self.data)
+        return self._text
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def read_source(path, mmap_threshold=MMAP_THRESHOLD):
+    """Read a file as raw bytes, memory-mapping it above mmap_threshold."""
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # an empty file cannot be mapped
+        if mmap_threshold is not None and size > 0 and size >= mmap_threshold:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return SourceFile(path, mapping, size, time.perf_counter() - start, mapping)
+        data = f.read()
+    return SourceFile(path, data, len(data), time.perf_counter() - start)
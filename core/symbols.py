@@ -0,0 +1,490 @@
+import ast
+import builtins
+
+# Names every module / class / function can read without binding them
+BUILTIN_NAMES = frozenset(dir(builtins))
+MODULE_IMPLICIT = frozenset({
+    "__file__", "__name__", "__doc__", "__spec__", "__loader__", "__package__",
+    "__builtins__", "__path__", "__cached__", "__annotations__",
+})
+CLASS_IMPLICIT = frozenset({"__module__", "__qualname__"})
+FUNCTION_IMPLICIT = frozenset({"__class__"})
+
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)
+
+# node class -> fields that may hold child expressions (ctx never does)
+_CHILD_FIELDS = {ast.Constant: ()}
+
+
+def _child_fields(cls):
+    fields = _CHILD_FIELDS.get(cls)
+    if fields is None:
+        fields = _CHILD_FIELDS[cls] = tuple(f for f in cls._fields if f != "ctx")
+    return fields
+
+
+class Binding:
+    """One place where a name is bound."""
+
+    __slots__ = ("name", "kind", "line", "col", "stmt", "block")
+
+    def __init__(self, name, kind, line, col, stmt, block):
+        self.name = name
+        self.kind = kind    # assign, unpack, augassign, annassign, annotation, walrus,
+                            # for, with, except, import, function, class, param,
+                            # comprehension, match
+        self.line = line
+        self.col = col
+        self.stmt = stmt    # enclosing statement node
+        self.block = block  # id() of the statement list holding stmt
+
+
+class Reference:
+    """One read (or del) of a name."""
+
+    __slots__ = ("name", "line", "col", "scope", "resolved")
+
+    def __init__(self, name, line, col, scope):
+        self.name = name
+        self.line = line
+        self.col = col
+        self.scope = scope
+        self.resolved = None  # Scope whose binding this reads; None = unbound
+
+
+class Scope:
+    """A module, class, function, lambda or comprehension scope."""
+
+    __slots__ = ("kind", "name", "node", "parent", "bindings",
+                 "globals", "nonlocals", "star_imports", "used")
+
+    def __init__(self, kind, name, node, parent):
+        self.kind = kind      # module, class, function, lambda, comprehension
+        self.name = name
+        self.node = node
+        self.parent = parent
+        self.bindings = {}    # name -> [Binding] in source order
+        self.globals = set()
+        self.nonlocals = set()
+        self.star_imports = []  # (module, level) of `from module import *`
+        self.used = set()     # names of this scope read from anywhere
+
+    def implicit(self):
+        if self.kind == "module":
+            return MODULE_IMPLICIT
+        if self.kind == "class":
+            return CLASS_IMPLICIT
+        if self.kind == "function":
+            return FUNCTION_IMPLICIT
+        return frozenset()
+
+
+class SymbolTable:
+    """
+    Scopes, bindings and references of one module, computed in one pass
+    - module / class / function / lambda / comprehension scopes
+    - global and nonlocal declarations, walrus, annotations, unpacking
+    - every reference resolved to the scope that binds it (Python's rules)
+    Shared by the name-based detectors so each file is walked only once.
+
+    opaque_names: identifiers of source that could not be parsed (see
+    core.recovery); they are assumed bound and read at module level.
+    """
+
+    def __init__(self, tree, opaque_names=()):
+        self.opaque = frozenset(opaque_names)
+        self.module = Scope("module", "<module>", tree, None)
+        self.scopes = [self.module]
+        self.references = []
+
+        self._scope = self.module
+        self._stmt = tree
+        self._block = 0
+
+        self._body(getattr(tree, "body", []))
+        self._resolve()
+        self.module.used |= self.opaque
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def is_defined(self, ref):
+        """True when ref reads a binding, a builtin or an implicit name."""
+        if ref.resolved is not None:
+            return True
+        name = ref.name
+        if name in BUILTIN_NAMES or name in MODULE_IMPLICIT or name in self.opaque:
+            return True
+        scope = ref.scope
+        while scope is not None:
+            if name in scope.implicit():
+                return True
+            scope = scope.parent
+        return False
+
+    def unresolved(self):
+        """References that read no binding, builtin or implicit name."""
+        return [ref for ref in self.references if not self.is_defined(ref)]
+
+    def exported_names(self):
+        """Names listed in a literal module-level __all__."""
+        names = set()
+        for binding in self.module.bindings.get("__all__", ()):
+            value = getattr(binding.stmt, "value", None)
+            if isinstance(value, (ast.List, ast.Tuple)):
+                for elt in value.elts:
+                    if isinstance(elt, ast.Constant) and isinstance(elt.value, str):
+                        names.add(elt.value)
+        return names
+
+    # -------------------------------------------------
+    # Recording
+    # -------------------------------------------------
+    def _bind(self, name, kind, node, scope=None):
+        scope = scope or self._scope
+        if name in scope.globals:
+            scope = self.module
+        elif name in scope.nonlocals:
+            scope = self._enclosing_binder(scope, name)
+        binding = Binding(name, kind, getattr(node, "lineno", None),
+                          getattr(node, "col_offset", 0), self._stmt, self._block)
+        scope.bindings.setdefault(name, []).append(binding)
+
+    @staticmethod
+    def _enclosing_binder(scope, name):
+        """Function scope a nonlocal name refers to (nearest one binding it)."""
+        fallback = None
+        parent = scope.parent
+        while parent is not None and parent.kind != "module":
+            if parent.kind != "class":
+                if name in parent.bindings:
+                    return parent
+                fallback = fallback or parent
+            parent = parent.parent
+        return fallback or scope
+
+    def _reference(self, name, node):
+        # Scopes do not point back at their references: no cycles, so a
+        # table is freed by reference counting as soon as it is dropped
+        self.references.append(Reference(name, node.lineno, node.col_offset, self._scope))
+
+    def _push(self, kind, name, node):
+        scope = Scope(kind, name, node, self._scope)
+        self.scopes.append(scope)
+        self._scope = scope
+        return scope
+
+    # -------------------------------------------------
+    # Statements
+    # -------------------------------------------------
+    def _body(self, stmts):
+        saved_stmt, saved_block = self._stmt, self._block
+        self._block = id(stmts)
+        for stmt in stmts:
+            self._stmt = stmt
+            handler = self._STMT_HANDLERS.get(stmt.__class__)
+            if handler is None:
+                self._generic_stmt(stmt)
+            else:
+                handler(self, stmt)
+        self._stmt, self._block = saved_stmt, saved_block
+
+    def _generic_stmt(self, node):
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                if value and isinstance(value[0], ast.stmt):
+                    self._body(value)
+                else:
+                    for item in value:
+                        if isinstance(item, ast.AST):
+                            self._expr(item)
+            elif isinstance(value, ast.AST):
+                self._expr(value)
+
+    def _arguments(self, args):
+        """Defaults and annotations run in the enclosing scope."""
+        for default in args.defaults:
+            self._expr(default)
+        for default in args.kw_defaults:
+            if default is not None:
+                self._expr(default)
+        for arg in self._all_args(args):
+            if arg.annotation is not None:
+                self._expr(arg.annotation)
+
+    @staticmethod
+    def _all_args(args):
+        result = list(args.posonlyargs) + list(args.args)
+        if args.vararg:
+            result.append(args.vararg)
+        result.extend(args.kwonlyargs)
+        if args.kwarg:
+            result.append(args.kwarg)
+        return result
+
+    def _function(self, node):
+        for decorator in node.decorator_list:
+            self._expr(decorator)
+        self._arguments(node.args)
+        if node.returns is not None:
+            self._expr(node.returns)
+        self._bind(node.name, "function", node)
+
+        outer = self._scope
+        self._push("function", node.name, node)
+        for arg in self._all_args(node.args):
+            self._bind(arg.arg, "param", arg)
+        self._body(node.body)
+        self._scope = outer
+
+    def _class(self, node):
+        for decorator in node.decorator_list:
+            self._expr(decorator)
+        for base in node.bases:
+            self._expr(base)
+        for keyword in node.keywords:
+            self._expr(keyword.value)
+
+        outer = self._scope
+        self._push("class", node.name, node)
+        self._body(node.body)
+        self._scope = outer
+        self._bind(node.name, "class", node)
+
+    def _assign(self, node):
+        self._expr(node.value)
+        for target in node.targets:
+            self._target(target, "assign")
+
+    def _aug_assign(self, node):
+        self._expr(node.value)
+        target = node.target
+        if isinstance(target, ast.Name):
+            self._reference(target.id, target)
+            self._bind(target.id, "augassign", target)
+        else:
+            self._expr(target)
+
+    def _ann_assign(self, node):
+        self._expr(node.annotation)
+        if node.value is not None:
+            self._expr(node.value)
+        target = node.target
+        if isinstance(target, ast.Name):
+            self._bind(target.id, "annassign" if node.value is not None else "annotation", target)
+        else:
+            self._expr(target)
+
+    def _for(self, node):
+        self._expr(node.iter)
+        self._target(node.target, "for")
+        self._body(node.body)
+        self._body(node.orelse)
+
+    def _with(self, node):
+        for item in node.items:
+            self._expr(item.context_expr)
+            if item.optional_vars is not None:
+                self._target(item.optional_vars, "with")
+        self._body(node.body)
+
+    def _try(self, node):
+        self._body(node.body)
+        for handler in node.handlers:
+            self._stmt = handler
+            if handler.type is not None:
+                self._expr(handler.type)
+            if handler.name:
+                self._bind(handler.name, "except", handler)
+            self._body(handler.body)
+        self._body(node.orelse)
+        self._body(node.finalbody)
+
+    def _import(self, node):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self._bind(name, "import", node)
+
+    def _import_from(self, node):
+        for alias in node.names:
+            if alias.name == "*":
+                self._scope.star_imports.append((node.module, node.level))
+            else:
+                self._bind(alias.asname or alias.name, "import", node)
+
+    def _global(self, node):
+        self._scope.globals.update(node.names)
+
+    def _nonlocal(self, node):
+        self._scope.nonlocals.update(node.names)
+
+    def _delete(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self._reference(target.id, target)
+            else:
+                self._expr(target)
+
+    def _match(self, node):
+        self._expr(node.subject)
+        for case in node.cases:
+            self._pattern(case.pattern)
+            if case.guard is not None:
+                self._expr(case.guard)
+            self._body(case.body)
+
+    def _pattern(self, pattern):
+        stack = [pattern]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+                self._bind(node.name, "match", node)
+            elif isinstance(node, ast.MatchMapping) and node.rest:
+                self._bind(node.rest, "match", node)
+            if isinstance(node, ast.MatchValue):
+                self._expr(node.value)
+                continue
+            if isinstance(node, ast.MatchClass):
+                self._expr(node.cls)
+            if isinstance(node, ast.MatchMapping):
+                for key in node.keys:
+                    self._expr(key)
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.pattern):
+                    stack.append(child)
+
+    _STMT_HANDLERS = {
+        ast.FunctionDef: _function,
+        ast.AsyncFunctionDef: _function,
+        ast.ClassDef: _class,
+        ast.Assign: _assign,
+        ast.AugAssign: _aug_assign,
+        ast.AnnAssign: _ann_assign,
+        ast.For: _for,
+        ast.AsyncFor: _for,
+        ast.With: _with,
+        ast.AsyncWith: _with,
+        ast.Try: _try,
+        ast.Import: _import,
+        ast.ImportFrom: _import_from,
+        ast.Global: _global,
+        ast.Nonlocal: _nonlocal,
+        ast.Delete: _delete,
+        ast.Match: _match,
+    }
+    if hasattr(ast, "TryStar"):
+        _STMT_HANDLERS[ast.TryStar] = _try
+
+    # -------------------------------------------------
+    # Targets and expressions
+    # -------------------------------------------------
+    def _target(self, target, kind):
+        if isinstance(target, ast.Name):
+            self._bind(target.id, kind, target)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            inner = "unpack" if kind == "assign" else kind
+            for elt in target.elts:
+                self._target(elt, inner)
+        elif isinstance(target, ast.Starred):
+            self._target(target.value, "unpack" if kind == "assign" else kind)
+        else:
+            # attribute / subscript targets only read names
+            self._expr(target)
+
+    def _expr(self, node):
+        # Iterative: long operator chains nest deeper than the recursion limit
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            cls = node.__class__
+
+            if cls is ast.Name:
+                if node.ctx.__class__ is ast.Store:
+                    self._bind(node.id, "assign", node)
+                else:
+                    self._reference(node.id, node)
+                continue
+
+            if cls is ast.NamedExpr:
+                # PEP 572: binds in the nearest non-comprehension scope
+                scope = self._scope
+                while scope.kind == "comprehension":
+                    scope = scope.parent
+                self._bind(node.target.id, "walrus", node.target, scope)
+                stack.append(node.value)
+                continue
+
+            if cls is ast.Lambda:
+                self._arguments(node.args)
+                outer = self._scope
+                self._push("lambda", "<lambda>", node)
+                for arg in self._all_args(node.args):
+                    self._bind(arg.arg, "param", arg)
+                self._expr(node.body)
+                self._scope = outer
+                continue
+
+            if cls in COMPREHENSIONS:
+                self._comprehension(node)
+                continue
+
+            for field in reversed(_child_fields(cls)):
+                value = getattr(node, field, None)
+                if value.__class__ is list:
+                    for item in reversed(value):
+                        if isinstance(item, ast.AST):
+                            stack.append(item)
+                elif isinstance(value, ast.AST):
+                    stack.append(value)
+
+    def _comprehension(self, node):
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self._expr(generators[0].iter)
+
+        outer = self._scope
+        self._push("comprehension", f"<{node.__class__.__name__.lower()}>", node)
+        for index, generator in enumerate(generators):
+            if index:
+                self._expr(generator.iter)
+            self._target(generator.target, "comprehension")
+            for condition in generator.ifs:
+                self._expr(condition)
+        if isinstance(node, ast.DictComp):
+            self._expr(node.key)
+            self._expr(node.value)
+        else:
+            self._expr(node.elt)
+        self._scope = outer
+
+    # -------------------------------------------------
+    # Resolution
+    # -------------------------------------------------
+    def _resolve(self):
+        module = self.module
+        for ref in self.references:
+            scope = ref.scope
+            name = ref.name
+            target = None
+
+            if name in scope.globals:
+                target = module if name in module.bindings else None
+            elif name in scope.bindings and name not in scope.nonlocals:
+                target = scope
+            else:
+                parent = scope.parent
+                while parent is not None:
+                    if parent.kind == "class":
+                        parent = parent.parent  # class bodies are not enclosing scopes
+                        continue
+                    if name in parent.globals:
+                        target = module if name in module.bindings else None
+                        break
+                    if name in parent.bindings:
+                        target = parent
+                        break
+                    parent = parent.parent
+
+            ref.resolved = target
+            if target is not None:
+                target.used.add(name)
@@ -0,0 +1,187 @@
+import io
+import re
+import sys
+import tokenize
+from array import array
+from itertools import islice
+from tokenize import TokenInfo
+
+# CPython 3.11 exposes the parser's C tokenizer privately; it is several
+# times faster than the pure-Python tokenize module. From 3.12 on tokenize
+# itself runs on it (and TokenizerIter changed signature), so use tokenize.
+_CTokenizer = None
+if sys.version_info[:2] == (3, 11):
+    try:
+        from _tokenize import TokenizerIter as _CTokenizer
+    except ImportError:
+        pass
+
+# Not part of the shared stream (the C tokenizer never produces them)
+_TRIVIA = frozenset({tokenize.COMMENT, tokenize.NL})
+# The C tokenizer reports exact operator types; tokenize reports OP
+_OPERATORS = frozenset(tokenize.EXACT_TOKEN_TYPES.values())
+# ... and the soft keywords async / await as their own types; tokenize: NAME
+_KEYWORDS = frozenset({tokenize.ASYNC, tokenize.AWAIT})
+
+# Tokens transposed into the columns per step: small enough that the
+# record tuples die young (large batches survive into older GC generations
+# and make the collector rescan them; 256 measured fastest on 4 MiB)
+_BATCH = 256
+
+# Lines as the tokenizer counts them: str.splitlines also splits on \f,
+# \x1c, \u2028, ..., so it is only used on text without them
+_LINE = re.compile(r"[^\r\n]*(?:\r\n?|\n)|[^\r\n]+")
+_OTHER_BREAKS = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def _char_col(line, col):
+    """Character column of UTF-8 byte offset col (the C tokenizer's unit)."""
+    if col <= 0 or line.isascii():
+        return col
+    return len(line.encode("utf-8")[:col].decode("utf-8", "ignore"))
+
+
+def split_lines(text):
+    """Lines of text with their line endings, numbered as the tokenizer does."""
+    if _OTHER_BREAKS.search(text):
+        return _LINE.findall(text)
+    return text.splitlines(keepends=True)
+
+
+def _indent_of(line):
+    return line[:len(line) - len(line.lstrip(" \t\f"))]
+
+
+class TokenStream:
+    """
+    One tokenize pass over a file, shared by every token-level check
+    - structural tokens only (no COMMENT / NL)
+    - stored column-wise (type bytes, int positions, interned strings):
+      a few dozen bytes per token instead of a TokenInfo with its own copy
+      of the source line; TokenInfo objects are built only on request
+    - INDENT tokens carry the block's indentation string
+    - on CPython 3.11 the C tokenizer is used; types, strings and positions
+      of content tokens and the INDENT / DEDENT order match tokenize, but
+      DEDENT / NEWLINE positions and the final ENDMARKER may differ, and
+      it stops at the first invalid token where tokenize carries on
+    - error: the TokenError / SyntaxError that stopped the pass, if any
+      (the tokens before it are kept)
+    The Analyzer builds it once per file, only when a check asks for it.
+    """
+
+    __slots__ = ("lines", "types", "strings", "starts", "ends", "error", "_byte_cols",
+                 "_blocks")
+
+    def __init__(self, text):
+        if text.startswith("\ufeff"):
+            text = text[1:]
+        self.lines = split_lines(text)
+        self.types = bytearray()
+        self.strings = []
+        self.starts = array("i")  # line, col pairs
+        self.ends = array("i")
+        self.error = None
+        self._blocks = None
+        self._byte_cols = _CTokenizer is not None
+        if self._byte_cols:
+            self._fill(_CTokenizer(text))
+        else:
+            self._fill(self._python_records(text))
+
+    @staticmethod
+    def _python_records(text):
+        # same record layout as the C tokenizer
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            if tok.type not in _TRIVIA:
+                yield (tok.string, tok.type, tok.start[0], tok.end[0],
+                       tok.start[1], tok.end[1], tok.line)
+
+    def _fill(self, records):
+        records = iter(records)
+        intern = {}.setdefault
+        while self.error is None:
+            batch = []
+            try:
+                # extend keeps the tokens read before an error
+                batch.extend(islice(records, _BATCH))
+            except (tokenize.TokenError, SyntaxError) as e:
+                self.error = e
+            if not batch:
+                return
+            strings, types, lines, end_lines, cols, end_cols = islice(zip(*batch), 6)
+            del batch
+            self.strings.extend(map(intern, strings, strings))
+            self.types.extend(types)
+            pairs = [0] * (2 * len(types))
+            pairs[::2], pairs[1::2] = lines, cols
+            self.starts.extend(pairs)
+            pairs[::2], pairs[1::2] = end_lines, end_cols
+            self.ends.extend(pairs)
+
+    def __len__(self):
+        return len(self.types)
+
+    def _line(self, number):
+        return self.lines[number - 1] if 0 < number <= len(self.lines) else ""
+
+    def info(self, index):
+        """TokenInfo of token number index."""
+        ttype = self.types[index]
+        string = self.strings[index]
+        line, col = self.starts[2 * index], self.starts[2 * index + 1]
+        end_line, end_col = self.ends[2 * index], self.ends[2 * index + 1]
+        source = self._line(line)
+        if self._byte_cols:
+            col = _char_col(source, col)
+            end_col = _char_col(self._line(end_line), end_col)
+        if ttype == tokenize.INDENT:
+            string = _indent_of(source)
+            col, end_col = 0, len(string)
+        elif ttype == tokenize.NEWLINE:
+            string = source[len(source.rstrip("\r\n")):]
+            end_col = col + len(string)
+        elif ttype in _OPERATORS:
+            ttype = tokenize.OP
+        elif ttype in _KEYWORDS:
+            ttype = tokenize.NAME
+        return TokenInfo(ttype, string, (line, col), (end_line, end_col), source)
+
+    def __iter__(self):
+        return map(self.info, range(len(self.types)))
+
+    def block_statements(self, line):
+        """
+        First lines of the statements of the block whose INDENT is on
+        line, up to its DEDENT (the statements of nested blocks excluded).
+        Every block is indexed in one pass on the first call.
+        """
+        if self._blocks is None:
+            self._blocks = self._index_blocks()
+        return self._blocks.get(line, ())
+
+    def _index_blocks(self):
+        types, starts = self.types, self.starts
+        blocks = {}
+        open_blocks = []  # statement lines of each enclosing block
+        at_start = True
+        for i, ttype in enumerate(types):
+            if ttype == tokenize.INDENT:
+                lines = []
+                blocks[starts[2 * i]] = lines
+                open_blocks.append(lines)
+            elif ttype == tokenize.DEDENT:
+                if open_blocks:
+                    open_blocks.pop()
+            elif ttype == tokenize.NEWLINE:
+                at_start = True
+            elif at_start and ttype != tokenize.ENDMARKER:
+                if open_blocks:
+                    open_blocks[-1].append(starts[2 * i])
+                at_start = False
+        return {line: tuple(lines) for line, lines in blocks.items()}
+
+    def of_type(self, *types):
+        """TokenInfo of the tokens of the given types, in order."""
+        wanted = frozenset(types)
+        info = self.info
+        return (info(i) for i, ttype in enumerate(self.types) if ttype in wanted)
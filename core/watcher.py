@@ -0,0 +1,120 @@
+import os
+import time
+
+from core.repo_loader import RepoLoader
+from core.engine import analyze_file
+
+
+class Changes:
+    """Files that differ between two polls of the repository."""
+    __slots__ = ("added", "changed", "deleted")
+
+    def __init__(self, added=(), changed=(), deleted=()):
+        self.added = list(added)
+        self.changed = list(changed)
+        self.deleted = list(deleted)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.deleted)
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.deleted)
+
+
+class RepoWatcher:
+    """
+    Watch Mode Engine
+    - Polls mtime/size of every .py file (no external dependencies)
+    - Re-runs Analyzer only on added and changed files
+    - Keeps the latest issues of every file in memory
+    - With a ModuleIndex, files whose star imports now resolve to other
+      names are re-analyzed too
+    """
+
+    def __init__(self, repo_path=".", interval=1.0, loader=None, module_index=None,
+                 recover=False):
+        self.repo_path = repo_path
+        self.index = module_index
+        self.recover = recover
+        self.loader = loader or RepoLoader(repo_path)
+        self.interval = interval
+        self.snapshot = {}  # file path -> (mtime_ns, size)
+        self.results = {}   # file path -> issues
+
+    def _stat_all(self):
+        snapshot = {}
+        for file_path in self.loader.iter_python_files():
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue  # deleted between listing and stat
+            snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self):
+        """Compare the file system with the last snapshot and return Changes."""
+        current = self._stat_all()
+        previous = self.snapshot
+
+        added = [p for p in current if p not in previous]
+        deleted = [p for p in previous if p not in current]
+        changed = [
+            p for p, sig in current.items()
+            if p in previous and previous[p] != sig
+        ]
+
+        self.snapshot = current
+        return Changes(added, changed, deleted)
+
+    def update(self):
+        """Poll once and re-analyze only what changed."""
+        changes = self.poll()
+
+        for file_path in changes.deleted:
+            self.results.pop(file_path, None)
+
+        stale = changes.added + changes.changed
+        if self.index is not None and changes:
+            stale += self._update_index(changes)
+
+        for file_path in stale:
+            star_names = self.index.star_names(file_path) if self.index is not None else None
+            self.results[file_path] = analyze_file(file_path, star_names=star_names,
+                                                   recover=self.recover).issues
+
+        return changes
+
+    def _update_index(self, changes):
+        """Refresh the index; return unchanged files whose star names moved."""
+        modified = set(changes.added + changes.changed)
+        importers = [p for p, e in self.index.entries.items() if e.stars and p not in modified]
+        before = {p: self.index.star_names(p) for p in importers}
+
+        self.index.remove(changes.deleted)
+        self.index.update(changes.added + changes.changed)
+        self.index.save()
+
+        return [p for p in importers
+                if p in self.index.entries and self.index.star_names(p) != before[p]]
+
+    def issues(self, files=None):
+        """Current issues for the given files (all files by default), path order."""
+        paths = sorted(self.results if files is None else files)
+        all_issues = []
+        for file_path in paths:
+            all_issues.extend(self.results.get(file_path, ()))
+        return all_issues
+
+    def watch(self, on_update, max_cycles=None):
+        """
+        Run update() every interval seconds and call on_update(changes)
+        whenever something changed. The first cycle analyzes every file.
+        """
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            changes = self.update()
+            if changes or cycles == 0:
+                on_update(changes)
+            cycles += 1
+            if max_cycles is None or cycles < max_cycles:
+                time.sleep(self.interval)
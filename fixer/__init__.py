@@ -1,7 +1,8 @@
 # fixer/__init__.py
 
 from .auto_fixer import apply_all_fixes
+from .edits import EditBuffer
 from .fix_agent import FixAgent
 
 # This defines what is "public" when someone imports your folder
-__all__ = ['apply_all_fixes', 'FixAgent']
\ No newline at end of file
+__all__ = ['apply_all_fixes', 'EditBuffer', 'FixAgent']
\ No newline at end of file
@@ -1,39 +1,57 @@
-from .fix_agent import FixAgent
+from .edits import EditBuffer
+from .fix_agent import FixAgent, rule_id_for
+from core.tokens import TokenStream
+
+
+def _line_of(issue):
+    return issue.get("line") or 0
+
 
 def apply_all_fixes(original_code, issues):
     """
-    Takes the raw code and a list of issues, applies fixes line-by-line,
+    Takes the raw code and a list of issues, applies every fix in one pass,
     and returns the updated code and a log of what was changed.
+
+    issues: fixer issues ({"id": rule id, "line": n}) or Analyzer issues
+    (type / message / line), mapped to a rule by rule_id_for.
+    Each fix becomes a group of edits in one EditBuffer, so several fixes can
+    change the same line; a fix that overlaps an earlier one is skipped.
+    Text outside the edits (line endings included) is kept as is.
+    Block rules (MixedIndentation) edit every statement of the block that
+    opens on the issue's line, as one fix.
     """
-    # 1. Split the code into a list of lines
-    lines = original_code.splitlines()
-    agent = FixAgent()
+    buffer = EditBuffer(original_code)
+    rules = FixAgent().rules
     fix_log = []
+    tokens = None
+
+    # Issues in line order: on a conflict, the fix higher up the file wins
+    for issue in sorted(issues, key=_line_of):
+        line_number = _line_of(issue)
+        line = buffer.line(line_number)
+        if line is None:
+            continue
+
+        error_id = rule_id_for(issue)
+        rule = rules.get(error_id)
+        start, text = line
+        if rule is not None and rule.block:
+            if tokens is None:
+                tokens = TokenStream(original_code)
+            edits = []
+            for number in tokens.block_statements(line_number) or (line_number,):
+                offset, text = buffer.line(number)
+                edits += [(offset - start + column, length, replacement)
+                          for column, length, replacement in rule.line_edits(text)]
+        else:
+            edits = rule.line_edits(text) if rule is not None else ()
+
+        # Only count a fix that actually changes the line
+        if not edits:
+            fix_log.append(f"Skipped Line {line_number}: No rule found for {error_id or issue.get('type')}")
+        elif buffer.add_group(edits, error_id, base=start):
+            fix_log.append(f"Fixed Line {line_number}: Applied {error_id}")
+        else:
+            fix_log.append(f"Skipped Line {line_number}: {error_id} overlaps an earlier fix")
 
-    # 2. IMPORTANT: Sort issues by line number in REVERSE order (bottom to top).
-    # This ensures that if we change a line, it doesn't shift the line numbers 
-    # for the errors appearing later in the file.
-    sorted_issues = sorted(issues, key=lambda x: x['line'], reverse=True)
-
-    for issue in sorted_issues:
-        line_number = issue['line']
-        error_id = issue['id']
-        
-        # Line numbers are 1-based, but Python lists are 0-based
-        idx = line_number - 1
-        
-        if 0 <= idx < len(lines):
-            original_line = lines[idx]
-            fixed_line = agent.fix_line(original_line, error_id)
-            
-            # Only update if a fix was actually applied
-            if fixed_line != original_line:
-                lines[idx] = fixed_line
-                fix_log.append(f"Fixed Line {line_number}: Applied {error_id}")
-            else:
-                fix_log.append(f"Skipped Line {line_number}: No rule found for {error_id}")
-
-    # 3. Join the lines back into a single string
-    fixed_code = "\n".join(lines)
-    
-    return fixed_code, fix_log
\ No newline at end of file
+    return buffer.apply(), fix_log
@@ -0,0 +1,101 @@
+import io
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class EditBuffer:
+    """
+    Collects edits against one text and applies them in a single rebuild
+    - an edit replaces text[offset:end] with a replacement (offset == end
+      inserts); accepted edits are (offset, end, replacement, label)
+      tuples in .edits, sorted by offset
+    - an edit that overlaps an accepted one is rejected and kept in
+      .conflicts (two insertions at the same offset, or an insertion at
+      the start of a replaced range, also conflict: their order is unknown)
+    - edits arriving in text order are appended; others are bisected in
+    - apply() joins the untouched slices and replacements: O(len(text) + edits)
+    - line(n) gives the offset and text of 1-based line n, split the way
+      the parser counts lines (\n, \r\n, \r)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.edits = []
+        self.conflicts = []
+        self._offsets = []
+        self._lines = None
+        self._starts = None
+
+    # -------------------------------------------------
+    # Lines
+    # -------------------------------------------------
+    def line(self, number):
+        """(start offset, text without line ending) of line number, or None."""
+        if self._lines is None:
+            self._lines = io.StringIO(self.text, newline="").readlines()
+            self._starts = [0, *accumulate(map(len, self._lines))]
+        if not 0 < number <= len(self._lines):
+            return None
+        return self._starts[number - 1], self._lines[number - 1].rstrip("\r\n")
+
+    # -------------------------------------------------
+    # Edits
+    # -------------------------------------------------
+    def conflicts_with(self, offset, end):
+        """True if replacing text[offset:end] would overlap an accepted edit."""
+        edits = self.edits
+        if not edits:
+            return False
+        last = edits[-1]
+        if offset > last[0] and offset >= last[1]:
+            return False
+        i = bisect_right(self._offsets, offset)
+        if i:
+            prev = edits[i - 1]
+            if prev[1] > offset:
+                return True
+            if prev[0] == offset and (prev[1] == offset or end == offset):
+                return True
+        return i < len(edits) and edits[i][0] < end
+
+    def add(self, offset, length, replacement, label=None):
+        """Accept the edit unless it conflicts; returns whether it was accepted."""
+        return self.add_group(((offset, length, replacement),), label)
+
+    def add_group(self, edits, label=None, base=0):
+        """
+        Accept several (offset, length, replacement) edits all or none,
+        e.g. every change one fix makes. They must not overlap each other.
+        base is added to every offset (e.g. the start of the edited line).
+        """
+        group = [(base + offset, base + offset + length, replacement, label)
+                 for offset, length, replacement in edits]
+        for edit in group:
+            if self.conflicts_with(edit[0], edit[1]):
+                self.conflicts.extend(group)
+                return False
+
+        accepted = self.edits
+        offsets = self._offsets
+        for edit in group:
+            offset = edit[0]
+            if not accepted or offset > accepted[-1][0]:
+                offsets.append(offset)
+                accepted.append(edit)
+            else:
+                i = bisect_right(offsets, offset)
+                offsets.insert(i, offset)
+                accepted.insert(i, edit)
+        return True
+
+    def apply(self):
+        """The text with every accepted edit applied."""
+        text = self.text
+        parts = []
+        pos = 0
+        for offset, end, replacement, _ in self.edits:
+            parts.append(text[pos:offset])
+            parts.append(replacement)
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
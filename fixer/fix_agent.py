@@ -1,77 +1,187 @@
-import json
 import os
 import re
+from functools import lru_cache
+
+from core import snapshot
+from .edits import EditBuffer
+
+RULES_PATH = os.path.join(os.path.dirname(__file__), 'fix_rules.json')
+
+# Analyzer issue types that have their own fix rule
+ISSUE_RULES = {
+    "MissingColon": "ERR_MISSING_COLON",
+    "MixedIndentation": "ERR_MIXED_INDENTATION",
+    "UndefinedVariable": "ERR_UNDEFINED_VARIABLE",
+}
+
+# Other syntax errors are told apart by their message
+MESSAGE_RULES = (
+    ("expected ':'", "ERR_MISSING_COLON"),
+    ("expected an indented block", "ERR_INDENTATION_EXPECTED"),
+    ("was never closed", "ERR_UNCLOSED_PAREN"),
+    ("unterminated string literal", "ERR_UNCLOSED_STRING"),
+    ("Missing parentheses in call to 'print'", "ERR_PRINT_MISSING_PARENS"),
+    ("instead of '='", "ERR_ASSIGN_INSTEAD_OF_EQUAL"),
+)
+
+# Actions applied to every statement of the block that opens on the
+# issue's line (a block re-indented on one line only no longer parses)
+BLOCK_ACTIONS = frozenset(("replace_tabs",))
+
+_INDENT = re.compile(r"[ \t]*")
+_LONE_EQUALS = re.compile(r"(?<![=!<>:+\-*/%&|^@~])=(?!=)")
+_PRINT = re.compile(r"([ \t]*print)\b\s*(.*?)\s*$")
+
+
+def rule_id_for(issue):
+    """
+    Fix rule id of an issue: its "id" (fixer issues), else one derived
+    from an Analyzer issue's type or message. None if no rule applies.
+    """
+    rule_id = issue.get("id")
+    if rule_id is not None:
+        return rule_id
+    rule_id = ISSUE_RULES.get(issue.get("type"))
+    if rule_id is not None:
+        return rule_id
+    message = issue.get("message") or ""
+    for fragment, rule_id in MESSAGE_RULES:
+        if fragment in message:
+            return rule_id
+    return None
+
+
+# --- Specific Fix Strategies ---
+# Each takes the line (without its line ending) and the rule's correction
+# and returns the (column, length, replacement) edits of the fix.
+
+def _append_at_end(line, char):
+    """Adds a character like : or ) to the end, dropping trailing whitespace."""
+    end = len(line.rstrip())
+    return [(end, len(line) - end, char)]
+
+
+def _add_indent(line, whitespace):
+    """Adds 4 spaces to the start of the line."""
+    return [(0, 0, whitespace)]
+
+
+def _replace_tabs(line, spaces):
+    """Expands each tab of the leading indentation to 4 spaces."""
+    indent = _INDENT.match(line).group()
+    if "\t" not in indent:
+        return []
+    return [(0, len(indent), indent.replace("\t", spaces))]
+
+
+def _replace_assignment_with_comparison(line, operator):
+    """Changes 'if x = 5' to 'if x == 5'"""
+    if "if" in line and "==" not in line:
+        return [(m.start(), 1, operator) for m in _LONE_EQUALS.finditer(line)]
+    return []
+
+
+def _wrap_print(line, correction):
+    """Changes print 'hello' to print('hello')"""
+    match = _PRINT.match(line)
+    if not match:
+        return []
+    start = match.end(1)
+    return [(start, len(line) - start, f"({match.group(2)})")]
+
+
+def _comment_line(line, prefix):
+    """Comments out a line (e.g., for unused imports)"""
+    return [(0, 0, prefix)]
+
+
+def _append_quote(line, correction):
+    """Closes a string left open on this line with the quote that opened it."""
+    quote = None
+    escaped = False
+    for char in line:
+        if escaped:
+            escaped = False
+        elif quote:
+            if char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "#":
+            break
+    if quote is None:
+        return []
+    return _append_at_end(line, quote)
+
+
+def _no_edits(line, correction):
+    return []
+
+
+# action name in fix_rules.json -> strategy; actions without an entry
+# (suggest_name) produce no edit
+ACTIONS = {
+    "append_at_end": _append_at_end,
+    "add_indent": _add_indent,
+    "replace_tabs": _replace_tabs,
+    "replace_operator": _replace_assignment_with_comparison,
+    "wrap_content": _wrap_print,
+    "comment_line": _comment_line,
+    "append_quote": _append_quote,
+}
+
+
+class Rule:
+    """One fix_rules.json entry with its strategy resolved."""
+
+    __slots__ = ("id", "action", "correction", "description", "strategy", "block")
+
+    def __init__(self, rule_id, data):
+        self.id = rule_id
+        self.action = data['action']
+        self.correction = data['correction']
+        self.description = data.get('description', "")
+        self.strategy = ACTIONS.get(self.action, _no_edits)
+        self.block = self.action in BLOCK_ACTIONS
+
+    def line_edits(self, line):
+        """(column, length, replacement) edits that fix this line."""
+        return self.strategy(line, self.correction)
+
+
+@lru_cache(maxsize=None)
+def load_rules(path=RULES_PATH):
+    """
+    Rule table, compiled once per process: rule id -> Rule.
+    Shared by every FixAgent, so treat it as read-only. The JSON is read
+    through a binary snapshot (core.snapshot) rebuilt when it changes.
+    """
+    try:
+        data = snapshot.load_json(path)
+    except FileNotFoundError:
+        return {}
+    return {rule_id: Rule(rule_id, rule) for rule_id, rule in data.items()}
+
 
 class FixAgent:
     def __init__(self):
-        # Load the rules database you created
-        self.rules_path = os.path.join(os.path.dirname(__file__), 'fix_rules.json')
-        self.rules = self._load_rules()
+        self.rules_path = RULES_PATH
+        self.rules = load_rules()
 
-    def _load_rules(self):
-        try:
-            with open(self.rules_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+    def line_edits(self, line_content, error_id):
+        """(column, length, replacement) edits that fix error_id on this line."""
+        rule = self.rules.get(error_id)
+        if rule is None:
+            return []  # No rule exists
+        return rule.line_edits(line_content)
 
     def fix_line(self, line_content, error_id):
         """
-        Determines which strategy to use based on the error_id 
-        and applies it to the provided line of code.
+        Applies the rule for error_id to the provided line of code.
+        Returns the line unchanged if no rule exists.
         """
-        if error_id not in self.rules:
-            return line_content # Return original if no rule exists
-
-        rule = self.rules[error_id]
-        action = rule['action']
-        correction = rule['correction']
-
-        # Dispatch to the correct internal method
-        if action == "append_at_end":
-            return self._append_at_end(line_content, correction)
-        
-        elif action == "add_indent":
-            return self._add_indent(line_content, correction)
-        
-        elif action == "replace_operator":
-            return self._replace_assignment_with_comparison(line_content)
-        
-        elif action == "wrap_content":
-            return self._wrap_print(line_content)
-        
-        elif action == "comment_line":
-            return self._comment_line(line_content, correction)
-
-        return line_content
-
-    # --- Specific Fix Strategies ---
-
-    def _append_at_end(self, line, char):
-        """Adds a character like : or ) to the end, preserving newline."""
-        return line.rstrip() + char
-
-    def _add_indent(self, line, whitespace):
-        """Adds 4 spaces to the start of the line."""
-        return whitespace + line
-
-    def _replace_assignment_with_comparison(self, line):
-        """Changes 'if x = 5' to 'if x == 5'"""
-        if "if" in line and "=" in line and "==" not in line:
-            return line.replace("=", "==")
-        return line
-
-    def _wrap_print(self, line):
-        """Changes print 'hello' to print('hello')"""
-        content = line.replace("print", "").strip()
-        # Keep original indentation
-        indent = re.match(r"\s*", line).group()
-        return f"{indent}print({content})"
-
-    def _comment_line(self, line, prefix):
-        """Comments out a line (e.g., for unused imports)"""
-        return prefix + line
-    
-
-
-   
\ No newline at end of file
+        buffer = EditBuffer(line_content)
+        buffer.add_group(self.line_edits(line_content, error_id), error_id)
+        return buffer.apply()
@@ -0,0 +1,186 @@
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# Snapshot tag of the index layout: bump it when build() output changes
+INDEX_VERSION = "3"
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Secondary indexes: name -> function giving an entry's value(s) for it
+FIELDS = {
+    "category": lambda entry: [entry.get("category")],
+    "severity": lambda entry: [(entry.get("severity") or {}).get("label")],
+    "blocking": lambda entry: [entry.get("blocking")],
+    "ast_signature": lambda entry: entry.get("ast_signature") or [],
+}
+
+_WORD = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has in is it its of on or so that the "
+    "this to was were which will with".split()
+)
+_SUFFIXES = ("ment", "ing", "ed", "es", "s")
+
+
+@lru_cache(maxsize=65536)
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word stems; CamelCase and snake_case names are split into words."""
+    words = (word.lower() for word in _WORD.findall(text))
+    return [_stem(word) for word in words if word not in _STOPWORDS]
+
+
+def _field_key(value: Any) -> str:
+    # JSON object keys are strings: true/false/labels share one spelling
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().lower()
+
+
+def _document(key: str, entry: Dict[str, Any]) -> str:
+    """Text of one knowledge entry that the full-text index covers."""
+    parts = [key, entry.get("category") or "", (entry.get("severity") or {}).get("label") or ""]
+    explanation = entry.get("explanation") or {}
+    parts += [explanation.get("short") or "", explanation.get("detail") or ""]
+    parts.append(entry.get("false_positive_notes") or "")
+    parts += entry.get("ast_signature") or []
+    parts += [str(value) for value in (entry.get("impact") or {}).values()]
+    return " ".join(parts)
+
+
+class KnowledgeIndex:
+    """
+    Secondary and full-text indexes over the knowledge base
+    - lookup(field, value): entries by category, severity label, blocking
+      flag or ast_signature, from a dict instead of a scan
+    - search(text, k): top-k entries by BM25 over the key, explanation,
+      notes and signatures of each entry
+    - BM25 weights are computed at build time and postings are stored
+      best weight first, so a query reads its lists in parallel and stops
+      as soon as no unseen entry can enter the top k (threshold algorithm)
+    - to_dict()/from_dict() give a plain form for the knowledge snapshot
+      (build_snapshot), so it is built once per change of the JSON
+    """
+
+    def __init__(self, keys: List[str], fields: Dict[str, Dict[str, List[int]]],
+                 postings: Dict[str, List[float]]):
+        self.keys = keys
+        self.fields = fields
+        # term -> [entry number, weight, entry number, weight, ...], best weight first
+        self.postings = postings
+        self._weights: Dict[str, Dict[int, float]] = {}  # term -> {entry number: weight}
+
+    @classmethod
+    def build(cls, db: Dict[str, Dict[str, Any]]) -> "KnowledgeIndex":
+        # "_meta" and other underscore keys describe the file, not issues
+        keys = [key for key, entry in db.items() if not key.startswith("_") and isinstance(entry, dict)]
+
+        fields: Dict[str, Dict[str, List[int]]] = {name: {} for name in FIELDS}
+        counts: List[Counter] = []
+        for number, key in enumerate(keys):
+            entry = db[key]
+            for name, values in FIELDS.items():
+                for value in values(entry):
+                    if value is not None:
+                        fields[name].setdefault(_field_key(value), []).append(number)
+            counts.append(Counter(tokenize(_document(key, entry))))
+
+        lengths = [sum(terms.values()) for terms in counts]
+        average = (sum(lengths) / len(lengths) if lengths else 0.0) or 1.0
+        frequency = Counter(term for terms in counts for term in terms)
+
+        scored: Dict[str, List[Tuple[float, int]]] = {}
+        total = len(keys)
+        for number, terms in enumerate(counts):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[number] / average)
+            for term, tf in terms.items():
+                df = frequency[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                weight = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                scored.setdefault(term, []).append((-round(weight, 6), number))
+
+        postings: Dict[str, List[float]] = {}
+        for term, entries in scored.items():
+            entries.sort()
+            postings[term] = [value for weight, number in entries for value in (number, -weight)]
+        return cls(keys, fields, postings)
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def lookup(self, field: str, value: Any) -> List[str]:
+        """Keys of the entries whose field has value (case-insensitive)."""
+        if field not in self.fields:
+            raise KeyError(f"no index on {field!r}; indexed: {', '.join(self.fields)}")
+        keys = self.keys
+        return [keys[number] for number in self.fields[field].get(_field_key(value), ())]
+
+    def _term_weights(self, term: str) -> Dict[int, float]:
+        weights = self._weights.get(term)
+        if weights is None:
+            flat = self.postings[term]
+            weights = self._weights[term] = dict(zip(flat[::2], flat[1::2]))
+        return weights
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (key, score) pairs for a free-text query, best first (ties in no set order)."""
+        terms = [term for term in set(tokenize(text)) if term in self.postings]
+        if not terms or k <= 0:
+            return []
+        lists = [self.postings[term] for term in terms]
+        weights = [self._term_weights(term) for term in terms]
+
+        top: List[Tuple[float, int]] = []  # min-heap of (score, -entry number)
+        seen = set()
+        depth = 0
+        while True:
+            # the best score an entry not seen yet could still reach
+            threshold = 0.0
+            for flat in lists:
+                if depth >= len(flat):
+                    continue
+                number = flat[depth]
+                threshold += flat[depth + 1]
+                if number in seen:
+                    continue
+                seen.add(number)
+                score = sum(w.get(number, 0.0) for w in weights)
+                if len(top) < k:
+                    heapq.heappush(top, (score, -number))
+                elif score > top[0][0]:
+                    heapq.heapreplace(top, (score, -number))
+            if not threshold or (len(top) == k and top[0][0] >= threshold):
+                break
+            depth += 2
+
+        top.sort(reverse=True)
+        return [(self.keys[-number], round(score, 4)) for score, number in top]
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {"keys": self.keys, "fields": self.fields, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnowledgeIndex":
+        return cls(data["keys"], data["fields"], data["postings"])
+
+
+def build_snapshot(data: bytes) -> Dict[str, Any]:
+    """Snapshot payload of a knowledge file (see core.snapshot): its entries and their index."""
+    db = json.loads(data)
+    return {"db": db, "index": KnowledgeIndex.build(db).to_dict()}
@@ -1,81 +1,118 @@
-import json
-from pathlib import Path
-from typing import Optional, Dict, Any, List
-import logging
-
-# ------------------------
-# Logging Setup (deduplicated)
-# ------------------------
-logger = logging.getLogger("Retriever")
-logger.setLevel(logging.INFO)
-if not logger.hasHandlers():
-    ch = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)s] %(message)s")
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
-
-
-class KnowledgeRetriever:
-    """
-    Loads and retrieves static knowledge about code issues
-    from a JSON file for offline code validation.
-
-    Improvements:
-    ✔ Deduplicated logging
-    ✔ Cached JSON data in memory
-    """
-
-    _json_cache: Optional[Dict[str, Dict[str, Any]]] = None  # class-level cache
-
-    def __init__(self, path: Optional[str] = None):
-        """
-        Initialize retriever with JSON path.
-        Defaults to 'knowledge.json' in same directory.
-        """
-        self.path = Path(path) if path else Path(__file__).parent / "knowledge.json"
-        self.db: Dict[str, Dict[str, Any]] = {}
-        self._load()
-
-    def _load(self):
-        # Use class-level cache if already loaded
-        if KnowledgeRetriever._json_cache:
-            self.db = KnowledgeRetriever._json_cache
-            logger.info(f"Knowledge database loaded from cache: {len(self.db)} entries")
-            return
-
-        if not self.path.exists():
-            logger.error(f"Knowledge file not found at: {self.path}")
-            raise FileNotFoundError(f"Knowledge file not found: {self.path}")
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.db = json.load(f)
-            KnowledgeRetriever._json_cache = self.db  # cache it
-            logger.info(f"Knowledge database loaded: {len(self.db)} entries")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON: {e}")
-            raise
-
-    def get(self, issue_key: str) -> Optional[Dict[str, Any]]:
-        """Retrieve issue metadata by key (e.g., 'SyntaxError')."""
-        return self.db.get(issue_key)
-
-    def all_keys(self) -> List[str]:
-        """Return all issue keys in the knowledge base."""
-        return list(self.db.keys())
-
-    def search_by_category(self, category: str) -> Dict[str, Dict[str, Any]]:
-        """Return all issues matching a given category (e.g., 'Security')."""
-        return {k: v for k, v in self.db.items() if v.get("category") == category}
-
-    def get_explanations(self, issues: List[str]) -> Dict[str, str]:
-        """
-        Return human-readable short explanations for a list of detected issues.
-        """
-        explanations = {}
-        for issue in issues:
-            data = self.db.get(issue)
-            if data:
-                explanations[issue] = data.get("explanation", {}).get("short", "No explanation available")
-            else:
-                explanations[issue] = "Unknown issue"
+import json
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+
+from core import snapshot
+from rag.index import KnowledgeIndex, build_snapshot, INDEX_VERSION
+
+# ------------------------
+# Logging Setup (deduplicated)
+# ------------------------
+logger = logging.getLogger("Retriever")
+logger.setLevel(logging.INFO)
+if not logger.hasHandlers():
+    ch = logging.StreamHandler()
+    formatter = logging.Formatter("[%(levelname)s] %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+
+class KnowledgeRetriever:
+    """
+    Loads and retrieves static knowledge about code issues
+    from a JSON file for offline code validation.
+
+    Improvements:
+    ✔ Deduplicated logging
+    ✔ Cached JSON data in memory
+    ✔ Indexed lookups and BM25 full-text search (rag.index)
+    ✔ Entries and index load from a binary snapshot (core.snapshot),
+      rebuilt only when the JSON changes
+    """
+
+    _json_cache: Optional[Dict[str, Dict[str, Any]]] = None  # class-level cache
+    _index_cache: Optional[KnowledgeIndex] = None
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize retriever with JSON path.
+        Defaults to 'knowledge.json' in same directory.
+        """
+        self.path = Path(path) if path else Path(__file__).parent / "knowledge.json"
+        self.db: Dict[str, Dict[str, Any]] = {}
+        self.index: Optional[KnowledgeIndex] = None
+        self._load()
+
+    def _load(self):
+        # Use class-level cache if already loaded
+        if KnowledgeRetriever._json_cache:
+            self.db = KnowledgeRetriever._json_cache
+            self.index = KnowledgeRetriever._index_cache
+            logger.info(f"Knowledge database loaded from cache: {len(self.db)} entries")
+            return
+
+        if not self.path.exists():
+            logger.error(f"Knowledge file not found at: {self.path}")
+            raise FileNotFoundError(f"Knowledge file not found: {self.path}")
+        try:
+            payload = snapshot.load_json(str(self.path), build_snapshot, INDEX_VERSION)
+            self.db = payload["db"]
+            self.index = KnowledgeIndex.from_dict(payload["index"])
+            KnowledgeRetriever._json_cache = self.db  # cache it
+            KnowledgeRetriever._index_cache = self.index
+            logger.info(f"Knowledge database loaded: {len(self.db)} entries")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON: {e}")
+            raise
+
+    def get(self, issue_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve issue metadata by key (e.g., 'SyntaxError')."""
+        return self.db.get(issue_key)
+
+    def all_keys(self) -> List[str]:
+        """Return all issue keys in the knowledge base."""
+        return list(self.db.keys())
+
+    def _entries(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {k: self.db[k] for k in keys}
+
+    def search_by_category(self, category: str) -> Dict[str, Dict[str, Any]]:
+        """Return all issues matching a given category (e.g., 'Security')."""
+        return self._entries(self.index.lookup("category", category))
+
+    def search_by_severity(self, label: str) -> Dict[str, Dict[str, Any]]:
+        """Return all issues with a given severity label (e.g., 'Critical')."""
+        return self._entries(self.index.lookup("severity", label))
+
+    def search_blocking(self, blocking: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Return all issues that block (or, with False, do not block) deployment."""
+        return self._entries(self.index.lookup("blocking", blocking))
+
+    def search_by_signature(self, signature: str) -> Dict[str, Dict[str, Any]]:
+        """Return all issues with a given ast_signature (e.g., 'Call(eval)')."""
+        return self._entries(self.index.lookup("ast_signature", signature))
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Full-text search: top-k (issue key, score) pairs for free text,
+        e.g. a detector message, best match first.
+        """
+        return self.index.search(text, k)
+
+    def match(self, issue_type: str, message: str = "", k: int = 3) -> List[Tuple[str, float]]:
+        """Top-k knowledge entries for a detected issue (its type and message)."""
+        return self.index.search(f"{issue_type} {message}", k)
+
+    def get_explanations(self, issues: List[str]) -> Dict[str, str]:
+        """
+        Return human-readable short explanations for a list of detected issues.
+        """
+        explanations = {}
+        for issue in issues:
+            data = self.db.get(issue)
+            if data:
+                explanations[issue] = data.get("explanation", {}).get("short", "No explanation available")
+            else:
+                explanations[issue] = "Unknown issue"
         return explanations
\ No newline at end of file
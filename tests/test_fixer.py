@@ -0,0 +1,29 @@
+from core.analyzer import Analyzer
+from core.pipeline import FIXED, process_file
+from fixer import apply_all_fixes
+
+TAB_BLOCK = "def h():\n    return 2\n\ndef g(a):\n\tb = a\n\treturn b\n"
+
+
+def test_mixed_indentation_fix_reindents_the_whole_block():
+    fixed, fix_log = apply_all_fixes(TAB_BLOCK, Analyzer(TAB_BLOCK).analyze())
+    assert fixed == "def h():\n    return 2\n\ndef g(a):\n    b = a\n    return b\n"
+    assert fix_log == ["Fixed Line 5: Applied ERR_MIXED_INDENTATION"]
+
+
+def test_mixed_indentation_fix_keeps_continuations_and_strings():
+    code = ("def h():\n    return 2\n\ndef g(b):\n\tif b:\n\t\tc = (1,\n\t2)\n\t\treturn c\n"
+            "\ts = '''\n\tkeep'''\n\treturn s\n")
+    fixed, _ = apply_all_fixes(code, Analyzer(code).analyze())
+    assert fixed == ("def h():\n    return 2\n\ndef g(b):\n    if b:\n        c = (1,\n\t2)\n"
+                     "        return c\n    s = '''\n\tkeep'''\n    return s\n")
+    compile(fixed, "<fixed>", "exec")
+
+
+def test_pipeline_fixes_a_tab_indented_block(tmp_path):
+    path = tmp_path / "tabs.py"
+    path.write_text(TAB_BLOCK)
+    result = process_file(str(path))
+    assert result.status == FIXED, result.reason
+    assert result.issues_remaining == 0
+    assert "\t" not in path.read_text()
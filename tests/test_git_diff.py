@@ -0,0 +1,121 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from core.engine import DebuggerEngine
+from core.git_diff import FileDiff, GitDiff, GitDiffError
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def _write(repo, files):
+    for rel_path, source in files.items():
+        path = repo / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+
+BASE = {
+    "pkg/a.py": ("import os\n\n\ndef helper():\n    return 1\n\n\ndef f():\n    x = 1\n"
+                 "    y = 2\n    return x + y\n\n\ndef g():\n    unused_old = 3\n"
+                 "    return helper()\n"),
+    "pkg/b.py": "def h():\n    return 1\n",
+    "pkg/sp ace.py": "def gone():\n    return 0\n",
+    "pkg/tab\tname.py": "x = 1\n",
+    "pkg/eof.py": "value = 1\nprint(value)",
+    "pkg/only_deleted.py": "def helper():\n    return 1\n\n\ndef g():\n    return helper()\n",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "config", "user.email", "dev@example.com")
+    _git(tmp_path, "config", "user.name", "dev")
+    _write(tmp_path, BASE)
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+
+    a = BASE["pkg/a.py"].replace("def helper():\n    return 1\n\n\n", "")
+    a = a.replace("    y = 2\n    return x + y\n", "    y = 2\n    z = 5\n    return x + q\n")
+    _write(tmp_path, {
+        "pkg/a.py": a,                                         # modified + deleted lines
+        "pkg/sp ace.py": "def gone():\n    return zz\n",       # name with a space
+        "pkg/tab\tname.py": "x = y\n",                         # quoted name
+        "pkg/eof.py": "value = 1\nprint(valu)",                # \ No newline at end of file
+        "pkg/only_deleted.py": "def g():\n    return helper()\n",
+        "pkg/new.py": "w = undefined_thing\n",                 # untracked
+    })
+    _git(tmp_path, "mv", "pkg/b.py", "pkg/c.py")               # pure rename
+    return tmp_path
+
+
+def _report(repo, affected=False):
+    diff = GitDiff(str(repo), "main").load()
+    engine = DebuggerEngine(str(repo), diff=diff, diff_affected=affected)
+    return {(os.path.relpath(issue["file"], str(repo)), issue["line"], issue["message"])
+            for issue in engine.run()}, diff
+
+
+def test_parse_hunks_and_paths(repo):
+    diff = GitDiff(str(repo), "main").load()
+    files = {os.path.relpath(path, str(repo)): file_diff for path, file_diff in diff.files.items()}
+    assert sorted(files) == [os.path.join("pkg", name) for name in
+                             ("a.py", "eof.py", "new.py", "only_deleted.py", "sp ace.py",
+                              "tab\tname.py")]
+    a = files[os.path.join("pkg", "a.py")]
+    assert a.old_path == "pkg/a.py"
+    assert a.hunks == [(4, 4, 3, 0), (11, 1, 7, 2)]
+    assert [line for line in range(1, 14) if a.touched(line)] == [7, 8]
+    assert files[os.path.join("pkg", "eof.py")].hunks == [(2, 1, 2, 1)]
+    assert not files[os.path.join("pkg", "only_deleted.py")]
+    assert files[os.path.join("pkg", "new.py")].whole
+
+
+def test_old_line_maps_unchanged_lines_back():
+    file_diff = FileDiff("f.py", "f.py", [(3, 0, 4, 2), (8, 2, 9, 0), (12, 1, 12, 1)])
+    assert [file_diff.touched(line) for line in (3, 4, 5, 6, 12)] == [False, True, True, False,
+                                                                      True]
+    assert [file_diff.old_line(line) for line in (1, 3, 6, 9, 10, 11, 13)] == [1, 3, 4, 7, 10,
+                                                                                11, 13]
+
+
+def test_diff_reports_only_changed_lines(repo):
+    reported, diff = _report(repo)
+    a = os.path.join("pkg", "a.py")
+    assert reported == {
+        (a, 8, "Variable 'q' used before assignment"),
+        (a, 7, "Variable 'z' assigned but never used"),
+        (os.path.join("pkg", "eof.py"), 2, "Variable 'valu' used before assignment"),
+        (os.path.join("pkg", "new.py"), 1, "Variable 'undefined_thing' used before assignment"),
+        (os.path.join("pkg", "new.py"), 1, "Variable 'w' assigned but never used"),
+        (os.path.join("pkg", "sp ace.py"), 2, "Variable 'zz' used before assignment"),
+        (os.path.join("pkg", "tab\tname.py"), 1, "Variable 'y' used before assignment"),
+        (os.path.join("pkg", "tab\tname.py"), 1, "Variable 'x' assigned but never used"),
+    }
+    assert diff.dropped == 4  # y, helper and unused_old of a.py, value of eof.py
+
+
+def test_diff_affected_adds_issues_the_change_caused(repo):
+    reported, _ = _report(repo, affected=True)
+    a = os.path.join("pkg", "a.py")
+    assert (a, 13, "Variable 'helper' used before assignment") in reported
+    assert (a, 6, "Variable 'y' assigned but never used") in reported
+    assert (os.path.join("pkg", "eof.py"), 1,
+            "Variable 'value' assigned but never used") in reported
+    assert (os.path.join("pkg", "only_deleted.py"), 2,
+            "Variable 'helper' used before assignment") in reported
+    # already there before the change
+    assert (a, 12, "Variable 'unused_old' assigned but never used") not in reported
+
+
+def test_unknown_base_ref(repo):
+    with pytest.raises(GitDiffError, match="unknown base ref"):
+        GitDiff(str(repo), "no-such-branch").load()
@@ -0,0 +1,80 @@
+import glob
+import os
+import random
+import re
+
+import pytest
+
+from core.analyzer import Analyzer
+from core.incremental import IncrementalAnalyzer, split_lines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCES = sorted(glob.glob(os.path.join(ROOT, "core", "*.py"))
+                 + glob.glob(os.path.join(ROOT, "fixer", "*.py")))
+
+# Lines inserted by the edits: definitions, dead code, duplicate and
+# undefined names, star imports, stray indentation and broken syntax
+SNIPPETS = [
+    "    x = 1\n", "y = undefined_name\n", "def g():\n    return 1\n    print(2)\n",
+    "\n", "# comment\n", "@dec\n", "        z = 2\n", "else:\n", "print(x)\n",
+    "class K:\n    a = 1\n    a = 2\n", "global q\n", "q = 1\n", "\tq = 3\n",
+    "raise SystemExit\n", "print('dead')\n", "from os import *\n", "locals()\n",
+    "__all__ = ['x']\n", '"""\n', "x = (\n", "def f(a):\n    b = a\n    return c\n",
+]
+_NAME = re.compile(r"\b[A-Za-z_]\w*\b")
+EDITS_PER_FILE = 20
+
+
+def _key(issues):
+    return [(issue.get("type"), issue.get("message"), issue.get("line"), issue.get("column"))
+            for issue in issues]
+
+
+def _edit(lines, rng):
+    """One random insert, delete, rename or block copy."""
+    lines = list(lines)
+    op = rng.random()
+    i = rng.randrange(len(lines) + 1)
+    if op < 0.25 and lines:
+        del lines[min(i, len(lines) - 1):i + rng.randrange(1, 4)]
+    elif op < 0.55:
+        lines.insert(i, rng.choice(SNIPPETS))
+    elif op < 0.8:
+        names = sorted(set(_NAME.findall("".join(lines)))) or ["x"]
+        old, new = rng.choice(names), rng.choice(names + ["renamed"])
+        pattern = re.compile(rf"\b{re.escape(old)}\b")
+        if rng.random() < 0.5 and lines:
+            j = min(i, len(lines) - 1)
+            lines[j] = pattern.sub(new, lines[j])
+        else:
+            lines = [pattern.sub(new, line) for line in lines]
+    else:
+        j = rng.randrange(len(lines) + 1)
+        lines[j:j] = lines[i:i + rng.randrange(1, 20)]
+    return lines
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning", "ignore::SyntaxWarning")
+@pytest.mark.parametrize("path", SOURCES, ids=os.path.basename)
+def test_incremental_matches_full_analysis(path):
+    rng = random.Random(os.path.basename(path))
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    analyzer = IncrementalAnalyzer()
+    assert _key(analyzer.analyze(text)) == _key(Analyzer(text).analyze())
+
+    for step in range(EDITS_PER_FILE):
+        edited = "".join(_edit(split_lines(text), rng))
+        assert _key(analyzer.analyze(edited)) == _key(Analyzer(edited).analyze()), step
+        try:
+            compile(edited, path, "exec", 0x400)  # ast.PyCF_ONLY_AST
+        except SyntaxError:
+            continue  # keep editing the last version that parses
+        text = edited
+    assert analyzer.segments_reused > 0
+
+
+def test_unreachable_state_ends_with_the_function():
+    code = "def f():\n    return 1\n\nx = 2\nprint(x)\n"
+    assert _key(Analyzer(code).analyze()) == []
+    assert _key(IncrementalAnalyzer().analyze(code)) == []
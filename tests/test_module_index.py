@@ -0,0 +1,51 @@
+import itertools
+
+from core.module_index import ModuleIndex
+
+
+def _write(root, files):
+    for rel_path, source in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    return sorted(str(root / rel_path) for rel_path in files)
+
+
+CYCLE = {
+    "p/__init__.py": "",
+    "p/a.py": "from p.b import *\n\ndef fa():\n    pass\n",
+    "p/b.py": "from p.a import *\n\ndef fb():\n    pass\n",
+    "p/c.py": "from p.a import *\n\nfb()\nfa()\n",
+    "p/d.py": "from p.b import *\n",
+}
+
+
+def test_star_import_cycle_does_not_depend_on_query_order(tmp_path):
+    paths = _write(tmp_path, CYCLE)
+    queried = [p for p in paths if p.endswith(("a.py", "b.py", "c.py", "d.py"))]
+    for order in itertools.permutations(queried):
+        index = ModuleIndex(str(tmp_path), cache_dir=None).build(paths)
+        answers = {path: index.star_names(path) for path in order}
+        for path in queried:
+            assert answers[path] == frozenset({"fa", "fb"}), (order, path)
+
+
+def test_star_import_cycle_reports_no_undefined_names(tmp_path):
+    from core.engine import DebuggerEngine
+
+    _write(tmp_path, CYCLE)
+    engine = DebuggerEngine(str(tmp_path), module_index=True,
+                            cache_dir=str(tmp_path / ".debugger_cache"))
+    assert [issue for issue in engine.run() if issue["type"] == "UndefinedVariable"] == []
+
+
+def test_cycle_through_an_unknown_module_is_unknown(tmp_path):
+    paths = _write(tmp_path, {
+        "p/__init__.py": "",
+        "p/a.py": "from p.b import *\nfrom outside import *\n",
+        "p/b.py": "from p.a import *\n",
+        "p/c.py": "from p.b import *\n",
+    })
+    index = ModuleIndex(str(tmp_path), cache_dir=None).build(paths)
+    assert index.star_names(str(tmp_path / "p" / "c.py")) is None
+    assert index.exports("p.a") is None
@@ -0,0 +1,25 @@
+from core.analyzer import Analyzer
+from core.recovery import recover
+from core.tokens import split_lines
+
+PAGES = ("def f(:\n    return 1\n\x0c\ndef g():\n    return undefined_name\n"
+         "\x0c\ndef h()\n    pass\n\x0c\nx = 'a\x0cb'\nprint(y)\n")
+
+
+def _issues(code):
+    return [(issue["type"], issue["line"]) for issue in Analyzer(code, recover=True).analyze()]
+
+
+def test_form_feed_lines_separate_blocks():
+    recovered = recover(PAGES)
+    assert recovered.blocks == 5
+    assert recovered.failed == 2
+    assert [issue.line for issue in recovered.issues] == [1, 7]
+
+
+def test_recovered_issues_keep_their_lines():
+    lines = split_lines(PAGES)
+    assert lines[9] == "x = 'a\x0cb'\n"
+    assert sorted(_issues(PAGES)) == [
+        ("MissingColon", 7), ("SyntaxError", 1), ("UndefinedVariable", 5),
+        ("UndefinedVariable", 11), ("UnusedVariable", 10)]
@@ -0,0 +1,56 @@
+import os
+import threading
+
+import pytest
+
+from validator import rollback
+from validator.rollback import RollbackJournal
+
+
+def test_gc_waits_for_an_open_run(tmp_path):
+    journal = RollbackJournal(str(tmp_path / "journal"))
+    target = tmp_path / "mod.py"
+    target.write_bytes(b"fixed\n")
+    run = journal.begin()
+    before = run.objects.put(b"original\n")  # stored, not yet in the log
+    after = run.objects.put(b"fixed\n")
+
+    collector = threading.Thread(target=journal.gc, kwargs={"keep": 1})
+    collector.start()
+    collector.join(0.3)
+    if rollback.fcntl is not None:
+        assert collector.is_alive()  # blocked by the open run
+
+    run._append({"path": str(target), "before": before, "after": after, "mode": 0o644})
+    journal.end(run)
+    collector.join(5)
+    assert not collector.is_alive()
+
+    report = journal.restore(run.run_id)
+    assert report.restored == [str(target)]
+    assert target.read_bytes() == b"original\n"
+
+
+def test_failed_rename_in_restore_raises_its_own_error(tmp_path, monkeypatch):
+    journal = RollbackJournal(str(tmp_path / "journal"))
+    paths = [tmp_path / name for name in ("a.py", "b.py", "c.py")]
+    run = journal.begin()
+    for path in paths:
+        path.write_bytes(b"before\n")
+        run.record(str(path), b"before\n", b"after " + path.name.encode() + b"\n")
+        path.write_bytes(b"after " + path.name.encode() + b"\n")
+    journal.end(run)
+
+    replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise PermissionError("read-only target")
+        replace(src, dst)
+
+    monkeypatch.setattr(rollback.os, "replace", failing_replace)
+    with pytest.raises(PermissionError, match="read-only target"):
+        journal.restore(run.run_id)
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
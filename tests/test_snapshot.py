@@ -0,0 +1,33 @@
+import json
+import os
+
+from core import snapshot
+
+
+def test_equal_size_edit_with_same_mtime_rebuilds(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text('{"rule": "aaa"}')
+    assert snapshot.load_json(str(path)) == {"rule": "aaa"}
+    assert os.path.exists(snapshot.snapshot_path(str(path)))
+    assert snapshot.load_json(str(path)) == {"rule": "aaa"}  # from the snapshot
+
+    st = os.stat(path)
+    path.write_text('{"rule": "bbb"}')  # same size
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))  # same mtime, as cp -p leaves it
+    assert snapshot.load_json(str(path)) == {"rule": "bbb"}
+
+
+def test_builder_output_is_snapshotted(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("[1, 2, 3]")
+    calls = []
+
+    def build(data):
+        calls.append(data)
+        return {"total": sum(json.loads(data))}
+
+    assert snapshot.load_json(str(path), build, "v1") == {"total": 6}
+    assert snapshot.load_json(str(path), build, "v1") == {"total": 6}
+    assert len(calls) == 1
+    assert snapshot.load_json(str(path), build, "v2") == {"total": 6}
+    assert len(calls) == 2
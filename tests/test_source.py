@@ -0,0 +1,19 @@
+from core.engine import DebuggerEngine
+from core.source import read_source
+
+
+def test_empty_file_is_read_not_mapped(tmp_path):
+    path = tmp_path / "__init__.py"
+    path.write_bytes(b"")
+    with read_source(str(path), mmap_threshold=0) as source:
+        assert not source.mapped
+        assert source.data == b""
+
+
+def test_scan_with_zero_mmap_threshold_maps_non_empty_files(tmp_path):
+    (tmp_path / "__init__.py").write_bytes(b"")
+    (tmp_path / "mod.py").write_text("x = undefined_name\n")
+    with read_source(str(tmp_path / "mod.py"), mmap_threshold=0) as source:
+        assert source.mapped
+    issues = DebuggerEngine(str(tmp_path), mmap_threshold=0).run()
+    assert sorted(issue["type"] for issue in issues) == ["UndefinedVariable", "UnusedVariable"]
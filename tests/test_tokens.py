@@ -0,0 +1,42 @@
+import tokenize
+
+from core.analyzer import Analyzer
+from core.tokens import TokenStream, split_lines
+
+FORM_FEED = "def f():\n    return y\n# \x0c page\ndef g():\n\tz = 1\n\treturn z\n"
+GROUP_SEPARATOR = "s = 'a\x1cb'\nprint(s)\ndef f():\n    return 1\ndef g():\n\treturn q\n"
+
+
+def _issues(code):
+    return [(issue["type"], issue["line"]) for issue in Analyzer(code).analyze()]
+
+
+def test_lines_are_numbered_as_the_tokenizer_does():
+    assert split_lines(FORM_FEED) == ["def f():\n", "    return y\n", "# \x0c page\n",
+                                      "def g():\n", "\tz = 1\n", "\treturn z\n"]
+    indents = [tok.start[0] for tok in TokenStream(FORM_FEED).of_type(tokenize.INDENT)]
+    assert [TokenStream(FORM_FEED).lines[line - 1] for line in indents] == [
+        "    return y\n", "\tz = 1\n"]
+
+
+def test_form_feed_in_a_comment():
+    assert _issues(FORM_FEED) == [("UndefinedVariable", 2), ("MixedIndentation", 5)]
+
+
+def test_line_break_character_in_a_string():
+    assert _issues(GROUP_SEPARATOR) == [("UndefinedVariable", 6), ("MixedIndentation", 6)]
+
+
+def test_form_feed_in_indentation_is_not_a_style():
+    code = "def f():\n\x0c    return 1\n\ndef g():\n    return 2\n"
+    assert _issues(code) == []
+
+
+def test_block_statements_of_every_block():
+    code = ("def f(a):\n    if a:\n        b = (1,\n  2)\n        return b\n"
+            "    for c in a: pass\n    return a\n\nclass K:\n    x = 1\n")
+    tokens = TokenStream(code)
+    assert tokens.block_statements(2) == (2, 6, 7)
+    assert tokens.block_statements(3) == (3, 5)
+    assert tokens.block_statements(10) == (10,)
+    assert tokens.block_statements(1) == ()
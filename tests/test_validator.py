@@ -0,0 +1,41 @@
+import pytest
+
+from validator.validator import BatchStats, CodeValidator, validate_many
+
+ORIGINAL = "def f(a):\n    b = a + 1\n    return b\n"
+PAIRS = [(ORIGINAL, f"def f(a):\n    b = a + {i}\n    return b\n") for i in range(7)]
+PAIRS += [(ORIGINAL, "def f(a):\n    return eval(a)\n"), (ORIGINAL, "def f(a:\n")]
+# every pair once, then again and again, interleaved with new ones
+STREAM = PAIRS + PAIRS[::-1] + [pair for pair in PAIRS for _ in range(2)]
+
+
+def _expected(pairs):
+    return [CodeValidator(original, fixed).validate() for original, fixed in pairs]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_in_input_order_with_duplicates_counted(workers):
+    stats = BatchStats()
+    results = list(validate_many(STREAM, workers=workers, chunksize=4, stats=stats))
+    assert results == _expected(STREAM)
+    assert (stats.pairs, stats.validated, stats.duplicates) == (36, 9, 27)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_only_recent_pairs_are_remembered(workers):
+    pairs = [(ORIGINAL, f"x = {i}\n") for i in range(40)]
+    stream = pairs + [pairs[-1]] + pairs
+    stats = BatchStats()
+    results = list(validate_many(stream, workers=workers, chunksize=2, stats=stats,
+                                 max_recent=4))
+    assert results == _expected(stream)
+    # the first 40 are forgotten by the time they come again, the last is not
+    assert (stats.validated, stats.duplicates) == (80, 1)
+
+
+def test_repeats_do_not_share_mutable_fields():
+    first, repeat = validate_many([PAIRS[-2], PAIRS[-2]])
+    assert first == repeat
+    repeat.errors.append("changed by the caller")
+    repeat.metrics["extra"] = 1
+    assert "changed by the caller" not in first.errors and "extra" not in first.metrics
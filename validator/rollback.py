@@ -1,46 +1,424 @@
-import logging
-from typing import List, Dict
-
-# ------------------------
-# Logging Setup (deduplicated)
-# ------------------------
-logger = logging.getLogger("RollbackManager")
-logger.setLevel(logging.INFO)
-if not logger.hasHandlers():
-    ch = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)s] %(message)s")
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
-
-
-class RollbackManager:
-    """
-    Handles rollback recommendations and tracks rollback history.
-
-    Improvements:
-    ✔ Deduplicated logging
-    ✔ Optional in-memory rollback cache
-    """
-
-    _rollback_cache: Dict[str, bool] = {}  # Tracks if rollback recommended per code hash
-
-    def __init__(self):
-        self.history: List[Dict[str, str]] = []
-
-    def recommend(self, code_hash: str, reason: str) -> bool:
-        """
-        Determine if rollback is recommended.
-        Caches decisions for repeated checks.
-        """
-        if code_hash in RollbackManager._rollback_cache:
-            logger.info(f"Rollback decision retrieved from cache for {code_hash}")
-            return RollbackManager._rollback_cache[code_hash]
-
-        logger.warning(f"Rollback recommended for {code_hash}: {reason}")
-        RollbackManager._rollback_cache[code_hash] = True
-        self.history.append({"code_hash": code_hash, "reason": reason})
-        return True
-
-    def get_history(self) -> List[Dict[str, str]]:
-        """Return all recorded rollback decisions."""
-        return self.history
\ No newline at end of file
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks (Windows): gc does not wait for open runs
+    fcntl = None
+
+# ------------------------
+# Logging Setup (deduplicated)
+# ------------------------
+logger = logging.getLogger("RollbackManager")
+logger.setLevel(logging.INFO)
+if not logger.hasHandlers():
+    ch = logging.StreamHandler()
+    formatter = logging.Formatter("[%(levelname)s] %(message)s")
+    ch.setFormatter(formatter)
+    logger.addHandler(ch)
+
+# Same directory the analysis cache and module index live in
+DEFAULT_JOURNAL_DIR = os.path.join(".debugger_cache", "rollback")
+DEFAULT_KEEP_RUNS = 20
+MAX_CACHED_DECISIONS = 4096
+COMPRESS_LEVEL = 6
+# Held shared by every open run, exclusively by gc
+LOCK_FILENAME = "lock"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes, mode: Optional[int] = None) -> None:
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# =======================
+# JOURNAL
+# =======================
+class ObjectStore:
+    """
+    Content-addressed store of file contents
+    - one zlib-compressed object per distinct content, named by its sha256
+    - put() of a content that is already stored costs a stat, not a write
+    - objects are written through a temporary file and renamed, so
+      concurrent writers (pipeline workers) never see a partial object
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, data: bytes) -> str:
+        digest = _digest(data)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, zlib.compress(data, COMPRESS_LEVEL))
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if _digest(data) != digest:
+            raise ValueError(f"corrupt rollback object {digest}")
+        return data
+
+    def __iter__(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            for name in os.listdir(directory):
+                if not name.startswith("."):
+                    yield prefix + name
+
+
+class JournalRun:
+    """
+    Transaction log of one fix run: one JSON line per changed file
+    - record() stores the pre-fix and fixed contents, then appends
+      {"path", "before", "after", "mode"}; call it before writing the
+      fixed file, so a crash never leaves a write the log does not know of
+    - lines are appended with O_APPEND, so workers of one run can record
+      into the same log
+    - picklable (root + run id), to be sent to worker processes
+    """
+
+    def __init__(self, root: str, run_id: str):
+        self.root = root
+        self.run_id = run_id
+        self.log_path = os.path.join(root, "runs", run_id + ".jsonl")
+        self.objects = ObjectStore(os.path.join(root, "objects"))
+        self.lock_fd = None  # shared journal lock, held from begin() to end()
+
+    def __reduce__(self):
+        return (JournalRun, (self.root, self.run_id))
+
+    def _append(self, entry: Dict) -> None:
+        line = (json.dumps(entry, sort_keys=True) + "\n").encode("utf-8")
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def record(self, path: str, before: bytes, after: bytes) -> None:
+        """Journal that path is about to change from before to after."""
+        entry = {
+            "path": os.path.abspath(path),
+            "before": self.objects.put(before),
+            "after": self.objects.put(after),
+            "mode": os.stat(path).st_mode & 0o7777,
+        }
+        self._append(entry)
+
+    def entries(self) -> List[Dict]:
+        entries = []
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed run
+                if "path" in entry:
+                    entries.append(entry)
+        return entries
+
+    def changes(self) -> Dict[str, Tuple[str, str, int]]:
+        """{path: (first before, last after, mode)}: the net change of the run per file."""
+        changes = {}
+        for entry in self.entries():
+            first = changes.get(entry["path"])
+            before = first[0] if first else entry["before"]
+            changes[entry["path"]] = (before, entry["after"], entry["mode"])
+        return changes
+
+
+@dataclass
+class RestoreReport:
+    run_id: str
+    restored: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)   # already at their pre-fix content
+    conflicts: List[str] = field(default_factory=list)   # edited or removed since the run
+    seconds: float = 0.0
+
+    def format(self) -> str:
+        lines = [f"Run {self.run_id}: restored {len(self.restored)}, "
+                 f"already restored {len(self.unchanged)}, "
+                 f"conflicts {len(self.conflicts)} ({self.seconds:.2f}s)"]
+        lines += [f"CONFLICT  {path}" for path in self.conflicts]
+        return "\n".join(lines)
+
+
+class RollbackJournal:
+    """
+    Rollback journal of fix runs
+    - objects/: every pre-fix and fixed content, stored once (ObjectStore)
+    - runs/<run id>.jsonl: what each run changed (JournalRun)
+    - restore(run_id) puts a whole run back in one pass: every file is
+      checked and staged next to its target first, then renamed into place
+    - gc() drops old runs and the objects no kept run refers to; it waits
+      for open runs (begin() .. end()) to end, since their objects may be
+      stored before the log line that refers to them
+    """
+
+    def __init__(self, root: str = DEFAULT_JOURNAL_DIR):
+        self.root = root
+        self.objects = ObjectStore(os.path.join(root, "objects"))
+        self.runs_dir = os.path.join(root, "runs")
+
+    def _lock(self, exclusive: bool) -> Optional[int]:
+        """Descriptor of the journal's lock file, locked shared or exclusive (blocks)."""
+        if fcntl is None:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        fd = os.open(os.path.join(self.root, LOCK_FILENAME), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def begin(self) -> JournalRun:
+        """Start the log of a new run; call end() when it is done."""
+        os.makedirs(self.runs_dir, exist_ok=True)
+        lock_fd = self._lock(exclusive=False)
+        run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + os.urandom(3).hex()
+        run = JournalRun(self.root, run_id)
+        run.lock_fd = lock_fd
+        run._append({"run": run_id, "started": time.time()})
+        return run
+
+    def end(self, run: JournalRun) -> bool:
+        """Close a run; a run that changed nothing leaves no log. Returns whether it was kept."""
+        try:
+            if run.entries():
+                return True
+            os.unlink(run.log_path)
+            return False
+        finally:
+            if run.lock_fd is not None:
+                os.close(run.lock_fd)  # releases the lock
+                run.lock_fd = None
+
+    def run(self, run_id: str) -> JournalRun:
+        run = JournalRun(self.root, run_id)
+        if not os.path.exists(run.log_path):
+            raise KeyError(f"no rollback journal for run {run_id}")
+        return run
+
+    def runs(self) -> List[str]:
+        """Run ids, oldest first."""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        names = [name[:-len(".jsonl")] for name in os.listdir(self.runs_dir)
+                 if name.endswith(".jsonl")]
+        return sorted(names)
+
+    def restore(self, run_id: str, force: bool = False) -> RestoreReport:
+        """
+        Put every file changed by run_id back to its pre-fix content.
+        A file whose content is no longer what the run wrote is a conflict
+        and kept as is, unless force.
+        """
+        start = time.perf_counter()
+        report = RestoreReport(run_id)
+        run = self.run(run_id)
+
+        staged = []
+        try:
+            for path, (before, after, mode) in run.changes().items():
+                try:
+                    with open(path, "rb") as f:
+                        current = _digest(f.read())
+                except FileNotFoundError:
+                    if not os.path.isdir(os.path.dirname(path)):
+                        report.conflicts.append(path)
+                        continue
+                    current = None
+                if current == before:
+                    report.unchanged.append(path)
+                    continue
+                if current != after and not force:
+                    report.conflicts.append(path)
+                    continue
+
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+                staged.append((tmp, path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self.objects.get(before))
+                os.chmod(tmp, mode)
+
+            # Popped as they are renamed: only temporary files left behind
+            # by a failed rename are removed below
+            staged.reverse()
+            while staged:
+                tmp, path = staged[-1]
+                os.replace(tmp, path)
+                staged.pop()
+                report.restored.append(path)
+        finally:
+            for tmp, _ in staged:
+                os.unlink(tmp)
+
+        run._append({"restored": time.time(), "files": len(report.restored)})
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def gc(self, keep: int = DEFAULT_KEEP_RUNS, max_age: Optional[float] = None) -> Dict[str, int]:
+        """
+        Delete all but the newest keep runs (and, with max_age in seconds,
+        runs older than that), then every object no remaining run refers to.
+        Waits for the runs in progress to end, so never call it while this
+        process has a run open.
+        """
+        lock_fd = self._lock(exclusive=True)
+        try:
+            return self._gc(keep, max_age)
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+
+    def _gc(self, keep: int, max_age: Optional[float]) -> Dict[str, int]:
+        runs = self.runs()
+        dropped = runs[:max(len(runs) - keep, 0)]
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            dropped += [run_id for run_id in runs[len(dropped):]
+                        if os.path.getmtime(JournalRun(self.root, run_id).log_path) < cutoff]
+        for run_id in dropped:
+            os.unlink(JournalRun(self.root, run_id).log_path)
+
+        live = set()
+        for run_id in self.runs():
+            for entry in JournalRun(self.root, run_id).entries():
+                live.add(entry["before"])
+                live.add(entry["after"])
+
+        removed = 0
+        for digest in list(self.objects):
+            if digest not in live:
+                os.unlink(self.objects.path(digest))
+                removed += 1
+        return {"runs_removed": len(dropped), "objects_removed": removed,
+                "objects_kept": len(live)}
+
+
+# =======================
+# ROLLBACK DECISIONS
+# =======================
+class RollbackManager:
+    """
+    Handles rollback recommendations and tracks rollback history.
+
+    Improvements:
+    ✔ Deduplicated logging
+    ✔ Bounded in-memory rollback cache (least recently used decisions go first)
+    ✔ Restores whole fix runs from a RollbackJournal
+    """
+
+    # Tracks if rollback recommended per code hash
+    _rollback_cache: "OrderedDict[str, bool]" = OrderedDict()
+
+    def __init__(self, journal: Optional[RollbackJournal] = None):
+        self.history: List[Dict[str, str]] = []
+        self.journal = journal
+
+    def recommend(self, code_hash: str, reason: str) -> bool:
+        """
+        Determine if rollback is recommended.
+        Caches decisions for repeated checks.
+        """
+        cache = RollbackManager._rollback_cache
+        if code_hash in cache:
+            cache.move_to_end(code_hash)
+            logger.info(f"Rollback decision retrieved from cache for {code_hash}")
+            return cache[code_hash]
+
+        logger.warning(f"Rollback recommended for {code_hash}: {reason}")
+        cache[code_hash] = True
+        if len(cache) > MAX_CACHED_DECISIONS:
+            cache.popitem(last=False)
+        self.history.append({"code_hash": code_hash, "reason": reason})
+        return True
+
+    def restore(self, run_id: str, force: bool = False) -> RestoreReport:
+        """Undo a whole fix run recorded in the journal."""
+        if self.journal is None:
+            raise RuntimeError("RollbackManager has no journal to restore from")
+        report = self.journal.restore(run_id, force)
+        self.history.append({"code_hash": run_id, "reason": "restored fix run"})
+        logger.info(report.format())
+        return report
+
+    def get_history(self) -> List[Dict[str, str]]:
+        """Return all recorded rollback decisions."""
+        return self.history
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m validator.rollback",
+        description="List, restore and clean up fix runs recorded in the rollback journal"
+    )
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_DIR, metavar="DIR",
+                        help=f"journal directory (default: {DEFAULT_JOURNAL_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list recorded runs, oldest first")
+    restore = commands.add_parser("restore", help="restore every file a run changed")
+    restore.add_argument("run_id", nargs="?", default=None, help="run to undo (default: latest)")
+    restore.add_argument("--force", action="store_true",
+                         help="also overwrite files edited since the run")
+    gc = commands.add_parser("gc", help="drop old runs and unreferenced objects")
+    gc.add_argument("--keep", type=int, default=DEFAULT_KEEP_RUNS,
+                    help=f"newest runs to keep (default: {DEFAULT_KEEP_RUNS})")
+    gc.add_argument("--max-age-days", type=float, default=None,
+                    help="also drop runs older than this")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    journal = RollbackJournal(args.journal)
+
+    if args.command == "list":
+        for run_id in journal.runs():
+            print(f"{run_id}  {len(journal.run(run_id).changes())} files")
+    elif args.command == "restore":
+        runs = journal.runs()
+        run_id = args.run_id or (runs[-1] if runs else None)
+        if run_id is None:
+            sys.exit("no fix run recorded")
+        print(journal.restore(run_id, args.force).format())
+    else:
+        max_age = args.max_age_days * 86400 if args.max_age_days is not None else None
+        print(journal.gc(args.keep, max_age))
+
+
+if __name__ == "__main__":
+    main()
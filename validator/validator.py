@@ -1,232 +1,505 @@
-import ast
-import hashlib
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Callable, Any
-
-VALIDATOR_VERSION = "5.1.0"
-
-# =======================
-# PUBLIC RESULT CONTRACT
-# =======================
-@dataclass(frozen=True)
-class ValidationResult:
-    version: str
-    status: str
-    trust_score: int
-    risk_level: str
-    readiness: str
-    warnings: List[str]
-    errors: List[str]
-    rollback_required: bool
-    metrics: Dict[str, Any]
-    categories: Dict[str, List[str]]  # new field for categorized issues
-
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
-
-
-# =======================
-# POLICY DEFINITIONS
-# =======================
-SECURITY_BANNED_CALLS = {"eval", "exec", "compile", "__import__"}
-MAX_REMOVAL_RATIO = 0.6
-MIN_AST_NODES = 5
-
-# Mapping keywords in messages to categories (from JSON schema)
-ERROR_CATEGORIES = {
-    "SyntaxError": "Syntax",
-    "IndentationError": "Syntax",
-    "Security violation": "Security",
-    "Infinite loop risk": "Logic",
-    "Bare except": "Reliability",
-    "Structural regression": "Stability",
-    "AST integrity": "Stability",
-    "Undefined variable": "Semantic",
-    "Unused variable": "Maintainability"
-}
-
-
-# =======================
-# VALIDATOR CORE
-# =======================
-class CodeValidator:
-    """
-    Offline, deterministic Python static code validator.
-    Categorizes errors and warnings per schema.
-    """
-
-    def __init__(self, original_code: str, fixed_code: str):
-        self.original = original_code or ""
-        self.fixed = fixed_code or ""
-
-        self.errors: List[str] = []
-        self.warnings: List[str] = []
-        self.metrics: Dict[str, Any] = {}
-        self.categories: Dict[str, List[str]] = {cat: [] for cat in set(ERROR_CATEGORIES.values())}
-
-        self._ast_cache: Dict[str, ast.AST] = {}
-
-        self._phases: List[Callable[[], bool]] = [
-            self._syntax_phase,
-            self._ast_integrity_phase,
-            self._structure_diff_phase,
-            self._semantic_ast_phase,
-            self._security_ast_phase,
-            self._stability_phase,
-        ]
-
-    # =======================
-    # UTILITIES
-    # =======================
-    def _parse_ast(self, code: str) -> ast.AST:
-        if code not in self._ast_cache:
-            self._ast_cache[code] = ast.parse(code)
-        return self._ast_cache[code]
-
-    def _fingerprint(self, code: str) -> str:
-        return hashlib.sha256(code.encode("utf-8")).hexdigest()[:12]
-
-    def _categorize_issue(self, message: str, is_error: bool = True):
-        for key, cat in ERROR_CATEGORIES.items():
-            if key in message:
-                self.categories[cat].append(message)
-                break
-        else:
-            # fallback
-            self.categories["Other"] = self.categories.get("Other", [])
-            self.categories["Other"].append(message)
-
-    # =======================
-    # VALIDATION PHASES
-    # =======================
-    def _syntax_phase(self) -> bool:
-        try:
-            self._parse_ast(self.fixed)
-            self.metrics["syntax_ok"] = True
-            return True
-        except (SyntaxError, IndentationError) as e:
-            msg = f"{type(e).__name__}: {e}"
-            self.errors.append(msg)
-            self._categorize_issue(msg)
-            self.metrics["syntax_ok"] = False
-            return False
-
-    def _ast_integrity_phase(self) -> bool:
-        tree = self._parse_ast(self.fixed)
-        nodes = list(ast.walk(tree))
-        self.metrics["ast_node_count"] = len(nodes)
-        if len(nodes) < MIN_AST_NODES:
-            msg = "AST integrity failure: code structure too small"
-            self.errors.append(msg)
-            self._categorize_issue(msg)
-            return False
-        return True
-
-    def _structure_diff_phase(self) -> bool:
-        orig_lines = len(self.original.splitlines())
-        fixed_lines = len(self.fixed.splitlines())
-        self.metrics.update({
-            "original_lines": orig_lines,
-            "fixed_lines": fixed_lines
-        })
-
-        if orig_lines == 0:
-            return True
-
-        removal_ratio = (orig_lines - fixed_lines) / max(orig_lines, 1)
-        self.metrics["removal_ratio"] = round(removal_ratio, 2)
-        if removal_ratio > MAX_REMOVAL_RATIO:
-            msg = "Structural regression: excessive code removal"
-            self.errors.append(msg)
-            self._categorize_issue(msg)
-            return False
-        return True
-
-    def _semantic_ast_phase(self) -> bool:
-        tree = self._parse_ast(self.fixed)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.While) and isinstance(node.test, ast.Constant) and node.test.value is True:
-                if not any(isinstance(n, ast.Break) for n in ast.walk(node)):
-                    msg = "Infinite loop risk: while True without break"
-                    self.warnings.append(msg)
-                    self._categorize_issue(msg, is_error=False)
-            if isinstance(node, ast.ExceptHandler) and node.type is None:
-                msg = "Bare except detected"
-                self.warnings.append(msg)
-                self._categorize_issue(msg, is_error=False)
-        return True
-
-    def _security_ast_phase(self) -> bool:
-        tree = self._parse_ast(self.fixed)
-        ok = True
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                if node.func.id in SECURITY_BANNED_CALLS:
-                    msg = f"Security violation: use of {node.func.id}()"
-                    self.errors.append(msg)
-                    self._categorize_issue(msg)
-                    ok = False
-        return ok
-
-    def _stability_phase(self) -> bool:
-        if self.fixed.count("\n") < 2:
-            msg = "Very small script – review recommended"
-            self.warnings.append(msg)
-            self._categorize_issue(msg, is_error=False)
-        return True
-
-    # =======================
-    # ANALYTICS
-    # =======================
-    def _risk_level(self) -> str:
-        delta = abs(len(self.fixed) - len(self.original)) / max(len(self.original), 1)
-        if delta > 0.6: return "CRITICAL"
-        if delta > 0.3: return "HIGH"
-        if delta > 0.1: return "MEDIUM"
-        return "LOW"
-
-    def _trust_score(self, phase_results: List[bool]) -> int:
-        score = 100
-        score -= phase_results.count(False) * 25
-        score -= len(self.errors) * 12
-        score -= len(self.warnings) * 6
-        return max(score, 0)
-
-    def _readiness(self, trust: int) -> str:
-        if trust >= 90: return "Production Ready"
-        if trust >= 70: return "Safe to Run"
-        if trust >= 50: return "Needs Review"
-        return "Unsafe"
-
-    # =======================
-    # PUBLIC ENTRY POINT
-    # =======================
-    def validate(self) -> ValidationResult:
-        phase_results: List[bool] = [phase() for phase in self._phases]
-
-        trust = self._trust_score(phase_results)
-        risk = self._risk_level()
-        readiness = self._readiness(trust)
-        rollback_required = trust < 50 or not phase_results[0]
-
-        self.metrics.update({
-            "validator_version": VALIDATOR_VERSION,
-            "trust_score": trust,
-            "error_count": len(self.errors),
-            "warning_count": len(self.warnings),
-            "original_hash": self._fingerprint(self.original),
-            "fixed_hash": self._fingerprint(self.fixed),
-        })
-
-        return ValidationResult(
-            version=VALIDATOR_VERSION,
-            status="PASS" if not rollback_required else "FAIL",
-            trust_score=trust,
-            risk_level=risk,
-            readiness=readiness,
-            warnings=self.warnings,
-            errors=self.errors,
-            rollback_required=rollback_required,
-            metrics=self.metrics,
-            categories=self.categories
-        )
\ No newline at end of file
+import ast
+import copy
+import hashlib
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from dataclasses import dataclass, asdict
+from core import ast_cache
+from typing import List, Dict, Callable, Any, Optional, Set, Tuple, Type, Iterable, Iterator, Deque
+
+VALIDATOR_VERSION = "5.1.0"
+
+# =======================
+# PUBLIC RESULT CONTRACT
+# =======================
+@dataclass(frozen=True)
+class ValidationResult:
+    version: str
+    status: str
+    trust_score: int
+    risk_level: str
+    readiness: str
+    warnings: List[str]
+    errors: List[str]
+    rollback_required: bool
+    metrics: Dict[str, Any]
+    categories: Dict[str, List[str]]  # new field for categorized issues
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# =======================
+# POLICY DEFINITIONS
+# =======================
+SECURITY_BANNED_CALLS = {"eval", "exec", "compile", "__import__"}
+MAX_REMOVAL_RATIO = 0.6
+MIN_AST_NODES = 5
+
+# Mapping keywords in messages to categories (from JSON schema)
+ERROR_CATEGORIES = {
+    "SyntaxError": "Syntax",
+    "IndentationError": "Syntax",
+    "Security violation": "Security",
+    "Infinite loop risk": "Logic",
+    "Bare except": "Reliability",
+    "Structural regression": "Stability",
+    "AST integrity": "Stability",
+    "Undefined variable": "Semantic",
+    "Unused variable": "Maintainability"
+}
+CATEGORY_NAMES = tuple(set(ERROR_CATEGORIES.values()))
+
+
+# =======================
+# PHASE VISITORS
+# =======================
+class PhaseVisitor:
+    """
+    One AST phase fed by CodeValidator's shared walk.
+    node_types: node classes (subclasses included) visit() is called for.
+    scope_types: node classes passed down as `scope`, the nearest enclosing
+    node of those types (None at module level).
+    finish() reports into the validator once the walk is done and returns
+    the phase result.
+    """
+    node_types: Tuple[type, ...] = ()
+    scope_types: Tuple[type, ...] = ()
+
+    def visit(self, node: ast.AST, scope: Optional[ast.AST]) -> None:
+        pass
+
+    def finish(self, validator: "CodeValidator") -> bool:
+        return True
+
+
+class SemanticVisitor(PhaseVisitor):
+    """
+    `while True` without break, bare except.
+    A break marks only its nearest enclosing while loop; finish() passes
+    the mark on to outer loops, so the check stays linear however deeply
+    loops nest.
+    """
+    node_types = (ast.While, ast.Break, ast.ExceptHandler)
+    scope_types = (ast.While,)
+
+    def __init__(self):
+        self.events: List[Any] = []          # warnings in walk order; loops decided in finish()
+        self.loops: List[ast.While] = []
+        self.outer: Dict[int, Optional[ast.AST]] = {}
+        self.has_break: Set[int] = set()
+
+    def visit(self, node: ast.AST, scope: Optional[ast.AST]) -> None:
+        if isinstance(node, ast.While):
+            self.loops.append(node)
+            self.outer[id(node)] = scope
+            if isinstance(node.test, ast.Constant) and node.test.value is True:
+                self.events.append(node)
+        elif isinstance(node, ast.Break):
+            if scope is not None:
+                self.has_break.add(id(scope))
+        elif node.type is None:
+            self.events.append("Bare except detected")
+
+    def finish(self, validator: "CodeValidator") -> bool:
+        # the walk is breadth-first: inner loops come after outer ones
+        for loop in reversed(self.loops):
+            outer = self.outer[id(loop)]
+            if outer is not None and id(loop) in self.has_break:
+                self.has_break.add(id(outer))
+
+        for event in self.events:
+            if isinstance(event, ast.While):
+                if id(event) in self.has_break:
+                    continue
+                event = "Infinite loop risk: while True without break"
+            validator.warnings.append(event)
+            validator._categorize_issue(event, is_error=False)
+        return True
+
+
+class SecurityVisitor(PhaseVisitor):
+    """Calls of banned builtins (eval, exec, ...)."""
+    node_types = (ast.Call,)
+
+    def __init__(self):
+        self.banned: List[str] = []
+
+    def visit(self, node: ast.AST, scope: Optional[ast.AST]) -> None:
+        if isinstance(node.func, ast.Name) and node.func.id in SECURITY_BANNED_CALLS:
+            self.banned.append(node.func.id)
+
+    def finish(self, validator: "CodeValidator") -> bool:
+        for name in self.banned:
+            msg = f"Security violation: use of {name}()"
+            validator.errors.append(msg)
+            validator._categorize_issue(msg)
+        return not self.banned
+
+
+# phase name -> visitor class; every visitor shares one walk of the fixed code
+AST_PHASE_VISITORS: Dict[str, Type[PhaseVisitor]] = {
+    "semantic": SemanticVisitor,
+    "security": SecurityVisitor,
+}
+
+
+# =======================
+# VALIDATOR CORE
+# =======================
+class CodeValidator:
+    """
+    Offline, deterministic Python static code validator.
+    Categorizes errors and warnings per schema.
+    """
+
+    def __init__(self, original_code: str, fixed_code: str):
+        self.original = original_code or ""
+        self.fixed = fixed_code or ""
+
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.metrics: Dict[str, Any] = {}
+        self.categories: Dict[str, List[str]] = {cat: [] for cat in CATEGORY_NAMES}
+
+        self.visitors: Dict[str, PhaseVisitor] = {
+            name: visitor() for name, visitor in AST_PHASE_VISITORS.items()
+        }
+        self._node_count: Optional[int] = None
+
+        self._phases: List[Callable[[], bool]] = [
+            self._syntax_phase,
+            self._ast_integrity_phase,
+            self._structure_diff_phase,
+            self._semantic_ast_phase,
+            self._security_ast_phase,
+            self._stability_phase,
+        ]
+
+    # =======================
+    # UTILITIES
+    # =======================
+    def _parse_ast(self, code: str) -> ast.AST:
+        # process-wide LRU keyed by content hash, shared with the Analyzer
+        return ast_cache.parse(code)
+
+    def _walk(self) -> Optional[int]:
+        """
+        One breadth-first walk of the fixed code (ast.walk order) feeding
+        every phase visitor. Returns the node count, or None if the fixed
+        code does not parse (the syntax phase reports that).
+        """
+        if self._node_count is not None or self.metrics.get("syntax_ok") is False:
+            return self._node_count
+
+        visitors = list(self.visitors.values())
+        scope_types = tuple(t for v in visitors for t in v.scope_types)
+        dispatch: Dict[type, List[Callable[[ast.AST, Optional[ast.AST]], None]]] = {}
+        iter_children = ast.iter_child_nodes
+
+        count = 0
+        queue = deque([(self._parse_ast(self.fixed), None)])
+        while queue:
+            node, scope = queue.popleft()
+            count += 1
+            cls = node.__class__
+            handlers = dispatch.get(cls)
+            if handlers is None:
+                handlers = dispatch[cls] = [v.visit for v in visitors if issubclass(cls, v.node_types)]
+            for visit in handlers:
+                visit(node, scope)
+            if scope_types and isinstance(node, scope_types):
+                scope = node
+            for child in iter_children(node):
+                queue.append((child, scope))
+
+        self._node_count = count
+        return count
+
+    @staticmethod
+    def _fingerprint(code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()[:12]
+
+    def _categorize_issue(self, message: str, is_error: bool = True):
+        for key, cat in ERROR_CATEGORIES.items():
+            if key in message:
+                self.categories[cat].append(message)
+                break
+        else:
+            # fallback
+            self.categories["Other"] = self.categories.get("Other", [])
+            self.categories["Other"].append(message)
+
+    # =======================
+    # VALIDATION PHASES
+    # =======================
+    def _syntax_phase(self) -> bool:
+        try:
+            self._parse_ast(self.fixed)
+            self.metrics["syntax_ok"] = True
+            return True
+        except (SyntaxError, IndentationError) as e:
+            msg = f"{type(e).__name__}: {e}"
+            self.errors.append(msg)
+            self._categorize_issue(msg)
+            self.metrics["syntax_ok"] = False
+            return False
+
+    def _ast_integrity_phase(self) -> bool:
+        count = self._walk()
+        if count is None:
+            return True  # skipped: the fixed code does not parse
+        self.metrics["ast_node_count"] = count
+        if count < MIN_AST_NODES:
+            msg = "AST integrity failure: code structure too small"
+            self.errors.append(msg)
+            self._categorize_issue(msg)
+            return False
+        return True
+
+    def _structure_diff_phase(self) -> bool:
+        orig_lines = len(self.original.splitlines())
+        fixed_lines = len(self.fixed.splitlines())
+        self.metrics.update({
+            "original_lines": orig_lines,
+            "fixed_lines": fixed_lines
+        })
+
+        if orig_lines == 0:
+            return True
+
+        removal_ratio = (orig_lines - fixed_lines) / max(orig_lines, 1)
+        self.metrics["removal_ratio"] = round(removal_ratio, 2)
+        if removal_ratio > MAX_REMOVAL_RATIO:
+            msg = "Structural regression: excessive code removal"
+            self.errors.append(msg)
+            self._categorize_issue(msg)
+            return False
+        return True
+
+    def _semantic_ast_phase(self) -> bool:
+        return self._visitor_phase("semantic")
+
+    def _security_ast_phase(self) -> bool:
+        return self._visitor_phase("security")
+
+    def _visitor_phase(self, name: str) -> bool:
+        if self._walk() is None:
+            return True  # skipped: the fixed code does not parse
+        return self.visitors[name].finish(self)
+
+    def _stability_phase(self) -> bool:
+        if self.fixed.count("\n") < 2:
+            msg = "Very small script – review recommended"
+            self.warnings.append(msg)
+            self._categorize_issue(msg, is_error=False)
+        return True
+
+    # =======================
+    # ANALYTICS
+    # =======================
+    def _risk_level(self) -> str:
+        delta = abs(len(self.fixed) - len(self.original)) / max(len(self.original), 1)
+        if delta > 0.6: return "CRITICAL"
+        if delta > 0.3: return "HIGH"
+        if delta > 0.1: return "MEDIUM"
+        return "LOW"
+
+    def _trust_score(self, phase_results: List[bool]) -> int:
+        score = 100
+        score -= phase_results.count(False) * 25
+        score -= len(self.errors) * 12
+        score -= len(self.warnings) * 6
+        return max(score, 0)
+
+    def _readiness(self, trust: int) -> str:
+        if trust >= 90: return "Production Ready"
+        if trust >= 70: return "Safe to Run"
+        if trust >= 50: return "Needs Review"
+        return "Unsafe"
+
+    # =======================
+    # PUBLIC ENTRY POINT
+    # =======================
+    def validate(self) -> ValidationResult:
+        phase_results: List[bool] = [phase() for phase in self._phases]
+
+        trust = self._trust_score(phase_results)
+        risk = self._risk_level()
+        readiness = self._readiness(trust)
+        rollback_required = trust < 50 or not phase_results[0]
+
+        self.metrics.update({
+            "validator_version": VALIDATOR_VERSION,
+            "trust_score": trust,
+            "error_count": len(self.errors),
+            "warning_count": len(self.warnings),
+            "original_hash": self._fingerprint(self.original),
+            "fixed_hash": self._fingerprint(self.fixed),
+        })
+
+        return ValidationResult(
+            version=VALIDATOR_VERSION,
+            status="PASS" if not rollback_required else "FAIL",
+            trust_score=trust,
+            risk_level=risk,
+            readiness=readiness,
+            warnings=self.warnings,
+            errors=self.errors,
+            rollback_required=rollback_required,
+            metrics=self.metrics,
+            categories=self.categories
+        )
+
+
+# =======================
+# BATCH VALIDATION
+# =======================
+# Distinct pairs whose results are kept to answer repeats
+MAX_RECENT_RESULTS = 4096
+
+@dataclass
+class BatchStats:
+    pairs: int = 0          # pairs received
+    validated: int = 0      # distinct pairs actually validated
+    duplicates: int = 0     # pairs answered from an earlier identical pair
+    chars: int = 0          # characters of fixed code validated
+    seconds: float = 0.0
+
+    @property
+    def pairs_per_second(self) -> float:
+        return self.pairs / self.seconds if self.seconds else 0.0
+
+    def format(self) -> str:
+        return (f"{self.pairs} pairs ({self.validated} validated, {self.duplicates} duplicates) "
+                f"in {self.seconds:.2f} s: {self.pairs_per_second:.1f} pairs/s, "
+                f"{self.chars / max(self.seconds, 1e-9) / 1e6:.2f} M chars/s")
+
+
+def validate_chunk(pairs: List[Tuple[str, str]]) -> List[ValidationResult]:
+    """Worker entry point: validate a batch of pairs, results in input order."""
+    # Candidates often share their fixed code: core.ast_cache parses it once
+    return [CodeValidator(original, fixed).validate() for original, fixed in pairs]
+
+
+class BatchValidator:
+    """
+    Validates many (original, fixed) pairs
+    - results stream back in input order (iter_results)
+    - identical pairs, keyed by the _fingerprint of both sides, are
+      validated once while they are among the last max_recent distinct
+      pairs seen (an LRU); each repeat gets its own copy of the result
+    - workers > 1 fans chunks out to a process pool, with a bounded
+      window of chunks in flight so memory stays flat
+    - stats: BatchStats throughput of the last run
+    """
+
+    def __init__(self, workers: int = 1, chunksize: int = 64,
+                 max_recent: int = MAX_RECENT_RESULTS):
+        """
+        workers: number of processes; 1 runs in-process, None/0 uses every CPU.
+        max_recent: distinct pairs whose results are kept for repeats; raised
+        to the pairs in flight at once, which a repeat may refer to.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self.max_recent = max_recent
+        self.stats = BatchStats()
+
+    def _plans(self, pairs: Iterable[Tuple[str, str]], recent: "OrderedDict[Tuple[str, str], Any]",
+               window: int):
+        """
+        Yield ((key, repeat) per pair, new pairs, their keys) per chunk of input.
+        recent: key -> result (None until its chunk is collected), least
+        recently seen first; window: chunks planned before the first of
+        them is collected.
+        """
+        fingerprint = CodeValidator._fingerprint
+        stats = self.stats
+        # A repeat was seen at most window chunks before it is answered
+        max_recent = max(self.max_recent, window * self.chunksize)
+        pairs = iter(pairs)
+        while True:
+            chunk = list(islice(pairs, self.chunksize))
+            if not chunk:
+                return
+            keys, todo, todo_keys = [], [], []
+            for original, fixed in chunk:
+                key = (fingerprint(original or ""), fingerprint(fixed or ""))
+                if key in recent:
+                    recent.move_to_end(key)
+                    keys.append((key, True))
+                    stats.duplicates += 1
+                    continue
+                recent[key] = None
+                if len(recent) > max_recent:
+                    recent.popitem(last=False)
+                keys.append((key, False))
+                todo.append((original, fixed))
+                todo_keys.append(key)
+                stats.chars += len(fixed or "")
+            stats.pairs += len(chunk)
+            stats.validated += len(todo)
+            yield keys, todo, todo_keys
+
+    def iter_results(self, pairs: Iterable[Tuple[str, str]],
+                     stats: Optional[BatchStats] = None) -> Iterator[ValidationResult]:
+        """stats: BatchStats to fill (a new one otherwise); also kept as self.stats."""
+        self.stats = stats if stats is not None else BatchStats()
+        start = time.perf_counter()
+        recent: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        try:
+            if self.workers > 1:
+                yield from self._iter_parallel(pairs, recent)
+            else:
+                for keys, todo, todo_keys in self._plans(pairs, recent, 1):
+                    yield from self._answers(recent, keys, todo_keys, validate_chunk(todo))
+        finally:
+            self.stats.seconds = time.perf_counter() - start
+
+    @staticmethod
+    def _answers(recent, keys, todo_keys, results):
+        """Results of one chunk in input order; repeats get copies."""
+        fresh = dict(zip(todo_keys, results))
+        for key, result in fresh.items():
+            if key in recent:
+                recent[key] = result
+        for key, repeat in keys:
+            result = fresh[key] if key in fresh else recent[key]
+            yield copy.deepcopy(result) if repeat else result
+
+    def _iter_parallel(self, pairs, recent):
+        window = self.workers * 4
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending: Deque[Any] = deque()
+
+        # Collected in submission order: a repeat always refers to a pair
+        # of its own chunk or of one collected before it
+        try:
+            for keys, todo, todo_keys in self._plans(pairs, recent, window):
+                pending.append((keys, todo_keys, pool.submit(validate_chunk, todo)))
+                if len(pending) >= window:
+                    keys, todo_keys, future = pending.popleft()
+                    yield from self._answers(recent, keys, todo_keys, future.result())
+            while pending:
+                keys, todo_keys, future = pending.popleft()
+                yield from self._answers(recent, keys, todo_keys, future.result())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, pairs: Iterable[Tuple[str, str]]) -> List[ValidationResult]:
+        return list(self.iter_results(pairs))
+
+
+def validate_many(pairs: Iterable[Tuple[str, str]], workers: int = 1,
+                  chunksize: int = 64, stats: Optional[BatchStats] = None,
+                  max_recent: int = MAX_RECENT_RESULTS) -> Iterator[ValidationResult]:
+    """
+    Stream one ValidationResult per (original, fixed) pair, in input order.
+    stats: optional BatchStats filled with the run's throughput numbers.
+    max_recent: distinct pairs remembered to answer repeats.
+    """
+    return BatchValidator(workers, chunksize, max_recent).iter_results(pairs, stats)